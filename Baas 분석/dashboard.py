@@ -2,14 +2,30 @@
 """
 Baas Dashboard - 전기차 데이터 대시보드
 """
+import argparse
+import base64
 import configparser
 import csv
+import gzip
+import hashlib
+import json
+import math
 import os
-from datetime import datetime
+import re
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify
 from influxdb_client import InfluxDBClient
-from collections import Counter, defaultdict
+from collections import Counter
+from fleet_table import (GRADES, HISTOGRAM_COLUMNS, HISTOGRAM_EDGES, FleetLoader, SnapshotReader,
+                         is_missing, publish_snapshots)
+from score_history import ScoreHistory
+from versioned_cache import VersionedCache
 
 HERE = Path(__file__).resolve().parent
 CFG = HERE / "config2.ini"
@@ -32,91 +48,248 @@ def _load_cfg():
         cfg["influxdb"]["bucket"],
     )
 
-# 캐시 변수
+# InfluxDB 통계 캐시 (백그라운드 워커가 주기적으로 갱신, 요청은 마지막 성공 값을 즉시 반환)
+# 갱신한 프로세스가 공유 파일에도 기록 - 다중 워커 모드의 워커는 InfluxDB에 접속하지 않고 이 파일만 읽음
 _influxdb_cache = None
 _cache_timestamp = None
-_cache_ttl = 300  # 5분 캐시
+_cache_ttl = 300  # 5분마다 갱신
+_influxdb_lock = threading.Lock()
+_influxdb_stats_path = HERE / "results" / "influxdb_stats.json"
+_influxdb_sync_interval = 2.0  # 워커가 공유 파일을 확인하는 주기 (초)
 
-def get_influxdb_stats():
-    """InfluxDB 통계 조회 (캐싱 적용)"""
-    global _influxdb_cache, _cache_timestamp
-    
-    # 캐시 확인
-    if _influxdb_cache and _cache_timestamp:
-        elapsed = (datetime.now() - _cache_timestamp).total_seconds()
-        if elapsed < _cache_ttl:
-            return _influxdb_cache
-    
+# 포인트 수 누적 카운터: 닫힌 일자(UTC)별 포인트 수를 파일에 저장해 두고 새 일자만 센다
+INFLUX_COLLECTION_START = date(2023, 10, 1)  # 수집 시작일 (vehicle_battery_scorer와 동일)
+_daily_counts_path = HERE / "results" / "influxdb_daily_counts.json"
+_daily_count_backfill_days = 31  # 갱신 1회당 새로 세는 최대 일수 (최초 백필 비용 분산)
+
+def _load_daily_counts():
     try:
-        URL, TOKEN, ORG, BUCKET = _load_cfg()
-        with InfluxDBClient(url=URL, token=TOKEN, org=ORG, timeout=30_000) as client:
-            # 전체 데이터 라인 수 조회 - 최근 30일만 샘플링하여 추정
-            total_lines = 0
-            try:
-                flux_count = f'''
-from(bucket:"{BUCKET}")
-  |> range(start: -30d)
+        with open(_daily_counts_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_daily_counts(counts):
+    try:
+        _daily_counts_path.parent.mkdir(parents=True, exist_ok=True)
+        # 프로세스/스레드별 임시 파일 (동시에 저장해도 서로의 임시 파일을 덮어쓰지 않음)
+        tmp_path = _daily_counts_path.with_name(
+            f"{_daily_counts_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(counts, f, sort_keys=True)
+        os.replace(tmp_path, _daily_counts_path)
+    except OSError as e:
+        print(f"[warn] 일별 포인트 수 저장 실패: {e}")
+
+def _count_total_points(client, org, bucket):
+    """전체 포인트 수 = 저장된 닫힌 일자별 합계 + 오늘 포인트 수
+    아직 세지 않은 닫힌 일자는 한 번의 일 단위 윈도우 쿼리로 최대 _daily_count_backfill_days일씩 채움
+    반환: (포인트 수, 전체 기간을 모두 셌는지 여부)"""
+    counts = _load_daily_counts()
+    today = datetime.now(timezone.utc).date()
+    
+    day = INFLUX_COLLECTION_START
+    while day < today and day.isoformat() in counts:
+        day += timedelta(days=1)
+    
+    if day < today:
+        span_end = min(day + timedelta(days=_daily_count_backfill_days), today)
+        flux_daily = f'''
+from(bucket:"{bucket}")
+  |> range(start: {day.isoformat()}T00:00:00Z, stop: {span_end.isoformat()}T00:00:00Z)
+  |> aggregateWindow(every: 1d, fn: count, createEmpty: false, timeSrc: "_start")
+  |> group(columns: ["_time"])
+  |> sum()
+'''
+        span_counts = {}
+        for table in client.query_api().query(flux_daily, org=org):
+            for record in table.records:
+                key = record.get_time().date().isoformat()
+                span_counts[key] = span_counts.get(key, 0) + int(record.get_value() or 0)
+        # 데이터가 없는 날도 0으로 기록해 다시 세지 않음
+        while day < span_end:
+            counts[day.isoformat()] = span_counts.get(day.isoformat(), 0)
+            day += timedelta(days=1)
+        _save_daily_counts(counts)
+    
+    flux_today = f'''
+from(bucket:"{bucket}")
+  |> range(start: {today.isoformat()}T00:00:00Z)
   |> count()
+  |> group()
   |> sum()
 '''
-                for table in client.query_api().query(flux_count, org=ORG):
-                    for record in table.records:
-                        count = record.get_value()
-                        if count:
-                            # 30일 데이터를 기반으로 전체 추정 (대략적인 값)
-                            total_lines = int(count) * 24  # 대략적인 추정값
-                            break
+    today_count = 0
+    for table in client.query_api().query(flux_today, org=org):
+        for record in table.records:
+            today_count += int(record.get_value() or 0)
+    
+    complete = all(
+        (INFLUX_COLLECTION_START + timedelta(days=n)).isoformat() in counts
+        for n in range((today - INFLUX_COLLECTION_START).days)
+    )
+    return sum(counts.values()) + today_count, complete
+
+def _query_influxdb_stats(previous=None):
+    """InfluxDB 통계 조회 - 메타데이터/카디널리티 함수 위주로 동시에 실행
+    - 시리즈 수: influxdb.cardinality (인덱스 조회)
+    - 필드 수: schema.fieldKeys, 고유 차량 수: schema.tagValues (데이터 스캔 없음)
+    - 포인트 수: 일별 누적 카운터 (새로운 일자와 오늘 데이터만 카운트)
+    개별 쿼리가 실패하면 이전 값을 유지"""
+    previous = previous or {}
+    URL, TOKEN, ORG, BUCKET = _load_cfg()
+    with InfluxDBClient(url=URL, token=TOKEN, org=ORG, timeout=30_000) as client:
+        def scalar(flux):
+            for table in client.query_api().query(flux, org=ORG):
+                for record in table.records:
+                    return int(record.get_value() or 0)
+            return 0
+        
+        def count_points():
+            try:
+                return _count_total_points(client, ORG, BUCKET)
             except Exception as e:
                 print(f"[warn] 데이터 라인 수 조회 실패: {e}")
-            
-            # 고유 차량 수 조회 - 최근 7일만 조회
-            unique_vehicles = set()
+                return None
+        
+        def count_vehicles():
+            # 고유 차량 수 - 최근 7일 car_id 태그 값 (인덱스에서 조회)
             try:
-                flux_vehicles = f'''
-from(bucket:"{BUCKET}")
-  |> range(start: -7d)
-  |> filter(fn:(r)=> r._measurement=="segment_stats_drive")
-  |> keep(columns: ["car_id"])
-  |> distinct(column: "car_id")
-'''
-                for table in client.query_api().query(flux_vehicles, org=ORG):
-                    for record in table.records:
-                        car_id = record.values.get("car_id")
-                        if car_id:
-                            unique_vehicles.add(str(car_id))
+                return scalar(f'''
+import "influxdata/influxdb/schema"
+schema.tagValues(bucket: "{BUCKET}", tag: "car_id",
+                 predicate: (r) => r._measurement == "segment_stats_drive", start: -7d)
+  |> count()
+''')
             except Exception as e:
                 print(f"[warn] 차량 수 조회 실패: {e}")
-            
-            # 필드 수는 고정값 사용 (실제 조회는 너무 느림)
-            field_count = 254
-            
-            result = {
-                "total_lines": total_lines,
-                "unique_vehicles": len(unique_vehicles),
-                "field_count": field_count,
-                "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # 캐시 저장
-            _influxdb_cache = result
-            _cache_timestamp = datetime.now()
-            
-            return result
+                return None
+        
+        def count_fields():
+            try:
+                return scalar(f'''
+import "influxdata/influxdb/schema"
+schema.fieldKeys(bucket: "{BUCKET}", start: -30d)
+  |> count()
+''')
+            except Exception as e:
+                print(f"[warn] 필드 수 조회 실패: {e}")
+                return None
+        
+        def count_series():
+            try:
+                return scalar(f'''
+import "influxdata/influxdb"
+influxdb.cardinality(bucket: "{BUCKET}", start: -30d)
+''')
+            except Exception as e:
+                print(f"[warn] 시리즈 수 조회 실패: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            points_future = executor.submit(count_points)
+            vehicles_future = executor.submit(count_vehicles)
+            fields_future = executor.submit(count_fields)
+            series_future = executor.submit(count_series)
+            points = points_future.result()
+            unique_vehicles = vehicles_future.result()
+            field_count = fields_future.result()
+            series_count = series_future.result()
+    
+    def pick(value, key, default=0):
+        return value if value is not None else previous.get(key, default)
+    
+    return {
+        "total_lines": points[0] if points is not None else previous.get("total_lines", 0),
+        "total_lines_complete": points[1] if points is not None else previous.get("total_lines_complete", False),
+        "unique_vehicles": pick(unique_vehicles, "unique_vehicles"),
+        "field_count": pick(field_count, "field_count", 254),
+        "series_count": pick(series_count, "series_count"),
+        "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _refresh_influxdb_stats():
+    """InfluxDB 통계 갱신 (실패 시 마지막 성공 값 유지)"""
+    global _influxdb_cache, _cache_timestamp
+    
+    try:
+        result = _query_influxdb_stats(_influxdb_cache)
     except Exception as e:
         print(f"[error] InfluxDB 통계 조회 실패: {e}")
+        return False
+    
+    result["updated_at"] = time.time()  # 응답 캐시 키 및 클라이언트 경과 시간 계산용 (epoch 초)
+    with _influxdb_lock:
+        _influxdb_cache = result
+        _cache_timestamp = datetime.fromtimestamp(result["updated_at"])
+    _save_influxdb_stats(result)
+    _publish_event("influxdb", {"updated_at": result["updated_at"], "last_update": result["last_update"]})
+    return True
+
+def _save_influxdb_stats(result):
+    """InfluxDB 통계를 공유 파일에 원자적으로 기록 (다중 워커 모드의 워커들이 읽음)"""
+    try:
+        _influxdb_stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _influxdb_stats_path.with_name(f"{_influxdb_stats_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, _influxdb_stats_path)
+    except OSError as e:
+        print(f"[warn] InfluxDB 통계 파일 저장 실패: {e}")
+
+def _sync_influxdb_stats():
+    """다중 워커 모드: 로더 프로세스가 기록한 InfluxDB 통계 파일을 읽어 반영 (InfluxDB에는 접속하지 않음)
+    모든 워커가 같은 updated_at을 쓰므로 /api/stats의 본문과 ETag가 워커와 관계없이 같음"""
+    global _influxdb_cache, _cache_timestamp
+    
+    try:
+        with open(_influxdb_stats_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except FileNotFoundError:
+        return True  # 로더 프로세스의 첫 갱신 전
+    except (OSError, ValueError) as e:
+        print(f"[warn] InfluxDB 통계 파일 읽기 실패: {e}")
+        return False
+    
+    with _influxdb_lock:
+        if _influxdb_cache is not None and _influxdb_cache.get("updated_at") == result.get("updated_at"):
+            return True
+        _influxdb_cache = result
+        _cache_timestamp = datetime.fromtimestamp(result["updated_at"])
+    _publish_event("influxdb", {"updated_at": result["updated_at"], "last_update": result["last_update"]})
+    return True
+
+def get_influxdb_stats():
+    """InfluxDB 통계 조회 - 요청은 InfluxDB를 기다리지 않음
+    백그라운드 작업(influxdb_stats)이 _cache_ttl마다 갱신한 마지막 성공 값과 그 경과 시간(age_seconds)을 반환"""
+    with _influxdb_lock:
+        cache = _influxdb_cache
+        cache_timestamp = _cache_timestamp
+    
+    if cache is None:
+        # 첫 갱신이 끝나기 전 (또는 InfluxDB 연결 실패)
         return {
             "total_lines": 0,
             "unique_vehicles": 0,
             "field_count": 254,
-            "last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "series_count": 0,
+            "total_lines_complete": False,
+            "last_update": None,
+            "updated_at": None,
+            "age_seconds": None
         }
+    
+    result = dict(cache)
+    result["age_seconds"] = int((datetime.now() - cache_timestamp).total_seconds())
+    return result
 
 def save_car_types_to_csv():
-    """차종 데이터를 파싱해서 car_types 디렉토리에 CSV로 저장 - 캐시된 CSV 데이터 사용"""
-    all_rows = _read_all_csv_data()
+    """차종 데이터를 파싱해서 car_types 디렉토리에 CSV로 저장 - 캐시된 차량 테이블 사용
+    임시 파일에 쓴 뒤 교체하므로 여러 프로세스가 동시에 실행해도 읽는 쪽은 완성된 파일만 봄. 반환: 성공 여부"""
+    table = _get_fleet_table()
     
-    if not all_rows:
-        return
+    if not len(table):
+        return True
     
     output_dir = HERE / "car_types"
     output_dir.mkdir(exist_ok=True)
@@ -126,17 +299,14 @@ def save_car_types_to_csv():
     output_file = output_dir / f"betterwhy_cartype_list_{today.strftime('%Y%m%d')}.csv"
     
     car_data = []
-    seen_car_ids = set()
     
-    for row in all_rows:
-        car_id = row.get("car_id", "").strip() or row.get("client_id", "").strip()
-        car_type = row.get("car_type", "").strip()
-        model_year = row.get("model_year", "").strip()
-        model_month = row.get("model_month", "").strip()
+    # 테이블은 로드 시 car_id 기준으로 중복 제거됨
+    for i, car_id in enumerate(table.car_ids):
+        car_type = table.category("car_type", i)
+        model_year = table.text("model_year", i)
+        model_month = table.text("model_month", i)
         
-        if car_id and car_id not in seen_car_ids:
-            seen_car_ids.add(car_id)
-            
+        if car_id:
             # model_year와 model_month 처리 (소수점 제거)
             year = ""
             month = ""
@@ -159,72 +329,42 @@ def save_car_types_to_csv():
             })
     
     # CSV 파일로 저장
+    tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
     try:
-        with open(output_file, "w", newline="", encoding="utf-8-sig") as f:
+        with open(tmp_file, "w", newline="", encoding="utf-8-sig") as f:
             writer = csv.DictWriter(f, fieldnames=["client_id", "car_type", "model_year", "model_month"])
             writer.writeheader()
             writer.writerows(car_data)
+        os.replace(tmp_file, output_file)
         print(f"[info] 차종 데이터 저장 완료: {output_file} ({len(car_data)}개 차량)")
+        return True
     except Exception as e:
         print(f"[error] CSV 저장 실패: {e}")
+        return False
 
-def _read_all_csv_data():
-    """모든 CSV 파일을 한 번만 읽어서 메모리에 저장 (캐싱)"""
-    global _csv_cache, _csv_cache_timestamp
-    
-    cache_key = 'all_csv_data'
-    now = datetime.now()
-    
-    if cache_key in _csv_cache and cache_key in _csv_cache_timestamp:
-        elapsed = (now - _csv_cache_timestamp[cache_key]).total_seconds()
-        if elapsed < _csv_cache_ttl:
-            return _csv_cache[cache_key]
-    
-    datasets_dir = HERE / "db datasets"
-    if not datasets_dir.exists():
-        return []
-    
-    all_rows = []
-    seen_car_ids = set()
-    csv_files = list(datasets_dir.glob("*.csv"))
-    
-    for csv_path in csv_files:
-        try:
-            with open(csv_path, "r", encoding="utf-8-sig") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    car_id = row.get("car_id", "").strip() or row.get("client_id", "").strip()
-                    if car_id and car_id not in seen_car_ids:
-                        seen_car_ids.add(car_id)
-                        all_rows.append(row)
-        except Exception as e:
-            print(f"[warn] CSV 파일 읽기 실패 {csv_path}: {e}")
-            continue
-    
-    _csv_cache[cache_key] = all_rows
-    _csv_cache_timestamp[cache_key] = now
-    return all_rows
+def _get_fleet_table():
+    """모든 CSV 파일을 파싱한 차량 테이블
+    점수/메트릭은 float 배열, car_type은 범주 코드, 날짜는 timestamp로 로드 시 변환됨
+    파일이 바뀐 경우에만 해당 파일을 다시 파싱 (고정 TTL 없음)"""
+    return _fleet_loader.get()
 
 def get_vehicle_type_stats():
-    """차종별 차량 수 통계 - 캐시된 CSV 데이터 사용"""
-    all_rows = _read_all_csv_data()
-    
-    car_types = []
-    for row in all_rows:
-        car_type = row.get("car_type", "").strip()
-        if car_type:
-            car_types.append(car_type)
+    """차종별 차량 수 통계 - 캐시된 차량 테이블 사용"""
+    table = _get_fleet_table()
     
-    # 차종별 카운트
-    counter = Counter(car_types)
-    total = len(car_types)
+    # 차종 코드별 카운트 (차종이 비어 있는 차량 제외)
+    counter = Counter(table.codes["car_type"])
+    empty_code = table.category_code("car_type", "")
+    if empty_code is not None:
+        del counter[empty_code]
+    total = sum(counter.values())
     
     # 비율 계산하여 정렬
     stats = []
-    for car_type, count in counter.most_common():
+    for code, count in counter.most_common():
         percentage = (count / total * 100) if total > 0 else 0
         stats.append({
-            "car_type": car_type,
+            "car_type": table.categories["car_type"][code],
             "count": count,
             "percentage": round(percentage, 1)
         })
@@ -266,28 +406,21 @@ def get_recent_csv_files():
     return csv_files[:20]  # 최근 20개만
 
 def get_data_completeness():
-    """데이터 완성도 분석 - 캐시된 CSV 데이터 사용"""
-    all_rows = _read_all_csv_data()
+    """데이터 완성도 분석 - 캐시된 차량 테이블 사용"""
+    table = _get_fleet_table()
+    efficiency = table.floats["efficiency"]
+    charging_count = table.floats["charging_count"]
     
     plenty = 0
     normal = 0
     empty = 0
     
-    for row in all_rows:
+    for i in range(len(table)):
         # 효율 데이터 기준으로 완성도 판단
-        efficiency = row.get("efficiency", "").strip()
-        charging_count = row.get("charging_count", "").strip()
-        
-        if not efficiency or efficiency == "" or efficiency == "None":
+        if is_missing(efficiency[i]):
             empty += 1
-        elif charging_count and charging_count != "":
-            try:
-                if int(float(charging_count)) > 100:
-                    plenty += 1
-                else:
-                    normal += 1
-            except (ValueError, TypeError):
-                normal += 1
+        elif not is_missing(charging_count[i]) and int(charging_count[i]) > 100:
+            plenty += 1
         else:
             normal += 1
     
@@ -302,11 +435,43 @@ def get_data_completeness():
         "empty_pct": round(empty / total * 100, 1) if total > 0 else 0
     }
 
+# 등급 키 → 표시 이름
+GRADE_LABELS = {"excellent": "매우 좋음", "good": "좋음", "normal": "보통", "bad": "나쁨"}
+
+def _vehicle_entry(table, i, now_ts):
+    """차량 목록 한 행 (차량별 배터리 성능 테이블 표시용)
+    등급/충전량 문자열은 로드 시 계산된 값, 경과 일수만 현재 시각 기준으로 계산"""
+    # 마지막 충전일 계산 (last_date는 로드 시 timestamp로 변환됨)
+    last_charge_days = None
+    last_ts = table.times["last_ts"][i]
+    if not is_missing(last_ts):
+        days_diff = int((now_ts - last_ts) // 86400)
+        last_charge_days = f"{days_diff}일 전"
+    
+    last_charge_kwh = table.text("charge_kwh_label", i)
+    
+    last_charge_str = last_charge_days
+    if last_charge_kwh:
+        last_charge_str = f"{last_charge_days} / {last_charge_kwh}" if last_charge_days else last_charge_kwh
+    
+    score = table.floats["final_score"][i]
+    efficiency = table.floats["efficiency"][i]
+    return {
+        "car_id": table.car_ids[i],
+        "car_type": table.category("car_type", i),
+        "final_score": round(score, 1),
+        "grade": GRADE_LABELS.get(table.grade(i)),
+        "efficiency": round(efficiency, 2) if not is_missing(efficiency) else None,
+        "last_charge": last_charge_str,
+        "age_string": table.text("age_string", i),
+        "collection_period": table.text("collection_period", i)
+    }
+
 def get_vehicle_performance_data():
-    """차량별 배터리 성능 데이터 - 캐시된 CSV 데이터 사용"""
-    all_rows = _read_all_csv_data()
+    """차량별 배터리 성능 데이터 - 캐시된 차량 테이블 사용"""
+    table = _get_fleet_table()
     
-    if not all_rows:
+    if not len(table):
         return {
             "vehicles": [],
             "summary": {
@@ -324,89 +489,31 @@ def get_vehicle_performance_data():
         }
     
     vehicles = []
-    excellent = 0
-    good = 0
-    normal = 0
-    bad = 0
+    grade_counts = Counter()
     total_mileage = 0
     total_efficiency = 0
     total_score = 0
     efficiency_count = 0
     
-    for row in all_rows:
-        try:
-            car_id = row.get("car_id", "").strip() or row.get("client_id", "").strip()
-            car_type = row.get("car_type", "").strip()
-            final_score = row.get("final_score", "").strip()
-            efficiency = row.get("efficiency", "").strip()
-            avg_charging = row.get("avg_charging_amount", "").strip()
-            age_string = row.get("age_string", "").strip()
-            collection_period = row.get("collection_period", "").strip()
-            last_date = row.get("last_date", "").strip()
-            
-            if not car_id or not final_score:
-                continue
-            
-            score = float(final_score)
-            
-            # 등급 분류
-            if score >= 85:
-                grade = "매우 좋음"
-                excellent += 1
-            elif score >= 70:
-                grade = "좋음"
-                good += 1
-            elif score >= 55:
-                grade = "보통"
-                normal += 1
-            else:
-                grade = "나쁨"
-                bad += 1
-            
-            # 마지막 충전일 계산
-            last_charge_days = None
-            last_charge_kwh = None
-            if last_date:
-                try:
-                    from datetime import datetime
-                    last_dt = datetime.fromisoformat(last_date.replace('Z', '+00:00'))
-                    now = datetime.now(last_dt.tzinfo)
-                    days_diff = (now - last_dt).days
-                    last_charge_days = f"{days_diff}일 전"
-                except:
-                    pass
-            
-            if avg_charging:
-                try:
-                    last_charge_kwh = f"{float(avg_charging):.2f} kWh"
-                except:
-                    pass
-            
-            last_charge_str = last_charge_days
-            if last_charge_kwh:
-                last_charge_str = f"{last_charge_days} / {last_charge_kwh}" if last_charge_days else last_charge_kwh
-            
-            vehicles.append({
-                "car_id": car_id,
-                "car_type": car_type,
-                "final_score": round(score, 1),
-                "grade": grade,
-                "efficiency": round(float(efficiency), 2) if efficiency else None,
-                "last_charge": last_charge_str,
-                "age_string": age_string,
-                "collection_period": collection_period
-            })
-            
-            total_score += score
-            if efficiency:
-                try:
-                    total_efficiency += float(efficiency)
-                    efficiency_count += 1
-                except:
-                    pass
-        except Exception as e:
-            print(f"[warn] 차량 데이터 처리 실패: {e}")
+    final_scores = table.floats["final_score"]
+    efficiencies = table.floats["efficiency"]
+    now_ts = time.time()
+    
+    for i in range(len(table)):
+        score = final_scores[i]
+        if is_missing(score):
             continue
+        
+        # 등급 분류 (로드 시 계산된 등급 코드)
+        grade_counts[table.grade(i)] += 1
+        
+        vehicles.append(_vehicle_entry(table, i, now_ts))
+        
+        total_score += score
+        efficiency = efficiencies[i]
+        if not is_missing(efficiency):
+            total_efficiency += efficiency
+            efficiency_count += 1
     
     # 통계 계산
     avg_efficiency = total_efficiency / efficiency_count if efficiency_count > 0 else 0
@@ -419,10 +526,10 @@ def get_vehicle_performance_data():
         "vehicles": vehicles,
         "summary": {
             "total": len(vehicles),
-            "excellent": excellent,
-            "good": good,
-            "normal": normal,
-            "bad": bad
+            "excellent": grade_counts["excellent"],
+            "good": grade_counts["good"],
+            "normal": grade_counts["normal"],
+            "bad": grade_counts["bad"]
         },
         "stats": {
             "total_mileage": total_mileage,
@@ -432,134 +539,31 @@ def get_vehicle_performance_data():
     }
 
 def get_battery_score_stats(car_type=None, grade=None):
-    """배터리 점수 통계 - 캐시된 CSV 데이터 사용
+    """배터리 점수 통계 - 로드 시 만든 차종 × 등급 집계 큐브에서 조회
     
     Args:
         car_type: 차종 필터 (None이면 전체 차종)
         grade: 등급 필터 (None이면 전체, 'excellent', 'good', 'normal', 'bad')
     """
-    all_rows = _read_all_csv_data()
+    table = _get_fleet_table()
     
-    if not all_rows:
+    if not len(table):
         return None
     
-    # 차종 필터링
-    if car_type and car_type != 'all':
-        all_rows = [row for row in all_rows if row.get("car_type", "").strip() == car_type]
-    
-    # 등급 필터링
-    if grade and grade != 'all':
-        grade_mapping = {
-            'excellent': (85, 100),  # 매우 좋음: Score ≥ 85
-            'good': (70, 85),        # 좋음: 70 ≤ Score < 85
-            'normal': (55, 70),      # 보통: 55 ≤ Score < 70
-            'bad': (0, 55)           # 나쁨: Score < 55
-        }
-        
-        if grade in grade_mapping:
-            min_score, max_score = grade_mapping[grade]
-            filtered_rows = []
-            for row in all_rows:
-                try:
-                    final_score = row.get("final_score", "").strip()
-                    if final_score:
-                        score = float(final_score)
-                        if grade == 'excellent':
-                            if score >= min_score:
-                                filtered_rows.append(row)
-                        elif grade == 'bad':
-                            if score < max_score:
-                                filtered_rows.append(row)
-                        else:
-                            if min_score <= score < max_score:
-                                filtered_rows.append(row)
-                except:
-                    pass
-            all_rows = filtered_rows
-    
-    if not all_rows:
+    cell = table.cube_cell(
+        car_type if car_type and car_type != 'all' else None,
+        grade if grade in GRADES else None
+    )
+    if cell is None or not cell.rows:
         return None
     
-    scores = {
-        "efficiency_scores": [],
-        "temperature_scores": [],
-        "cell_imbalance_scores": [],
-        "driving_habit_scores": [],
-        "charging_pattern_scores": [],
-        "final_scores": [],
-        "age_penalties": []
-    }
-    
-    for row in all_rows:
-        # 각 점수 수집
-        try:
-            eff_score = row.get("efficiency_score", "").strip()
-            if eff_score:
-                scores["efficiency_scores"].append(float(eff_score))
-        except:
-            pass
-        
-        try:
-            temp_score = row.get("temperature_score", "").strip()
-            if temp_score:
-                scores["temperature_scores"].append(float(temp_score))
-        except:
-            pass
-        
-        try:
-            cell_score = row.get("cell_imbalance_score", "").strip()
-            if cell_score:
-                scores["cell_imbalance_scores"].append(float(cell_score))
-        except:
-            pass
-        
-        try:
-            driving_score = row.get("driving_habit_score", "").strip()
-            if driving_score:
-                scores["driving_habit_scores"].append(float(driving_score))
-        except:
-            pass
-        
-        try:
-            charging_score = row.get("charging_pattern_score", "").strip()
-            if charging_score:
-                scores["charging_pattern_scores"].append(float(charging_score))
-        except:
-            pass
-        
-        try:
-            final_score = row.get("final_score", "").strip()
-            if final_score:
-                scores["final_scores"].append(float(final_score))
-        except:
-            pass
-        
-        try:
-            age_penalty = row.get("age_penalty", "").strip()
-            if age_penalty:
-                scores["age_penalties"].append(float(age_penalty))
-        except:
-            pass
-    
-    # 평균값 계산
-    def avg(lst):
-        return sum(lst) / len(lst) if lst else 0.0
-    
-    def percentile(lst, val):
-        """값의 백분위 계산"""
-        if not lst or not val:
-            return 0
-        sorted_lst = sorted(lst)
-        count_below = sum(1 for x in sorted_lst if x < val)
-        return round((count_below / len(sorted_lst)) * 100, 0) if sorted_lst else 0
-    
-    avg_final = avg(scores["final_scores"])
-    avg_eff = avg(scores["efficiency_scores"])
-    avg_temp = avg(scores["temperature_scores"])
-    avg_cell = avg(scores["cell_imbalance_scores"])
-    avg_driving = avg(scores["driving_habit_scores"])
-    avg_charging = avg(scores["charging_pattern_scores"])
-    avg_penalty = avg(scores["age_penalties"])
+    avg_final = cell.mean("final_score")
+    avg_eff = cell.mean("efficiency_score")
+    avg_temp = cell.mean("temperature_score")
+    avg_cell = cell.mean("cell_imbalance_score")
+    avg_driving = cell.mean("driving_habit_score")
+    avg_charging = cell.mean("charging_pattern_score")
+    avg_penalty = cell.mean("age_penalty")
     
     # 가중 평균 계산 (이미지 기준)
     weighted_avg = (avg_eff * 0.30 + avg_temp * 0.15 + avg_cell * 0.15 + 
@@ -575,7 +579,7 @@ def get_battery_score_stats(car_type=None, grade=None):
     return {
         "final_score": round(avg_final, 1),
         "weighted_avg": round(weighted_avg, 1),
-        "reliability": "높음" if len(scores["final_scores"]) > 100 else "보통",
+        "reliability": "높음" if cell.count["final_score"] > 100 else "보통",
         "scores": {
             "efficiency": round(avg_eff, 1),
             "temperature": round(avg_temp, 1),
@@ -593,11 +597,11 @@ def get_battery_score_stats(car_type=None, grade=None):
             "total": round(penalty_eff + penalty_temp + penalty_cell + penalty_driving + penalty_charging + avg_penalty, 1)
         },
         "percentiles": {
-            "efficiency": percentile(scores["efficiency_scores"], avg_eff),
-            "temperature": percentile(scores["temperature_scores"], avg_temp),
-            "cell_imbalance": percentile(scores["cell_imbalance_scores"], avg_cell),
-            "driving_habit": percentile(scores["driving_habit_scores"], avg_driving),
-            "charging_pattern": percentile(scores["charging_pattern_scores"], avg_charging)
+            "efficiency": cell.percentile("efficiency_score", avg_eff),
+            "temperature": cell.percentile("temperature_score", avg_temp),
+            "cell_imbalance": cell.percentile("cell_imbalance_score", avg_cell),
+            "driving_habit": cell.percentile("driving_habit_score", avg_driving),
+            "charging_pattern": cell.percentile("charging_pattern_score", avg_charging)
         }
     }
 
@@ -607,200 +611,616 @@ def index():
     return render_template('dashboard.html')
 
 # CSV 데이터 캐시
-_csv_cache = {}
-_csv_cache_timestamp = {}
-_csv_cache_ttl = 60  # 1분 캐시
+# 데이터셋 로더는 요청에서는 캐시된 테이블만 반환하고, 파일 변경 확인과 바뀐 파일 재파싱은
+# 백그라운드 작업(dataset_reload)이 2초마다 수행
+# 파싱/병합한 테이블은 바이너리 캐시로 저장해 두고, 다음 시작 때 원본 CSV의 이름/크기/mtime이 같으면 바로 매핑
+# 프로덕션(다중 워커) 모드: BAAS_FLEET_SNAPSHOT 환경 변수가 있으면 CSV를 직접 파싱하지 않고
+# 로더 프로세스(--publish-snapshot)가 만든 스냅샷 파일을 모든 워커가 읽기 전용으로 매핑해서 공유
+DEFAULT_SNAPSHOT_PATH = HERE / "results" / "fleet_snapshot.bin"
+_snapshot_path = os.environ.get("BAAS_FLEET_SNAPSHOT")
+if _snapshot_path:
+    _fleet_loader = SnapshotReader(Path(_snapshot_path), check_interval=math.inf)
+else:
+    _fleet_loader = FleetLoader(HERE / "db datasets", check_interval=math.inf,
+                                cache_path=HERE / "results" / "fleet_cache.bin")
+
+# 점수 이력 (점수 계산 실행마다 추가됨, 상세 API의 점수 변화량에 사용)
+_score_history = ScoreHistory(HERE / "results" / "score_history", check_interval=2.0)
+
+# 캐시 - 모두 데이터 버전 기준 무효화, 바이트 크기 한도 내 LRU, 동시 미스는 한 번만 계산 (versioned_cache.py)
+# 집계 결과 캐시: 데이터셋 버전이 바뀔 때만 다시 계산 (크기는 _estimate_size로 추정)
+def _estimate_size(value):
+    """캐시 값 크기 추정 - 직렬화하지 않고 구조만 순회 (문자열은 길이, 그 외 스칼라는 8바이트, 컨테이너 항목당 8바이트 추가)"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_estimate_size(k) + _estimate_size(v) + 8 for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(v) + 8 for v in value)
+    return 8
+
+_data_cache = VersionedCache("data", max_bytes=32 * 1024 * 1024, sizeof=_estimate_size)
 
 def _get_csv_data(cache_key, func, *args, **kwargs):
-    """CSV 데이터 캐싱 헬퍼 함수"""
-    global _csv_cache, _csv_cache_timestamp
-    
-    now = datetime.now()
-    if cache_key in _csv_cache and cache_key in _csv_cache_timestamp:
-        elapsed = (now - _csv_cache_timestamp[cache_key]).total_seconds()
-        if elapsed < _csv_cache_ttl:
-            return _csv_cache[cache_key]
-    
-    result = func(*args, **kwargs)
-    _csv_cache[cache_key] = result
-    _csv_cache_timestamp[cache_key] = now
-    return result
+    """CSV 데이터 캐싱 헬퍼 함수 - 데이터셋 버전이 바뀔 때만 다시 계산 (그 외에는 계속 캐시 사용)"""
+    return _data_cache.get(cache_key, _get_fleet_table().version, lambda: func(*args, **kwargs))
+
+# 응답 본문 캐시 항목: 직렬화된 본문과 ETag, 압축본을 보관하여 변경이 없으면 다시 직렬화/압축하지 않음
+_gzip_min_bytes = 1024  # 이보다 작은 응답은 압축하지 않음
+
+def _json_body_entry(payload):
+    """응답 데이터 → 캐시 항목 {"etag", "identity": bytes, "gzip": bytes(압축 대상일 때만)}"""
+    body = app.json.dumps(payload).encode("utf-8")
+    entry = {"etag": hashlib.blake2b(body, digest_size=16).hexdigest(), "identity": body}
+    if len(body) >= _gzip_min_bytes:
+        entry["gzip"] = gzip.compress(body, compresslevel=6)
+    return entry
+
+def _body_entry_size(entry):
+    return len(entry["identity"]) + len(entry.get("gzip", b""))
+
+# /api/stats 응답 본문 캐시: (데이터셋 버전, InfluxDB 갱신 시각)이 바뀌면 전체 무효화, 필터 조합별 항목
+_stats_cache = VersionedCache("stats", max_bytes=16 * 1024 * 1024, sizeof=_body_entry_size)
+
+def _cached_stats_body(source_key, filter_key, build):
+    """필터 조합별 응답 본문 캐시 조회. 반환: _json_body_entry 항목"""
+    return _stats_cache.get(filter_key, source_key, lambda: _json_body_entry(build()))
+
+def _cached_json_response(entry):
+    """캐시된 JSON 본문으로 응답 생성 - If-None-Match가 일치하면 304, 클라이언트가 허용하면 gzip"""
+    from flask import request
+    
+    body = entry["identity"]
+    etag = entry["etag"]
+    encoding = None
+    if "gzip" in entry and request.accept_encodings["gzip"]:
+        body = entry["gzip"]
+        etag = f"{etag}-gzip"  # 인코딩이 다르면 다른 표현이므로 ETag도 구분
+        encoding = "gzip"
+    
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"  # 매번 재검증 (변경이 없으면 304)
+    return response.make_conditional(request)
 
 @app.route('/api/stats')
 def api_stats():
-    """통계 데이터 API"""
+    """통계 데이터 API - 데이터셋/InfluxDB 통계가 바뀌지 않았으면 캐시된 본문(또는 304) 반환"""
     from flask import request
-    # 차종 데이터 저장은 하루에 한 번만 (파일 존재 확인)
-    today = datetime.now().strftime('%Y%m%d')
-    output_file = HERE / "car_types" / f"betterwhy_cartype_list_{today}.csv"
-    if not output_file.exists():
-        save_car_types_to_csv()
-    
     # 차종 필터 파라미터 받기 (옵션)
     car_type = request.args.get('car_type', None)
     # 등급 필터 파라미터 받기 (옵션)
     grade = request.args.get('grade', None)
+    # 일부 섹션만 요청 (옵션, 예: sections=influxdb)
+    sections = None
+    if request.args.get('sections'):
+        sections = tuple(name for name in request.args['sections'].split(',') if name in STATS_SECTIONS)
     
-    # 캐싱된 데이터 사용
     influx_stats = get_influxdb_stats()
-    vehicle_stats = _get_csv_data('vehicle_types', get_vehicle_type_stats)
-    completeness = _get_csv_data('completeness', get_data_completeness)
-    
-    # 차종별/등급별 배터리 점수는 캐시 키에 차종과 등급 포함
-    cache_key = f'battery_score_{car_type or "all"}_{grade or "all"}'
-    battery_score = _get_csv_data(cache_key, lambda: get_battery_score_stats(car_type, grade))
-    
-    # DB 개수 고정값
-    csv_count = 3
-    
-    # 총 용량 계산 (GB) - 캐싱
-    results_dir = HERE / "db datasets"
-    total_size_gb = _get_csv_data('total_size', lambda: (
-        round(sum(f.stat().st_size for f in results_dir.glob("*") if f.is_file()) / (1024 ** 3), 1)
-        if results_dir.exists() else 0
-    ))
-    
-    # 차량별 배터리 성능 데이터
-    vehicle_performance = _get_csv_data('vehicle_performance', get_vehicle_performance_data)
-    
-    return jsonify({
-        "influxdb": {
+    source_key = (_get_fleet_table().version, influx_stats["updated_at"])
+    return _cached_json_response(
+        _cached_stats_body(source_key, (car_type, grade, sections),
+                           lambda: _build_stats_payload(influx_stats, car_type, grade, sections))
+    )
+
+# /api/stats 응답 섹션 (sections 파라미터로 일부만 요청 가능)
+STATS_SECTIONS = ["influxdb", "vehicle_types", "recent_files", "completeness", "battery_score", "vehicle_performance"]
+
+def _build_stats_payload(influx_stats, car_type, grade, sections=None):
+    """/api/stats 응답 데이터 생성 (집계는 데이터셋 버전별로 캐시됨)
+    sections가 주어지면 해당 섹션만 계산"""
+    def influxdb_section():
+        # DB 개수 고정값
+        csv_count = 3
+        
+        # 총 용량 계산 (GB) - 캐싱
+        results_dir = HERE / "db datasets"
+        total_size_gb = _get_csv_data('total_size', lambda: (
+            round(sum(f.stat().st_size for f in results_dir.glob("*") if f.is_file()) / (1024 ** 3), 1)
+            if results_dir.exists() else 0
+        ))
+        
+        return {
             "total_lines": influx_stats["total_lines"],
             "unique_vehicles": influx_stats["unique_vehicles"],
             "field_count": influx_stats["field_count"],
+            "series_count": influx_stats["series_count"],
+            "total_lines_complete": influx_stats["total_lines_complete"],
             "csv_count": csv_count,
             "total_size_gb": total_size_gb,
-            "last_update": influx_stats["last_update"]
-        },
-        "vehicle_types": vehicle_stats,
-        "recent_files": [],  # 사용하지 않으므로 빈 배열
-        "completeness": completeness,
-        "battery_score": battery_score,
-        "vehicle_performance": vehicle_performance
-    })
+            "last_update": influx_stats["last_update"],
+            "updated_at": influx_stats["updated_at"]
+        }
+    
+    builders = {
+        "influxdb": influxdb_section,
+        # 캐싱된 데이터 사용
+        "vehicle_types": lambda: _get_csv_data('vehicle_types', get_vehicle_type_stats),
+        "recent_files": lambda: [],  # 사용하지 않으므로 빈 배열
+        "completeness": lambda: _get_csv_data('completeness', get_data_completeness),
+        # 차종별/등급별 배터리 점수는 집계 큐브 조회 (필터 조합별 재계산 없음)
+        "battery_score": lambda: get_battery_score_stats(car_type, grade),
+        # 차량별 배터리 성능 데이터
+        "vehicle_performance": lambda: _get_csv_data('vehicle_performance', get_vehicle_performance_data)
+    }
+    return {name: builders[name]() for name in (sections or STATS_SECTIONS)}
+
+# 대시보드 변경 이벤트 (SSE) - 데이터셋 버전 변경, InfluxDB 통계 갱신 시 발행
+# 이벤트 id는 프로세스별 순번이 아니라 현재 상태 "데이터셋 버전.InfluxDB 갱신 시각" (모든 워커가 같은 값)
+# 재연결한 클라이언트는 어느 워커에 붙든 Last-Event-ID와 현재 상태를 비교해서 바뀐 부분만 이벤트로 받음
+_event_cond = threading.Condition()
+_event_keepalive_seconds = 15
+# 스트림은 연결이 유지되는 동안 요청 스레드를 점유하므로 프로세스당 동시 스트림 수를 제한
+# (gthread 워커에서 스레드가 모두 스트림에 묶여 다른 API 요청이 막히지 않도록, 초과 시 503 → 클라이언트는 주기적 새로고침)
+_event_stream_limit = int(os.environ.get("BAAS_EVENT_STREAMS", "4"))
+_event_streams = 0
+_event_streams_lock = threading.Lock()
+
+def _publish_event(kind, data):
+    """상태가 바뀌었음을 열려 있는 스트림에 알림 (보낼 이벤트는 각 스트림이 현재 상태와 비교해서 결정)"""
+    with _event_cond:
+        _event_cond.notify_all()
+
+def _event_state():
+    """(데이터셋 버전, InfluxDB 갱신 시각) - 이벤트 id로 쓰는 현재 상태"""
+    return str(_get_fleet_table().version), str(get_influxdb_stats()["updated_at"])
+
+# 백그라운드 작업 - 데이터셋 재로드, InfluxDB 통계 갱신, 차종 CSV 내보내기를 요청 경로 밖에서 주기적으로 실행
+# 작업마다 전용 스레드 (오래 걸리는 InfluxDB 조회가 2초 주기의 데이터셋 확인을 지연시키지 않도록)
+# 다중 워커 모드(BAAS_FLEET_SNAPSHOT)에서는 InfluxDB 통계 갱신과 차종 CSV 내보내기를 로더 프로세스
+# (--publish-snapshot) 하나만 실행하고, 워커는 공유 파일에서 통계만 읽음 (워커 수만큼 InfluxDB를 조회하지 않도록)
+_dataset_reload_interval = 2.0
+_car_type_export_interval = 60  # 오늘 날짜의 차종 CSV가 있는지 확인하는 주기 (초)
+_jobs = {}  # 작업 이름 -> 함수/주기/실행 상태
+_jobs_lock = threading.Lock()
+_jobs_started = False
+_dataset_version = None
+
+def _register_job(name, interval, func):
+    _jobs[name] = {
+        "func": func,
+        "interval_seconds": interval,
+        "running": False,
+        "runs": 0,
+        "failures": 0,
+        "last_started": None,
+        "last_finished": None,
+        "last_duration_ms": None,
+        "last_success": None,
+        "last_error": None
+    }
+
+def _run_job(name):
+    """작업 1회 실행 - 함수가 False를 반환하거나 예외가 나면 실패로 기록. 반환: 성공 여부"""
+    job = _jobs[name]
+    with _jobs_lock:
+        job["running"] = True
+        job["last_started"] = time.time()
+    t0 = time.perf_counter()
+    error = None
+    try:
+        if job["func"]() is False:
+            error = "작업 실패 (로그 참고)"
+    except Exception as e:
+        error = str(e)
+        print(f"[error] 백그라운드 작업 실패 ({name}): {e}")
+    finished = time.time()
+    with _jobs_lock:
+        job["running"] = False
+        job["runs"] += 1
+        job["last_finished"] = finished
+        job["last_duration_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        if error is None:
+            job["last_success"] = finished
+        else:
+            job["failures"] += 1
+        job["last_error"] = error
+    return error is None
+
+def _job_loop(name):
+    while True:
+        _run_job(name)
+        time.sleep(_jobs[name]["interval_seconds"])
+
+def _ensure_scheduler():
+    """백그라운드 작업 스레드 시작 (최초 요청 시 1회)"""
+    global _jobs_started
+    
+    with _jobs_lock:
+        if _jobs_started:
+            return
+        _jobs_started = True
+    for name in _jobs:
+        threading.Thread(target=_job_loop, args=(name,), name=f"job-{name}", daemon=True).start()
+
+def _reload_dataset():
+    """데이터셋 변경 확인 - 새 점수 파일이 반영되어 버전이 바뀌면 dataset 이벤트 발행"""
+    global _dataset_version
+    
+    table = _fleet_loader.refresh()
+    if _dataset_version is not None and table.version != _dataset_version:
+        _publish_event("dataset", {"version": table.version, "vehicles": len(table)})
+    _dataset_version = table.version
+
+def _export_car_types():
+    """차종 데이터 저장은 하루에 한 번만 (오늘 날짜 파일이 없을 때)"""
+    today = datetime.now().strftime('%Y%m%d')
+    if (HERE / "car_types" / f"betterwhy_cartype_list_{today}.csv").exists():
+        return True
+    return save_car_types_to_csv()
+
+def _register_jobs(shared_owner, reload_dataset=True):
+    """shared_owner: InfluxDB 통계 갱신/차종 CSV 내보내기를 이 프로세스가 직접 실행하는지 여부
+    (아니면 로더 프로세스가 기록한 통계 파일만 읽음)
+    reload_dataset: 데이터셋 재로드 작업 포함 여부 (로더 프로세스는 스냅샷 발행 루프가 재로드를 담당)"""
+    _jobs.clear()
+    if reload_dataset:
+        _register_job("dataset_reload", _dataset_reload_interval, _reload_dataset)
+    if shared_owner:
+        _register_job("influxdb_stats", _cache_ttl, _refresh_influxdb_stats)
+        _register_job("car_type_export", _car_type_export_interval, _export_car_types)
+    else:
+        _register_job("influxdb_stats_sync", _influxdb_sync_interval, _sync_influxdb_stats)
+
+_register_jobs(shared_owner=not _snapshot_path)
+
+@app.before_request
+def _start_background_jobs():
+    _ensure_scheduler()
+
+@app.route('/api/jobs')
+def api_jobs():
+    """백그라운드 작업 상태 API (시각은 epoch 초) - 현재 데이터셋 버전과 파일별 car_id 중복 제거 행 수 포함"""
+    with _jobs_lock:
+        jobs = {name: {key: value for key, value in job.items() if key != "func"} for name, job in _jobs.items()}
+    table = _get_fleet_table()
+    dataset = {"version": table.version, "vehicles": len(table), "duplicates": table.duplicates}
+    return jsonify({"now": time.time(), "jobs": jobs, "dataset": dataset})
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """캐시 상태 API - 캐시별 항목 수/바이트와 적중/미스/대기(동시 미스 합침)/제거/무효화 횟수"""
+    caches = (_data_cache, _stats_cache, _histogram_cache, _timeseries_cache, _cell_matrix_cache)
+    return jsonify({cache.name: cache.stats() for cache in caches})
+
+def _format_event(state, kind, data):
+    return f"id: {state[0]}.{state[1]}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/events')
+def api_events():
+    """대시보드 변경 이벤트 스트림 (Server-Sent Events)
+    - dataset: 점수 데이터셋 버전 변경 → 클라이언트는 /api/stats 전체를 다시 조회
+    - influxdb: InfluxDB 통계 갱신 → 클라이언트는 /api/stats?sections=influxdb 만 다시 조회
+    동시 스트림이 _event_stream_limit개를 넘으면 503 (EventSource는 재연결하지 않고 클라이언트가 주기적 새로고침으로 전환)"""
+    global _event_streams
+    from flask import request
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    
+    with _event_streams_lock:
+        if _event_streams >= _event_stream_limit:
+            response = Response("too many event streams", status=503, mimetype="text/plain")
+            response.headers["Retry-After"] = "300"
+            return response
+        _event_streams += 1
+    
+    def release():
+        global _event_streams
+        with _event_streams_lock:
+            _event_streams -= 1
+    
+    def stream():
+        current = _event_state()
+        # 재연결: 마지막으로 받은 상태와 현재 상태를 비교 (형식이 다른 id는 전체 갱신)
+        seen = tuple(last_event_id.split(".", 1)) if "." in last_event_id else None
+        
+        yield "retry: 5000\n\n"
+        if seen is None and last_event_id:
+            yield _format_event(current, "dataset", {"version": current[0], "resync": True})
+            seen = current
+        seen = seen or current
+        
+        while True:
+            if current[0] != seen[0]:
+                # 데이터셋이 바뀌면 전체를 다시 조회하므로 InfluxDB 이벤트는 따로 보내지 않음
+                yield _format_event(current, "dataset", {"version": current[0], "vehicles": len(_get_fleet_table())})
+            elif current[1] != seen[1]:
+                influx_stats = get_influxdb_stats()
+                yield _format_event(current, "influxdb", {"updated_at": influx_stats["updated_at"],
+                                                          "last_update": influx_stats["last_update"]})
+            seen = current
+            with _event_cond:
+                _event_cond.wait_for(lambda: _event_state() != seen, timeout=_event_keepalive_seconds)
+            current = _event_state()
+            if current == seen:
+                yield ": keepalive\n\n"
+    
+    # 스트림은 요청 컨텍스트를 사용하지 않음 (필요한 헤더 값은 위에서 미리 읽음)
+    response = Response(stream(), mimetype="text/event-stream")
+    response.call_on_close(release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # 리버스 프록시 버퍼링 비활성화
+    return response
+
+# 차량 목록 API - 등급은 final_score 구간 [하한, 상한)
+_grade_ranges = {
+    'excellent': (85, None),
+    'good': (70, 85),
+    'normal': (55, 70),
+    'bad': (None, 55)
+}
+_vehicle_page_default = 50
+_vehicle_page_max = 500
+
+def _slice_ranges(ranges, start, count):
+    """여러 위치 구간을 이어 붙인 순서에서 start부터 count개 위치 (range 슬라이싱이라 O(count))"""
+    positions = []
+    for r in ranges:
+        if start >= len(r):
+            start -= len(r)
+            continue
+        part = r[start:start + count - len(positions)]
+        positions.extend(part)
+        start = 0
+        if len(positions) >= count:
+            break
+    return positions
+
+@app.route('/api/vehicles')
+def api_vehicles():
+    """차량 목록 API (서버 측 페이지네이션/정렬/필터)
+    
+    Query:
+        sort: 정렬 컬럼 (기본 final_score), order: desc(기본)/asc
+        car_type, grade(excellent/good/normal/bad), min_score/max_score(final_score 구간, 양 끝 포함)
+        limit(기본 50, 최대 500), offset 또는 cursor(이전 응답의 next_cursor)
+    
+    로드 시 만든 정렬 인덱스를 사용하므로 final_score 정렬(또는 필터 없음)은 페이지 크기에만 비례.
+    다른 컬럼으로 정렬하면서 등급/점수 필터를 쓰면 정렬 순서대로 조건에 맞는 행을 찾아가며,
+    이때 total은 null이고 next_cursor로 이어서 조회"""
+    from flask import request
+    table = _get_fleet_table()
+    
+    sort = request.args.get('sort', 'final_score')
+    order = request.args.get('order', 'desc')
+    car_type = request.args.get('car_type')
+    grade = request.args.get('grade')
+    if sort not in table.sort_index:
+        return jsonify({"error": f"정렬할 수 없는 컬럼입니다: {sort}"}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({"error": f"잘못된 정렬 방향입니다: {order}"}), 400
+    if grade and grade != 'all' and grade not in _grade_ranges:
+        return jsonify({"error": f"잘못된 등급입니다: {grade}"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', _vehicle_page_default)), 1), _vehicle_page_max)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        min_score = float(request.args['min_score']) if request.args.get('min_score') else None
+        max_score = float(request.args['max_score']) if request.args.get('max_score') else None
+    except ValueError:
+        return jsonify({"error": "limit/offset/min_score/max_score 값이 올바르지 않습니다"}), 400
+    
+    # cursor = "<데이터셋 버전>.<다음 위치>" (데이터셋이 바뀌면 처음부터 다시 조회)
+    cursor = request.args.get('cursor')
+    start = offset
+    if cursor:
+        version, _, position = cursor.rpartition('.')
+        if version != table.version or not position.isdigit():
+            return jsonify({"error": "데이터셋이 갱신되어 cursor가 만료되었습니다"}), 409
+        start = int(position)
+    
+    page = {
+        "vehicles": [],
+        "total": 0,
+        "next_cursor": None,
+        "sort": sort,
+        "order": order,
+        "version": table.version
+    }
+    
+    # 차종 필터는 차종별 정렬 인덱스 선택
+    type_key = None
+    if car_type and car_type != 'all':
+        type_key = table.category_code("car_type", car_type)
+        if type_key is None or type_key not in table.sort_index[sort]:
+            return jsonify(page)
+    index = table.sort_index[sort][type_key]
+    
+    # 등급과 점수 구간을 final_score 조건 하나로 합침
+    score_lo, score_hi, hi_inclusive = min_score, max_score, True
+    if grade and grade != 'all':
+        grade_lo, grade_hi = _grade_ranges[grade]
+        if grade_lo is not None:
+            score_lo = grade_lo if score_lo is None else max(score_lo, grade_lo)
+        if grade_hi is not None and (score_hi is None or grade_hi <= score_hi):
+            score_hi, hi_inclusive = grade_hi, False
+    has_score_filter = score_lo is not None or score_hi is not None
+    
+    if sort == 'final_score' or not has_score_filter:
+        # 정렬 인덱스의 위치 구간만으로 결정 (필터 조건이 곧 구간)
+        if has_score_filter:
+            window = index.window(score_lo, score_hi, hi_inclusive)
+            missing = range(0)
+        else:
+            window = range(index.present)
+            missing = range(index.present, len(index))
+        ranges = [window[::-1] if order == 'desc' else window, missing]
+        total = len(window) + len(missing)
+        positions = _slice_ranges(ranges, start, limit)
+        rows = [index.rows[p] for p in positions]
+        next_start = start + len(rows)
+        page["total"] = total
+    else:
+        # 다른 컬럼 정렬 + final_score 조건: 정렬 순서대로 훑으면서 조건에 맞는 행 수집
+        final_scores = table.floats["final_score"]
+        
+        def matches(i):
+            score = final_scores[i]
+            if score_lo is not None and score < score_lo:
+                return False
+            if score_hi is not None and (score > score_hi if hi_inclusive else score >= score_hi):
+                return False
+            return True
+        
+        present = range(index.present)
+        sequence = [present[::-1] if order == 'desc' else present, range(index.present, len(index))]
+        total_length = len(index)
+        rows = []
+        skip = offset if not cursor else 0
+        position = start if cursor else 0
+        while position < total_length and len(rows) < limit:
+            i = index.rows[_slice_ranges(sequence, position, 1)[0]]
+            position += 1
+            if not matches(i):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            rows.append(i)
+        next_start = position
+        page["total"] = None
+        total = total_length
+    
+    now_ts = time.time()
+    page["vehicles"] = [_vehicle_entry(table, i, now_ts) for i in rows]
+    if next_start < total and rows:
+        page["next_cursor"] = f"{table.version}.{next_start}"
+    return jsonify(page)
+
+# 점수 분포 히스토그램 응답 본문 캐시 (데이터셋 버전이 바뀌면 비움)
+_histogram_cache = VersionedCache("histograms", max_bytes=4 * 1024 * 1024, sizeof=_body_entry_size)
+
+@app.route('/api/score-histograms')
+def api_score_histograms():
+    """점수 분포 히스토그램 API - 로드 시 큐브 셀마다 계산해 둔 구간별 개수를 그대로 반환 (응답 크기는 차량 수와 무관)
+    파라미터: columns(쉼표 구분, 기본 전체), car_type, grade, split(car_type/grade - 그룹별 히스토그램)"""
+    from flask import request
+    
+    columns = HISTOGRAM_COLUMNS
+    if request.args.get('columns'):
+        columns = [name for name in request.args['columns'].split(',') if name]
+        unknown = [name for name in columns if name not in HISTOGRAM_COLUMNS]
+        if unknown:
+            return jsonify({"error": f"히스토그램을 제공하지 않는 컬럼입니다: {', '.join(unknown)}"}), 400
+    car_type = request.args.get('car_type') or None
+    grade = request.args.get('grade') or None
+    split = request.args.get('split') or None
+    if grade is not None and grade not in GRADES:
+        return jsonify({"error": f"잘못된 등급입니다: {grade}"}), 400
+    if split not in (None, "car_type", "grade"):
+        return jsonify({"error": f"잘못된 분할 기준입니다: {split}"}), 400
+    
+    table = _get_fleet_table()
+    
+    def build():
+        def group(key, cell):
+            return {
+                "key": key,
+                "vehicles": cell.rows if cell is not None else 0,
+                "histograms": {column: cell.histograms[column] if cell is not None else [0] * (len(HISTOGRAM_EDGES) - 1)
+                               for column in columns},
+            }
+        
+        if split == "car_type":
+            groups = [group(name, table.cube_cell(name, grade)) for name in table.categories["car_type"]
+                      if car_type is None or name == car_type]
+            groups = [g for g in groups if g["vehicles"]]
+        elif split == "grade":
+            groups = [group(g, table.cube_cell(car_type, g)) for g in GRADES]
+        else:
+            groups = [group(None, table.cube_cell(car_type, grade))]
+        
+        return _json_body_entry({
+            "version": table.version,
+            "edges": HISTOGRAM_EDGES,
+            "columns": columns,
+            "car_type": car_type,
+            "grade": grade,
+            "split": split,
+            "groups": groups,
+        })
+    
+    return _cached_json_response(_histogram_cache.get((tuple(columns), car_type, grade, split), table.version, build))
 
 @app.route('/api/vehicle-detail/<car_id>')
 def api_vehicle_detail(car_id):
     """차량 상세 정보 API"""
-    all_rows = _read_all_csv_data()
-    
-    # 해당 차량 찾기
-    vehicle_row = None
-    for row in all_rows:
-        row_car_id = row.get("car_id", "").strip() or row.get("client_id", "").strip()
-        if row_car_id == car_id:
-            vehicle_row = row
-            break
+    table = _get_fleet_table()
     
-    if not vehicle_row:
+    # 해당 차량 찾기 (car_id 인덱스)
+    i = table.row_index(car_id)
+    if i is None:
         return jsonify({"error": "차량을 찾을 수 없습니다"}), 404
     
+    def num(column):
+        """숫자 값 (없으면 0)"""
+        value = table.floats[column][i]
+        return 0.0 if is_missing(value) else value
+    
     # 차량 기본 정보
-    car_type = vehicle_row.get("car_type", "").strip()
-    age_string = vehicle_row.get("age_string", "").strip()
-    collection_period = vehicle_row.get("collection_period", "").strip()
-    first_date = vehicle_row.get("first_date", "").strip()
-    last_date = vehicle_row.get("last_date", "").strip()
-    model_year = vehicle_row.get("model_year", "").strip()
-    model_month = vehicle_row.get("model_month", "").strip()
-    
-    # 데이터 Row 수 (추정값 - 실제로는 InfluxDB에서 조회해야 함)
-    # 일단 CSV에서 charging_count를 기반으로 추정
-    charging_count = vehicle_row.get("charging_count", "").strip()
-    try:
-        charge_cnt = int(float(charging_count)) if charging_count else 0
-        # 주행 구간은 충전 구간의 약 50배로 추정
-        drive_count = charge_cnt * 50 if charge_cnt > 0 else 0
-        # 주차 구간은 주행 구간의 약 0.6배로 추정
-        parking_count = int(drive_count * 0.6) if drive_count > 0 else 0
-        # 급속/완속 충전은 charging_count를 분할 (추정)
-        fast_charge = int(charge_cnt * 0.55) if charge_cnt > 0 else 0
-        slow_charge = charge_cnt - fast_charge if charge_cnt > 0 else 0
-    except:
-        drive_count = 0
-        parking_count = 0
-        fast_charge = 0
-        slow_charge = 0
-    
-    # 총 Row 수 (추정)
-    total_rows = drive_count + parking_count + fast_charge + slow_charge
+    car_type = table.category("car_type", i)
+    age_string = table.text("age_string", i)
+    collection_period = table.text("collection_period", i)
+    first_date = table.text("first_date", i)
+    last_date = table.text("last_date", i)
+    model_year = table.text("model_year", i)
+    model_month = table.text("model_month", i)
+    
+    # 구간 수 (점수 계산 시 조회해서 데이터셋에 저장된 값, 구간 수 컬럼이 없는 데이터셋은 None)
+    section_counts = {}
+    for kind in ("drive", "parking", "fast_charge", "slow_charge"):
+        count = table.floats[f"{kind}_count"][i]
+        section_counts[kind] = None if is_missing(count) else int(count)
+    known_counts = [count for count in section_counts.values() if count is not None]
+    total_rows = sum(known_counts) if known_counts else None
     
     # 배터리 점수 정보
-    final_score = float(vehicle_row.get("final_score", "0").strip() or "0")
-    efficiency_score = float(vehicle_row.get("efficiency_score", "0").strip() or "0")
-    temperature_score = float(vehicle_row.get("temperature_score", "0").strip() or "0")
-    cell_imbalance_score = float(vehicle_row.get("cell_imbalance_score", "0").strip() or "0")
-    driving_habit_score = float(vehicle_row.get("driving_habit_score", "0").strip() or "0")
-    charging_pattern_score = float(vehicle_row.get("charging_pattern_score", "0").strip() or "0")
-    age_penalty = float(vehicle_row.get("age_penalty", "0").strip() or "0")
-    
-    # 감점 계산
-    penalty_eff = max(0, 100 - efficiency_score) * 0.30
-    penalty_temp = max(0, 100 - temperature_score) * 0.15
-    penalty_cell = max(0, 100 - cell_imbalance_score) * 0.15
-    penalty_driving = max(0, 100 - driving_habit_score) * 0.15
-    penalty_charging = max(0, 100 - charging_pattern_score) * 0.15
-    
-    # 백분위 계산 (전체 차량 대비)
-    all_scores = {
-        "efficiency": [],
-        "temperature": [],
-        "cell_imbalance": [],
-        "driving_habit": [],
-        "charging_pattern": []
-    }
-    
-    for row in all_rows:
-        try:
-            if row.get("efficiency_score", "").strip():
-                all_scores["efficiency"].append(float(row.get("efficiency_score", "0").strip()))
-            if row.get("temperature_score", "").strip():
-                all_scores["temperature"].append(float(row.get("temperature_score", "0").strip()))
-            if row.get("cell_imbalance_score", "").strip():
-                all_scores["cell_imbalance"].append(float(row.get("cell_imbalance_score", "0").strip()))
-            if row.get("driving_habit_score", "").strip():
-                all_scores["driving_habit"].append(float(row.get("driving_habit_score", "0").strip()))
-            if row.get("charging_pattern_score", "").strip():
-                all_scores["charging_pattern"].append(float(row.get("charging_pattern_score", "0").strip()))
-        except:
-            pass
-    
-    def percentile(lst, val):
-        if not lst or not val:
-            return 0
-        sorted_lst = sorted(lst)
-        count_below = sum(1 for x in sorted_lst if x < val)
-        return round((count_below / len(sorted_lst)) * 100, 0) if sorted_lst else 0
-    
+    final_score = num("final_score")
+    efficiency_score = num("efficiency_score")
+    temperature_score = num("temperature_score")
+    cell_imbalance_score = num("cell_imbalance_score")
+    driving_habit_score = num("driving_habit_score")
+    charging_pattern_score = num("charging_pattern_score")
+    age_penalty = num("age_penalty")
+    
+    # 감점 (로드 시 계산된 파생 컬럼)
+    penalty_eff = num("efficiency_penalty")
+    penalty_temp = num("temperature_penalty")
+    penalty_cell = num("cell_imbalance_penalty")
+    penalty_driving = num("driving_habit_penalty")
+    penalty_charging = num("charging_pattern_penalty")
+    
+    # 백분위 계산 (전체 차량 대비, 로드 시 만든 정렬 배열에서 이진 탐색)
     percentiles = {
-        "efficiency": percentile(all_scores["efficiency"], efficiency_score),
-        "temperature": percentile(all_scores["temperature"], temperature_score),
-        "cell_imbalance": percentile(all_scores["cell_imbalance"], cell_imbalance_score),
-        "driving_habit": percentile(all_scores["driving_habit"], driving_habit_score),
-        "charging_pattern": percentile(all_scores["charging_pattern"], charging_pattern_score)
+        "efficiency": table.percentile("efficiency_score", efficiency_score),
+        "temperature": table.percentile("temperature_score", temperature_score),
+        "cell_imbalance": table.percentile("cell_imbalance_score", cell_imbalance_score),
+        "driving_habit": table.percentile("driving_habit_score", driving_habit_score),
+        "charging_pattern": table.percentile("charging_pattern_score", charging_pattern_score)
     }
     
-    # 기여도 상세 (평균값 및 기여도 계산)
-    efficiency = vehicle_row.get("efficiency", "").strip()
-    avg_temperature = vehicle_row.get("avg_temperature", "").strip()
-    cell_imbalance = vehicle_row.get("cell_imbalance", "").strip()
+    # 기여도 상세 (평균값 및 기여도 계산, 값 없으면 None)
+    efficiency = table.value("efficiency", i)
+    avg_temperature = table.value("avg_temperature", i)
+    cell_imbalance = table.value("cell_imbalance", i)
     
     # 연식 정보
-    age_years = float(vehicle_row.get("age_years", "0").strip() or "0")
-    
-    # 기여도 계산 (가중치 적용)
-    contribution_eff = efficiency_score * 0.30
-    contribution_temp = temperature_score * 0.15
-    contribution_cell = cell_imbalance_score * 0.15
-    contribution_driving = driving_habit_score * 0.15
-    contribution_charging = charging_pattern_score * 0.15
-    
-    # 점수 변화량 (임시로 0으로 설정, 실제로는 이전 값과 비교 필요)
-    change_eff = 0.0  # 실제로는 이전 점수와 비교
-    change_temp = 0.0
-    change_cell = 0.0
-    change_driving = 0.0
-    change_charging = 0.0
+    age_years = num("age_years")
+    
+    # 기여도 (가중치 적용, 로드 시 계산된 파생 컬럼)
+    contribution_eff = num("efficiency_contribution")
+    contribution_temp = num("temperature_contribution")
+    contribution_cell = num("cell_imbalance_contribution")
+    contribution_driving = num("driving_habit_contribution")
+    contribution_charging = num("charging_pattern_contribution")
+    
+    # 점수 변화량 (점수 이력의 최근 실행 - 이전 실행, 이력이 없으면 None)
+    changes = _score_history.changes(car_id)
+    
+    def change(column):
+        value = changes[column]
+        return round(value, 1) if value is not None else None
     
     return jsonify({
         "basic_info": {
@@ -814,12 +1234,7 @@ def api_vehicle_detail(car_id):
             "last_date": last_date,
             "total_rows": total_rows
         },
-        "section_counts": {
-            "drive": drive_count,
-            "parking": parking_count,
-            "fast_charge": fast_charge,
-            "slow_charge": slow_charge
-        },
+        "section_counts": section_counts,
         "battery_score": {
             "final_score": round(final_score, 1),
             "scores": {
@@ -843,34 +1258,34 @@ def api_vehicle_detail(car_id):
         "contribution_details": {
             "efficiency": {
                 "score": round(efficiency_score, 1),
-                "change": round(change_eff, 1),
-                "value": round(float(efficiency), 2) if efficiency else None,
+                "change": change("efficiency_score"),
+                "value": round(efficiency, 2) if efficiency is not None else None,
                 "unit": "km/kWh",
                 "percentile": percentiles["efficiency"],
                 "contribution": round(contribution_eff, 1),
-                "summary": f"효율 {round(float(efficiency), 2) if efficiency else 'N/A'} km/kWh → 점수 {round(efficiency_score, 1)} (백분위 {percentiles['efficiency']}%) · 기여 {round(contribution_eff, 1)}점" if efficiency else "효율 데이터 없음"
+                "summary": f"효율 {round(efficiency, 2) if efficiency is not None else 'N/A'} km/kWh → 점수 {round(efficiency_score, 1)} (백분위 {percentiles['efficiency']}%) · 기여 {round(contribution_eff, 1)}점" if efficiency is not None else "효율 데이터 없음"
             },
             "temperature": {
                 "score": round(temperature_score, 1),
-                "change": round(change_temp, 1),
-                "value": round(float(avg_temperature), 1) if avg_temperature else None,
+                "change": change("temperature_score"),
+                "value": round(avg_temperature, 1) if avg_temperature is not None else None,
                 "unit": "℃",
                 "percentile": percentiles["temperature"],
                 "contribution": round(contribution_temp, 1),
-                "summary": f"평균 온도 {round(float(avg_temperature), 1) if avg_temperature else 'N/A'}℃ → 점수 {round(temperature_score, 1)} (백분위 {percentiles['temperature']}%) · 기여 {round(contribution_temp, 1)}점" if avg_temperature else "온도 데이터 없음"
+                "summary": f"평균 온도 {round(avg_temperature, 1) if avg_temperature is not None else 'N/A'}℃ → 점수 {round(temperature_score, 1)} (백분위 {percentiles['temperature']}%) · 기여 {round(contribution_temp, 1)}점" if avg_temperature is not None else "온도 데이터 없음"
             },
             "cell_imbalance": {
                 "score": round(cell_imbalance_score, 1),
-                "change": round(change_cell, 1),
-                "value": round(float(cell_imbalance), 4) if cell_imbalance else None,
+                "change": change("cell_imbalance_score"),
+                "value": round(cell_imbalance, 4) if cell_imbalance is not None else None,
                 "unit": "V",
                 "percentile": percentiles["cell_imbalance"],
                 "contribution": round(contribution_cell, 1),
-                "summary": f"평균 셀 편차 {round(float(cell_imbalance), 4) if cell_imbalance else 'N/A'} V → 점수 {round(cell_imbalance_score, 1)} (백분위 {percentiles['cell_imbalance']}%) · 기여 {round(contribution_cell, 1)}점" if cell_imbalance else "셀 밸런스 데이터 없음"
+                "summary": f"평균 셀 편차 {round(cell_imbalance, 4) if cell_imbalance is not None else 'N/A'} V → 점수 {round(cell_imbalance_score, 1)} (백분위 {percentiles['cell_imbalance']}%) · 기여 {round(contribution_cell, 1)}점" if cell_imbalance is not None else "셀 밸런스 데이터 없음"
             },
             "driving_habit": {
                 "score": round(driving_habit_score, 1),
-                "change": round(change_driving, 1),
+                "change": change("driving_habit_score"),
                 "value": round(driving_habit_score, 1),
                 "unit": "점",
                 "percentile": percentiles["driving_habit"],
@@ -879,7 +1294,7 @@ def api_vehicle_detail(car_id):
             },
             "charging_pattern": {
                 "score": round(charging_pattern_score, 1),
-                "change": round(change_charging, 1),
+                "change": change("charging_pattern_score"),
                 "value": round(charging_pattern_score, 1),
                 "unit": "점",
                 "percentile": percentiles["charging_pattern"],
@@ -895,6 +1310,395 @@ def api_vehicle_detail(car_id):
         }
     })
 
+# 차량별 시계열 API (구간 통계 필드)
+# 상세 화면 지표 키 → 필드
+TIMESERIES_METRICS = {
+    "efficiency": "km_per_kWh",
+    "temperature": "temp_mean",
+    "cell_imbalance": "cell_volt_diff",
+    "driving_habit": "accel_std",
+    "brake": "brake_std",
+    "charging_pattern": "energy_kwh"  # 충전 구간별 충전량 (급속/완속)
+}
+# segment_stats_drive가 아닌 필드의 measurement
+TIMESERIES_FIELD_MEASUREMENTS = {
+    "energy_kwh": ("segment_stats_fast_charge", "segment_stats_slow_charge")
+}
+# InfluxDB 사전 집계 간격 (요청 구간/포인트 수에 맞는 가장 촘촘한 간격 선택, 모두 하루를 나누므로 월 경계에 정렬됨)
+_timeseries_steps = [("10m", 600), ("1h", 3600), ("6h", 21600), ("1d", 86400)]
+_timeseries_points_default = 400
+_timeseries_points_max = 2000
+_timeseries_default_days = 730
+# 월 단위 캐시: 닫힌 월(끝난 지 하루 이상 지난 월)은 만료 없이 보관, 진행 중인 월은 짧게 캐시
+# InfluxDB 원본 데이터라 버전 무효화는 없고(버전 None), 진행 중인 월은 키에 _timeseries_open_ttl초 단위
+# 시간 버킷을 넣어 버킷이 바뀌면 새로 조회 (이전 버킷 항목은 LRU로 밀려남)
+# (car_id, 필드, 간격, 월 시작, 시간 버킷 또는 None) -> (시각 목록, 값 목록)
+_timeseries_cache = VersionedCache("timeseries", max_bytes=32 * 1024 * 1024,
+                                   sizeof=lambda chunk: 16 * len(chunk[0]))  # 포인트당 시각 + 값
+_timeseries_open_ttl = 60
+_timeseries_late_seconds = 86400  # 늦게 들어오는 데이터를 고려해 월이 끝나고 하루가 지나야 닫힌 것으로 간주
+
+def _next_month(month):
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+def _month_starts(start_dt, stop_dt):
+    """start_dt가 속한 월부터 stop_dt 직전까지의 월 시작 시각 목록 (UTC)"""
+    month = datetime(start_dt.year, start_dt.month, 1, tzinfo=timezone.utc)
+    months = []
+    while month < stop_dt:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+def _query_timeseries_span(car_id, field, step, span_start, span_stop):
+    """span 구간을 step 간격 평균으로 조회 → [(epoch 초, 값)] (시각순)"""
+    URL, TOKEN, ORG, BUCKET = _load_cfg()
+    measurements = TIMESERIES_FIELD_MEASUREMENTS.get(field, ("segment_stats_drive",))
+    measurement_pred = " or ".join(f'r._measurement=="{m}"' for m in measurements)
+    flux = f'''
+from(bucket:"{BUCKET}")
+  |> range(start: {span_start.strftime("%Y-%m-%dT%H:%M:%SZ")}, stop: {span_stop.strftime("%Y-%m-%dT%H:%M:%SZ")})
+  |> filter(fn:(r)=> ({measurement_pred}) and r._field=="{field}" and r["car_id"]=="{car_id}")
+  |> group()
+  |> aggregateWindow(every: {step}, fn: mean, createEmpty: false, timeSrc: "_start")
+  |> keep(columns: ["_time", "_value"])
+'''
+    rows = []
+    with InfluxDBClient(url=URL, token=TOKEN, org=ORG, timeout=60_000) as client:
+        for table in client.query_api().query(flux, org=ORG):
+            for record in table.records:
+                value = record.get_value()
+                if value is not None:
+                    rows.append((record.get_time().timestamp(), float(value)))
+    rows.sort()
+    return rows
+
+def _query_timeseries_months(car_id, field, step, months):
+    """연속된 월들을 한 번의 쿼리로 조회 → {월 시작: (시각 목록, 값 목록)} (데이터가 없는 월은 빈 목록)"""
+    rows = _query_timeseries_span(car_id, field, step, months[0], _next_month(months[-1]))
+    by_month = {month: ([], []) for month in months}
+    for ts, value in rows:
+        moment = datetime.fromtimestamp(ts, tz=timezone.utc)
+        chunk = by_month.get(datetime(moment.year, moment.month, 1, tzinfo=timezone.utc))
+        if chunk is not None:
+            chunk[0].append(ts)
+            chunk[1].append(value)
+    return by_month
+
+def _get_timeseries(car_id, field, step, start_dt, stop_dt):
+    """월 단위 캐시를 채워 [start_dt, stop_dt) 구간의 (시각 목록, 값 목록) 반환
+    캐시에 없는 월들은 한 번의 쿼리로 조회한 뒤 월별로 나눠 저장
+    (첫 번째 빠진 월의 계산으로 조회하므로 같은 구간을 동시에 요청해도 쿼리는 한 번)"""
+    now_ts = time.time()
+    months = _month_starts(start_dt, stop_dt)
+    
+    def key_of(month):
+        closed = _next_month(month).timestamp() + _timeseries_late_seconds <= now_ts
+        return (car_id, field, step, month, None if closed else int(now_ts // _timeseries_open_ttl))
+    
+    chunks = {}
+    missing = []
+    for month in months:
+        chunk = _timeseries_cache.peek(key_of(month), None)
+        if chunk is not None:
+            chunks[month] = chunk
+        else:
+            missing.append(month)
+    
+    if missing:
+        def fetch_missing():
+            by_month = _query_timeseries_months(car_id, field, step, missing)
+            for month in missing[1:]:
+                _timeseries_cache.get(key_of(month), None, lambda chunk=by_month[month]: chunk)
+            return by_month[missing[0]]
+        
+        chunks[missing[0]] = _timeseries_cache.get(key_of(missing[0]), None, fetch_missing)
+        for month in missing[1:]:
+            # 보통 위 조회에서 저장됨 (그 사이 밀려난 경우에만 해당 월만 다시 조회)
+            chunks[month] = _timeseries_cache.get(
+                key_of(month), None,
+                lambda month=month: _query_timeseries_months(car_id, field, step, [month])[month])
+    
+    start_ts = start_dt.timestamp()
+    stop_ts = stop_dt.timestamp()
+    times = []
+    values = []
+    for month in months:
+        chunk_times, chunk_values = chunks[month]
+        for ts, value in zip(chunk_times, chunk_values):
+            if start_ts <= ts < stop_ts:
+                times.append(ts)
+                values.append(value)
+    return times, values
+
+def _lttb(times, values, threshold):
+    """Largest-Triangle-Three-Buckets 다운샘플링 (첫/마지막 포인트 유지, 모양 보존)"""
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return times, values
+    
+    sampled_times = [times[0]]
+    sampled_values = [values[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 다음 버킷의 평균점
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_count = avg_end - avg_start
+        avg_t = sum(times[avg_start:avg_end]) / avg_count
+        avg_v = sum(values[avg_start:avg_end]) / avg_count
+        
+        # 현재 버킷에서 (이전 선택점, 다음 버킷 평균점)과 만드는 삼각형 넓이가 가장 큰 점 선택
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        max_area = -1.0
+        selected = range_start
+        for j in range(range_start, range_end):
+            area = abs((times[a] - avg_t) * (values[j] - values[a]) -
+                       (times[a] - times[j]) * (avg_v - values[a]))
+            if area > max_area:
+                max_area = area
+                selected = j
+        sampled_times.append(times[selected])
+        sampled_values.append(values[selected])
+        a = selected
+    
+    sampled_times.append(times[-1])
+    sampled_values.append(values[-1])
+    return sampled_times, sampled_values
+
+def _minmax_downsample(times, values, threshold):
+    """버킷별 최소/최대 두 점 유지 (피크 보존, 결과는 threshold개 이하)"""
+    n = len(values)
+    buckets = max(1, threshold // 2)
+    if n <= threshold:
+        return times, values
+    
+    sampled_times = []
+    sampled_values = []
+    for b in range(buckets):
+        lo = b * n // buckets
+        hi = (b + 1) * n // buckets
+        if lo >= hi:
+            continue
+        i_min = min(range(lo, hi), key=values.__getitem__)
+        i_max = max(range(lo, hi), key=values.__getitem__)
+        for i in sorted({i_min, i_max}):
+            sampled_times.append(times[i])
+            sampled_values.append(values[i])
+    return sampled_times, sampled_values
+
+@app.route('/api/vehicle-timeseries/<car_id>')
+def api_vehicle_timeseries(car_id):
+    """차량별 지표 시계열 API (상세 화면 추이 차트용)
+    
+    Query:
+        metric: efficiency/temperature/cell_imbalance/driving_habit/brake/charging_pattern
+        start/stop: ISO 날짜 (기본: 수집 시작일 또는 최근 2년 ~ 현재)
+        points: 최대 포인트 수 (기본 400, 차트 픽셀 폭에 맞춤), method: lttb(기본)/minmax
+    
+    InfluxDB에서는 포인트 수에 맞는 간격으로 평균 집계만 하고 서버에서 다운샘플링"""
+    from flask import request
+    
+    metric = request.args.get('metric', 'efficiency')
+    field = TIMESERIES_METRICS.get(metric)
+    if field is None:
+        return jsonify({"error": f"시계열을 제공하지 않는 지표입니다: {metric}"}), 400
+    method = request.args.get('method', 'lttb')
+    if method not in ('lttb', 'minmax'):
+        return jsonify({"error": f"잘못된 다운샘플링 방식입니다: {method}"}), 400
+    
+    table = _get_fleet_table()
+    i = table.row_index(car_id)
+    if i is None:
+        return jsonify({"error": "차량을 찾을 수 없습니다"}), 404
+    
+    try:
+        points = min(max(int(request.args.get('points', _timeseries_points_default)), 3), _timeseries_points_max)
+        now = datetime.now(timezone.utc)
+        if request.args.get('stop'):
+            stop_dt = datetime.fromisoformat(request.args['stop'].replace('Z', '+00:00'))
+        else:
+            stop_dt = now
+        if request.args.get('start'):
+            start_dt = datetime.fromisoformat(request.args['start'].replace('Z', '+00:00'))
+        elif not is_missing(table.times["first_ts"][i]):
+            start_dt = datetime.fromtimestamp(table.times["first_ts"][i], tz=timezone.utc)
+        else:
+            start_dt = stop_dt - timedelta(days=_timeseries_default_days)
+    except ValueError:
+        return jsonify({"error": "points/start/stop 값이 올바르지 않습니다"}), 400
+    start_dt = start_dt if start_dt.tzinfo else start_dt.replace(tzinfo=timezone.utc)
+    stop_dt = min(stop_dt if stop_dt.tzinfo else stop_dt.replace(tzinfo=timezone.utc), now)
+    if start_dt >= stop_dt:
+        return jsonify({"error": "start가 stop보다 앞서야 합니다"}), 400
+    
+    # 다운샘플링 전 포인트가 요청 포인트의 4배 이내가 되는 가장 촘촘한 집계 간격
+    span_seconds = (stop_dt - start_dt).total_seconds()
+    step = _timeseries_steps[-1][0]
+    for candidate, candidate_seconds in _timeseries_steps:
+        if span_seconds / candidate_seconds <= points * 4:
+            step = candidate
+            break
+    
+    try:
+        times, values = _get_timeseries(car_id, field, step, start_dt, stop_dt)
+    except Exception as e:
+        print(f"[error] 시계열 조회 실패 {car_id} {field}: {e}")
+        return jsonify({"error": "시계열 데이터를 조회할 수 없습니다"}), 503
+    
+    raw_count = len(values)
+    if method == 'lttb':
+        times, values = _lttb(times, values, points)
+    else:
+        times, values = _minmax_downsample(times, values, points)
+    
+    return jsonify({
+        "car_id": car_id,
+        "metric": metric,
+        "field": field,
+        "start": start_dt.isoformat(),
+        "stop": stop_dt.isoformat(),
+        "step": step,
+        "method": method,
+        "raw_count": raw_count,
+        "t": [int(ts) for ts in times],
+        "v": [round(value, 4) for value in values]
+    })
+
+# 셀 전압 행렬 API (betterwhy_data의 셀별 전압 필드 → 셀 × 시간 버킷 평균/표준편차/범위)
+_cell_field_pattern = re.compile(r"^cell[ _]?(\d+)$")
+_cell_matrix_default_days = 30
+_cell_matrix_buckets_default = 60
+_cell_matrix_buckets_max = 240
+# 행렬 캐시: 닫힌 구간(끝난 지 하루 이상)은 만료 없이, 진행 중인 구간은 _cell_matrix_open_ttl초 단위 시간 버킷을 키에 포함
+# (car_id, 시작, 끝, 버킷 수, 시간 버킷 또는 None) -> 응답 캐시 항목
+_cell_matrix_cache = VersionedCache("cell_matrix", max_bytes=16 * 1024 * 1024, sizeof=_body_entry_size)
+_cell_matrix_open_ttl = 600
+
+def _float32_base64(values):
+    """float32 little-endian 바이트를 base64 문자열로 (브라우저에서 Float32Array로 바로 사용)"""
+    data = array("f", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return base64.b64encode(data.tobytes()).decode("ascii")
+
+def _query_cell_matrix(car_id, start_ts, stop_ts, step_seconds, buckets):
+    """셀별 전압을 step 간격으로 평균/표준편차/범위(spread) 집계 → 셀 × 버킷 행렬 (값 없음 = NaN)"""
+    URL, TOKEN, ORG, BUCKET = _load_cfg()
+    start_str = datetime.fromtimestamp(start_ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    stop_str = datetime.fromtimestamp(stop_ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    flux = f'''
+data = from(bucket:"{BUCKET}")
+  |> range(start: {start_str}, stop: {stop_str})
+  |> filter(fn:(r)=> r._measurement=="betterwhy_data" and r["car_id"]=="{car_id}" and r._field =~ /^cell[ _]?[0-9]+$/)
+  |> group(columns: ["_field"])
+
+data |> aggregateWindow(every: {step_seconds}s, fn: mean, createEmpty: false, timeSrc: "_start") |> yield(name: "mean")
+data |> aggregateWindow(every: {step_seconds}s, fn: stddev, createEmpty: false, timeSrc: "_start") |> yield(name: "std")
+data |> aggregateWindow(every: {step_seconds}s, fn: spread, createEmpty: false, timeSrc: "_start") |> yield(name: "range")
+'''
+    cells = {}  # 셀 번호 -> {통계: {버킷: 값}}
+    with InfluxDBClient(url=URL, token=TOKEN, org=ORG, timeout=120_000) as client:
+        for table in client.query_api().query(flux, org=ORG):
+            for record in table.records:
+                match = _cell_field_pattern.match(record.get_field() or "")
+                value = record.get_value()
+                if not match or value is None:
+                    continue
+                b = int((record.get_time().timestamp() - start_ts) // step_seconds)
+                if 0 <= b < buckets:
+                    stats = cells.setdefault(int(match.group(1)), {"mean": {}, "std": {}, "range": {}})
+                    stats[record.values.get("result")][b] = float(value)
+    
+    cell_numbers = sorted(cells)
+    matrices = {}
+    for stat in ("mean", "std", "range"):
+        matrices[stat] = [
+            cells[cell][stat].get(b, math.nan) for cell in cell_numbers for b in range(buckets)
+        ]
+    return cell_numbers, matrices
+
+@app.route('/api/vehicle-cell-matrix/<car_id>')
+def api_vehicle_cell_matrix(car_id):
+    """셀 전압 행렬 API (셀 밸런스 상세 차트용)
+    
+    Query:
+        start/stop: ISO 날짜 (기본: 최근 30일, 오늘 0시(UTC)까지), buckets: 시간 버킷 수 (기본 60)
+    
+    응답의 mean/std/range는 셀 우선 순서(셀 i, 버킷 b → i * 버킷 수 + b)의 float32 little-endian base64,
+    값이 없는 칸은 NaN. 전압 단위 V"""
+    from flask import request
+    
+    table = _get_fleet_table()
+    if table.row_index(car_id) is None:
+        return jsonify({"error": "차량을 찾을 수 없습니다"}), 404
+    
+    try:
+        buckets = min(max(int(request.args.get('buckets', _cell_matrix_buckets_default)), 1), _cell_matrix_buckets_max)
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        stop_dt = datetime.fromisoformat(request.args['stop'].replace('Z', '+00:00')) if request.args.get('stop') else today
+        start_dt = (datetime.fromisoformat(request.args['start'].replace('Z', '+00:00')) if request.args.get('start')
+                    else stop_dt - timedelta(days=_cell_matrix_default_days))
+    except ValueError:
+        return jsonify({"error": "buckets/start/stop 값이 올바르지 않습니다"}), 400
+    start_ts = (start_dt if start_dt.tzinfo else start_dt.replace(tzinfo=timezone.utc)).timestamp()
+    stop_ts = (stop_dt if stop_dt.tzinfo else stop_dt.replace(tzinfo=timezone.utc)).timestamp()
+    if start_ts >= stop_ts:
+        return jsonify({"error": "start가 stop보다 앞서야 합니다"}), 400
+    
+    # 버킷 간격은 분 단위로 올림, 시작 시각은 간격 배수로 내림 (InfluxDB 윈도우 경계와 버킷 경계를 맞춤)
+    step_seconds = max(60, math.ceil((stop_ts - start_ts) / buckets / 60) * 60)
+    start_ts = start_ts // step_seconds * step_seconds
+    buckets = min(buckets, math.ceil((stop_ts - start_ts) / step_seconds))
+    
+    now_ts = time.time()
+    closed = stop_ts + _timeseries_late_seconds <= now_ts
+    key = (car_id, start_ts, stop_ts, buckets, None if closed else int(now_ts // _cell_matrix_open_ttl))
+    
+    def build():
+        cell_numbers, matrices = _query_cell_matrix(car_id, start_ts, stop_ts, step_seconds, buckets)
+        return _json_body_entry({
+            "car_id": car_id,
+            "start": datetime.fromtimestamp(start_ts, tz=timezone.utc).isoformat(),
+            "stop": datetime.fromtimestamp(stop_ts, tz=timezone.utc).isoformat(),
+            "step_seconds": step_seconds,
+            "cells": cell_numbers,
+            "times": [int(start_ts + b * step_seconds) for b in range(buckets)],
+            "encoding": "float32-le-base64",
+            "mean": _float32_base64(matrices["mean"]),
+            "std": _float32_base64(matrices["std"]),
+            "range": _float32_base64(matrices["range"])
+        })
+    
+    try:
+        entry = _cell_matrix_cache.get(key, None, build)
+    except Exception as e:
+        print(f"[error] 셀 전압 행렬 조회 실패 {car_id}: {e}")
+        return jsonify({"error": "셀 전압 데이터를 조회할 수 없습니다"}), 503
+    return _cached_json_response(entry)
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    parser = argparse.ArgumentParser(description="Baas 대시보드 서버")
+    parser.add_argument("--publish-snapshot", nargs="?", const=str(DEFAULT_SNAPSHOT_PATH), metavar="PATH",
+                        help="서버 대신 스냅샷 로더로 실행: db datasets 변경 시 PATH에 스냅샷을 새로 쓰고, "
+                             "InfluxDB 통계 갱신과 차종 CSV 내보내기도 이 프로세스에서 실행 "
+                             f"(기본: {DEFAULT_SNAPSHOT_PATH})")
+    parser.add_argument("--export-car-types", action="store_true",
+                        help="서버 대신 오늘 날짜의 차종 CSV 내보내기만 1회 실행 (cron 등 외부 스케줄러용)")
+    args = parser.parse_args()
+    
+    if args.export_car_types:
+        _register_jobs(shared_owner=True)
+        sys.exit(0 if _run_job("car_type_export") else 1)
+    elif args.publish_snapshot:
+        # 로더 프로세스가 InfluxDB 통계 갱신과 차종 CSV 내보내기도 담당 (워커들은 결과 파일만 읽음)
+        # 데이터셋은 스냅샷 발행 루프의 로더 하나로만 파싱하고, 차종 CSV 내보내기도 같은 로더의 테이블 사용
+        _fleet_loader = FleetLoader(HERE / "db datasets", check_interval=0)
+        _register_jobs(shared_owner=True, reload_dataset=False)
+        _ensure_scheduler()
+        publish_snapshots(HERE / "db datasets", Path(args.publish_snapshot), loader=_fleet_loader)
+    else:
+        app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,835 @@
+# -*- coding: utf-8 -*-
+"""
+차량 점수 테이블 - db datasets/*.csv를 로드 시 한 번만 파싱한 컬럼 기반 테이블
+- 점수/메트릭: float 배열 (값 없음 = NaN)
+- car_type, status: 범주형 코드 배열 + 범주 목록
+- first_date/last_date: 파싱된 timestamp 배열 (표시용 원문 문자열은 별도 보관)
+- 바이너리 스냅샷: 여러 서버 프로세스가 같은 파일을 읽기 전용으로 매핑해서 공유 (write_snapshot / SnapshotReader)
+"""
+import csv
+import hashlib
+import io
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+NAN = float("nan")
+
+# 숫자 컬럼 (CSV 문자열 → float, 빈 값/파싱 실패는 NaN)
+FLOAT_COLUMNS = [
+    "age_years",
+    "efficiency",
+    "efficiency_score",
+    "avg_temperature",
+    "temperature_score",
+    "cell_imbalance",
+    "cell_imbalance_score",
+    "driving_habit_score",
+    "charging_count",
+    "avg_charging_amount",
+    "charging_pattern_score",
+    "weighted_avg",
+    "age_penalty",
+    "final_score",
+    # 구간 종류별 구간 수 (점수 계산 시 그룹 count() 쿼리로 조회, 이전 데이터셋에는 없음 = NaN)
+    "drive_count",
+    "parking_count",
+    "fast_charge_count",
+    "slow_charge_count",
+]
+
+# 원문 그대로 응답에 쓰는 문자열 컬럼
+TEXT_COLUMNS = [
+    "model_year",
+    "model_month",
+    "age_string",
+    "collection_period",
+    "first_date",
+    "last_date",
+]
+
+# 범주형 컬럼 (코드 배열 + 범주 목록)
+CATEGORY_COLUMNS = ["car_type", "status"]
+
+# 백분위 계산용 정렬 배열을 미리 만드는 점수 컬럼
+RANKED_COLUMNS = [
+    "efficiency_score",
+    "temperature_score",
+    "cell_imbalance_score",
+    "driving_habit_score",
+    "charging_pattern_score",
+]
+
+# 파싱된 시각 컬럼 (POSIX timestamp, 값 없음 = NaN)
+TIME_COLUMNS = {"first_ts": "first_date", "last_ts": "last_date"}
+
+# 차량 목록 API에서 정렬 가능한 컬럼 (로드 시 정렬 인덱스 생성)
+SORTABLE_COLUMNS = ["final_score", "weighted_avg", "efficiency", "age_penalty"] + RANKED_COLUMNS
+
+# 차종 × 등급 집계 큐브에 쌓는 컬럼
+CUBE_COLUMNS = RANKED_COLUMNS + ["final_score", "age_penalty"]
+
+# 점수 분포 히스토그램 (큐브 셀마다 로드 시 한 번 계산)
+HISTOGRAM_COLUMNS = ["final_score"] + RANKED_COLUMNS
+HISTOGRAM_EDGES = list(range(0, 101, 5))  # 5점 단위 20개 구간, 마지막 구간은 100점 포함 (범위 밖 값은 양 끝 구간)
+
+def score_histogram(sorted_values) -> List[int]:
+    """정렬된 값 → HISTOGRAM_EDGES 구간별 개수 (구간 경계마다 이진 탐색)"""
+    positions = [0] + [bisect_left(sorted_values, edge) for edge in HISTOGRAM_EDGES[1:-1]] + [len(sorted_values)]
+    return [positions[k + 1] - positions[k] for k in range(len(positions) - 1)]
+
+# 등급 구간 (final_score 기준)
+GRADES = ["excellent", "good", "normal", "bad"]
+
+def grade_key(score: float) -> Optional[str]:
+    """final_score → 등급 키 (값이 없으면 None)"""
+    if math.isnan(score):
+        return None
+    if score >= 85:
+        return "excellent"
+    if score >= 70:
+        return "good"
+    if score >= 55:
+        return "normal"
+    return "bad"
+
+# 점수 항목 (이름, 점수 컬럼, 최종 점수 가중치) - 감점/기여도 파생 컬럼의 기준
+SCORE_COMPONENTS = [
+    ("efficiency", "efficiency_score", 0.30),
+    ("temperature", "temperature_score", 0.15),
+    ("cell_imbalance", "cell_imbalance_score", 0.15),
+    ("driving_habit", "driving_habit_score", 0.15),
+    ("charging_pattern", "charging_pattern_score", 0.15),
+]
+
+# 로드 시 한 번 계산하는 파생 숫자 컬럼 (점수가 없으면 0점으로 계산, 상세 API와 동일)
+# {항목}_penalty = max(0, 100 - 점수) × 가중치, {항목}_contribution = 점수 × 가중치
+DERIVED_FLOAT_COLUMNS = ([f"{name}_penalty" for name, _, _ in SCORE_COMPONENTS] +
+                         [f"{name}_contribution" for name, _, _ in SCORE_COMPONENTS])
+
+def _parse_float(value: Optional[str]) -> float:
+    value = (value or "").strip()
+    if not value:
+        return NAN
+    try:
+        return float(value)
+    except ValueError:
+        return NAN
+
+def _parse_timestamp(value: str) -> float:
+    if not value:
+        return NAN
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return NAN
+
+def _recency(last_date: str) -> float:
+    """중복 행 비교용 last_date timestamp (없거나 형식이 틀리면 가장 오래된 것으로 취급)"""
+    ts = _parse_timestamp(last_date)
+    return -math.inf if math.isnan(ts) else ts
+
+def is_missing(value: float) -> bool:
+    return math.isnan(value)
+
+class SortedRows:
+    """정렬 인덱스 - 값 오름차순 행 번호(rows), 값이 없는 행은 뒤쪽(present 이후)에 car_id 순으로
+    values는 값이 있는 앞쪽 present개 행의 값 (이진 탐색으로 값 구간 → 위치 구간 변환)"""
+
+    def __init__(self, rows: List[int], column_values: array, car_ids: List[str]):
+        present_rows = sorted((i for i in rows if not math.isnan(column_values[i])),
+                              key=lambda i: (column_values[i], car_ids[i]))
+        missing_rows = sorted((i for i in rows if math.isnan(column_values[i])), key=lambda i: car_ids[i])
+        self.rows = array("I", present_rows + missing_rows)
+        self.values = array("d", (column_values[i] for i in present_rows))
+        self.present = len(present_rows)
+
+    @classmethod
+    def from_arrays(cls, rows, values) -> "SortedRows":
+        """이미 정렬된 배열(스냅샷)로 생성"""
+        index = cls.__new__(cls)
+        index.rows = rows
+        index.values = values
+        index.present = len(values)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def window(self, min_value: Optional[float] = None, max_value: Optional[float] = None,
+               max_inclusive: bool = False) -> range:
+        """min_value <= 값 < max_value (max_inclusive면 <=)인 행의 위치 구간"""
+        lo = bisect_left(self.values, min_value) if min_value is not None else 0
+        if max_value is None:
+            hi = self.present
+        elif max_inclusive:
+            hi = bisect_right(self.values, max_value)
+        else:
+            hi = bisect_left(self.values, max_value)
+        return range(lo, max(lo, hi))
+
+class CubeCell:
+    """집계 큐브의 셀 하나 - 컬럼별 개수/합/제곱합과 정렬된 값(백분위 계산용), 점수 분포 히스토그램"""
+
+    def __init__(self):
+        self.rows = 0  # 셀에 속한 차량 수 (값이 없는 차량 포함)
+        self.count = {c: 0 for c in CUBE_COLUMNS}
+        self.sum = {c: 0.0 for c in CUBE_COLUMNS}
+        self.sumsq = {c: 0.0 for c in CUBE_COLUMNS}
+        self.sorted_values = {c: [] for c in CUBE_COLUMNS}
+        self.histograms = {}
+
+    def add(self, floats: Dict[str, array], i: int) -> None:
+        self.rows += 1
+        for column in CUBE_COLUMNS:
+            v = floats[column][i]
+            if math.isnan(v):
+                continue
+            self.count[column] += 1
+            self.sum[column] += v
+            self.sumsq[column] += v * v
+            self.sorted_values[column].append(v)
+
+    def finish(self) -> None:
+        self.sorted_values = {c: array("d", sorted(values)) for c, values in self.sorted_values.items()}
+        self.histograms = {c: score_histogram(self.sorted_values[c]) for c in HISTOGRAM_COLUMNS}
+
+    @classmethod
+    def from_snapshot(cls, meta: dict, sorted_values: Dict[str, array]) -> "CubeCell":
+        cell = cls.__new__(cls)
+        cell.rows = meta["rows"]
+        cell.count = meta["count"]
+        cell.sum = meta["sum"]
+        cell.sumsq = meta["sumsq"]
+        cell.sorted_values = sorted_values
+        cell.histograms = meta["histograms"]
+        return cell
+
+    def mean(self, column: str) -> float:
+        return self.sum[column] / self.count[column] if self.count[column] else 0.0
+
+    def std(self, column: str) -> float:
+        n = self.count[column]
+        if not n:
+            return 0.0
+        mean = self.sum[column] / n
+        return math.sqrt(max(0.0, self.sumsq[column] / n - mean * mean))
+
+    def percentile(self, column: str, value: float) -> float:
+        """셀 안에서 value보다 낮은 값의 비율(%)"""
+        sorted_values = self.sorted_values[column]
+        if not sorted_values or not value:
+            return 0
+        return round((bisect_left(sorted_values, value) / len(sorted_values)) * 100, 0)
+
+class FleetTable:
+    """차량 한 대 = 한 행(인덱스 i). 컬럼별 배열을 인덱스로 접근
+    로드 시 car_id → 행 인덱스와 점수 컬럼별 정렬 배열을 함께 만들어 조회/백분위를 O(1)/O(log n)으로 처리"""
+
+    def __init__(self, car_ids: List[str], floats: Dict[str, array], texts: Dict[str, List[str]],
+                 codes: Dict[str, array], categories: Dict[str, List[str]], times: Dict[str, array],
+                 derived: Optional[dict] = None):
+        self.car_ids = car_ids
+        self.floats = floats
+        self.texts = texts
+        self.codes = codes
+        self.categories = categories
+        self.times = times
+        self.version = None  # 데이터셋 버전 (FleetLoader가 설정, 내용이 같으면 같은 값)
+        self.duplicates = {}  # 파일명 -> 로드 시 버려진 car_id 중복 행 수 (중복이 있는 파일만)
+        self.index = {car_id: i for i, car_id in enumerate(car_ids)}
+        if derived is not None:
+            # 스냅샷에서 읽은 경우 파생 컬럼/정렬 배열/인덱스/큐브를 다시 만들지 않음
+            self.grade_codes = derived["grade_codes"]
+            self.sorted_scores = derived["sorted_scores"]
+            self.sort_index = derived["sort_index"]
+            self.score_cube = derived["score_cube"]
+            return
+        self._build_derived_columns()
+        self.sorted_scores = {
+            column: array("d", sorted(self.present(column))) for column in RANKED_COLUMNS
+        }
+        self.sort_index = self._build_sort_index()
+        self.score_cube = self._build_score_cube()
+
+    def __len__(self) -> int:
+        return len(self.car_ids)
+
+    def _build_derived_columns(self) -> None:
+        """요청마다 다시 계산하던 값을 로드 시 한 번만 계산
+        - grade_codes: GRADES 인덱스 (final_score 없음 = -1)
+        - 항목별 감점/기여도 (DERIVED_FLOAT_COLUMNS)
+        - charge_kwh_label: 평균 충전량 표시 문자열 ("12.34 kWh", 값 없음 = "")"""
+        self.grade_codes = array("b", (GRADES.index(g) if g is not None else -1
+                                       for g in map(grade_key, self.floats["final_score"])))
+        for name, column, weight in SCORE_COMPONENTS:
+            scores = [0.0 if math.isnan(v) else v for v in self.floats[column]]
+            self.floats[f"{name}_penalty"] = array("d", (max(0.0, 100 - v) * weight for v in scores))
+            self.floats[f"{name}_contribution"] = array("d", (v * weight for v in scores))
+        self.texts["charge_kwh_label"] = ["" if math.isnan(v) else f"{v:.2f} kWh"
+                                          for v in self.floats["avg_charging_amount"]]
+
+    def grade(self, i: int) -> Optional[str]:
+        """등급 키 (final_score 없음 = None)"""
+        code = self.grade_codes[i]
+        return GRADES[code] if code >= 0 else None
+
+    def _build_sort_index(self) -> Dict[str, Dict[Optional[int], SortedRows]]:
+        """차량 목록용 정렬 인덱스: 컬럼 → {None(전체) 또는 car_type 코드: SortedRows}
+        목록 대상은 final_score가 있는 차량 (대시보드 차량 목록과 동일)"""
+        final_scores = self.floats["final_score"]
+        listed = [i for i in range(len(self.car_ids)) if not math.isnan(final_scores[i])]
+        rows_by_type = {}
+        type_codes = self.codes["car_type"]
+        for i in listed:
+            rows_by_type.setdefault(type_codes[i], []).append(i)
+
+        sort_index = {}
+        for column in SORTABLE_COLUMNS:
+            values = self.floats[column]
+            by_key = {None: SortedRows(listed, values, self.car_ids)}
+            for code, rows in rows_by_type.items():
+                by_key[code] = SortedRows(rows, values, self.car_ids)
+            sort_index[column] = by_key
+        return sort_index
+
+    def _build_score_cube(self) -> Dict[tuple, CubeCell]:
+        """차종 × 등급 집계 큐브 (한 번의 순회로 생성)
+        키: (car_type 코드 또는 None=전체, 등급 키 또는 None=전체). 등급이 없는(final_score 없음) 차량은 전체 등급 셀에만 포함"""
+        cube = {}
+        type_codes = self.codes["car_type"]
+        for i in range(len(self.car_ids)):
+            code = type_codes[i]
+            grade = self.grade(i)
+            keys = [(code, None), (None, None)]
+            if grade is not None:
+                keys += [(code, grade), (None, grade)]
+            for key in keys:
+                cell = cube.get(key)
+                if cell is None:
+                    cell = cube[key] = CubeCell()
+                cell.add(self.floats, i)
+        for cell in cube.values():
+            cell.finish()
+        return cube
+
+    def cube_cell(self, car_type: Optional[str] = None, grade: Optional[str] = None) -> Optional[CubeCell]:
+        """차종/등급 조합의 집계 셀 (None = 전체, 해당 차량이 없으면 None)"""
+        code = None
+        if car_type is not None:
+            code = self.category_code("car_type", car_type)
+            if code is None:
+                return None
+        return self.score_cube.get((code, grade))
+
+    def value(self, column: str, i: int) -> Optional[float]:
+        """숫자 값 (없으면 None)"""
+        v = self.floats[column][i]
+        return None if math.isnan(v) else v
+
+    def text(self, column: str, i: int) -> str:
+        return self.texts[column][i]
+
+    def category(self, column: str, i: int) -> str:
+        return self.categories[column][self.codes[column][i]]
+
+    def category_code(self, column: str, name: str) -> Optional[int]:
+        """범주 이름의 코드 (테이블에 없는 범주면 None)"""
+        try:
+            return self.categories[column].index(name)
+        except ValueError:
+            return None
+
+    def present(self, column: str) -> List[float]:
+        """NaN을 제외한 값 목록"""
+        return [v for v in self.floats[column] if not math.isnan(v)]
+
+    def row_index(self, car_id: str) -> Optional[int]:
+        return self.index.get(car_id)
+
+    def percentile(self, column: str, value: float) -> float:
+        """전체 차량 중 value보다 낮은 점수의 비율(%) - 정렬 배열 이진 탐색"""
+        sorted_values = self.sorted_scores[column]
+        if not sorted_values or not value:
+            return 0
+        count_below = bisect_left(sorted_values, value)
+        return round((count_below / len(sorted_values)) * 100, 0)
+
+class _TableBuilder:
+    def __init__(self):
+        self.car_ids = []
+        self.floats = {c: array("d") for c in FLOAT_COLUMNS}
+        self.texts = {c: [] for c in TEXT_COLUMNS}
+        self.codes = {c: array("H") for c in CATEGORY_COLUMNS}
+        self.categories = {c: [] for c in CATEGORY_COLUMNS}
+        self._category_index = {c: {} for c in CATEGORY_COLUMNS}
+        self.duplicates = 0  # 파싱 중 버려진 파일 내 중복 행 수
+
+    def add(self, car_id: str, row: Dict[str, str]) -> None:
+        self.car_ids.append(car_id)
+        for column in FLOAT_COLUMNS:
+            self.floats[column].append(_parse_float(row.get(column)))
+        for column in TEXT_COLUMNS:
+            self.texts[column].append((row.get(column) or "").strip())
+        for column in CATEGORY_COLUMNS:
+            self._add_category(column, (row.get(column) or "").strip())
+
+    def add_from(self, part: "_TableBuilder", j: int) -> None:
+        """다른 빌더(파일별 파싱 결과)의 j번째 행을 복사 (다시 파싱하지 않음)"""
+        self.car_ids.append(part.car_ids[j])
+        for column in FLOAT_COLUMNS:
+            self.floats[column].append(part.floats[column][j])
+        for column in TEXT_COLUMNS:
+            self.texts[column].append(part.texts[column][j])
+        for column in CATEGORY_COLUMNS:
+            self._add_category(column, part.categories[column][part.codes[column][j]])
+
+    def _add_category(self, column: str, name: str) -> None:
+        index = self._category_index[column]
+        if name not in index:
+            index[name] = len(self.categories[column])
+            self.categories[column].append(name)
+        self.codes[column].append(index[name])
+
+    def build(self) -> FleetTable:
+        times = {
+            ts_column: array("d", (_parse_timestamp(v) for v in self.texts[text_column]))
+            for ts_column, text_column in TIME_COLUMNS.items()
+        }
+        return FleetTable(self.car_ids, self.floats, self.texts, self.codes, self.categories, times)
+
+def _parse_file(name: str, data: bytes) -> _TableBuilder:
+    """CSV 파일 하나를 파싱 (파일 내 car_id 중복은 last_date가 가장 최근인 행 유지, 같으면 먼저 나온 행)
+    행 순서는 car_id가 처음 나온 위치 기준"""
+    part = _TableBuilder()
+    rows = {}
+    try:
+        for row in csv.DictReader(io.StringIO(data.decode("utf-8-sig"))):
+            car_id = (row.get("car_id") or "").strip() or (row.get("client_id") or "").strip()
+            if not car_id:
+                continue
+            kept = rows.get(car_id)
+            if kept is not None:
+                part.duplicates += 1
+                if _recency(row.get("last_date")) <= _recency(kept.get("last_date")):
+                    continue
+            rows[car_id] = row
+    except Exception as e:
+        print(f"[warn] CSV 파일 읽기 실패 {name}: {e}")
+    for car_id, row in rows.items():
+        part.add(car_id, row)
+    return part
+
+# 이보다 작은 데이터셋은 순차 파싱 (프로세스 풀 시작/결과 전달 비용이 파싱 시간보다 큼)
+PARALLEL_PARSE_MIN_BYTES = 1024 * 1024
+
+def _parse_files(items: List[tuple]) -> List[_TableBuilder]:
+    """(파일명, 내용) 목록을 파싱 - 파일이 여럿이고 합계가 PARALLEL_PARSE_MIN_BYTES 이상이면 코어 수만큼 프로세스로 병렬 파싱
+    결과 순서는 입력 순서와 같음 (병렬 여부와 무관하게 같은 결과)
+    재로드는 스케줄러 스레드에서 실행되므로 fork 대신 spawn으로 워커 생성 (다른 스레드가 잡은 락을 물려받지 않도록)"""
+    workers = min(len(items), os.cpu_count() or 1)
+    if workers > 1 and sum(len(data) for _, data in items) >= PARALLEL_PARSE_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                return list(pool.map(_parse_file, *zip(*items)))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"[warn] 병렬 파싱 실패, 순차 파싱으로 진행: {e}")
+    return [_parse_file(name, data) for name, data in items]
+
+def _merge_parts(parts: Dict[str, _TableBuilder]) -> FleetTable:
+    """파일별 파싱 결과(파일명 -> 빌더)를 병합 - car_id 중복은 아래 순서로 한 행만 유지 (glob 순서/파싱 순서와 무관)
+    1) last_date가 가장 최근인 행 2) 데이터가 가장 최근인 파일(파일 내 최대 last_date)의 행 3) 파일 이름 순으로 앞선 파일의 행
+    행 순서는 파일 이름 순 + 파일 내 순서, table.duplicates에 파일별로 버려진 행 수 기록 (파일 내 중복 포함)"""
+    names = sorted(parts)
+    recency = {name: [_recency(v) for v in parts[name].texts["last_date"]] for name in names}
+    newest = {name: max(recency[name], default=-math.inf) for name in names}
+    winners = {}  # car_id -> (비교 키, 파일명, 행)
+    for name in names:
+        for j, car_id in enumerate(parts[name].car_ids):
+            key = (recency[name][j], newest[name])
+            best = winners.get(car_id)
+            if best is None or key > best[0]:
+                winners[car_id] = (key, name, j)
+
+    merged = _TableBuilder()
+    duplicates = {name: parts[name].duplicates for name in names}
+    for name in names:
+        for j, car_id in enumerate(parts[name].car_ids):
+            _, winner_name, winner_row = winners[car_id]
+            if winner_name == name and winner_row == j:
+                merged.add_from(parts[name], j)
+            else:
+                duplicates[name] += 1
+    table = merged.build()
+    table.duplicates = {name: count for name, count in duplicates.items() if count}
+    return table
+
+def load_fleet_table(datasets_dir: Path) -> FleetTable:
+    """datasets_dir의 모든 CSV를 읽어 테이블 생성 (1회성 로드)"""
+    return FleetLoader(datasets_dir).get()
+
+class FleetLoader:
+    """db datasets 디렉토리의 변경을 감지하여 바뀐 파일만 다시 파싱하는 로더
+    - 파일 식별자(inode), 크기, mtime_ns가 그대로면 이전 파싱 결과 재사용
+    - 바뀐 파일도 내용 해시가 같으면 재사용, 병합 대상이 실제로 바뀐 경우에만 테이블과 버전 갱신
+    - 새로 파싱할 파일이 여럿이면 프로세스 풀로 병렬 파싱, 병합은 _merge_parts의 중복 규칙으로 결정적
+    - 디렉토리 확인은 check_interval초에 한 번, 그 사이와 변경이 없을 때는 캐시된 테이블을 계속 반환
+      (check_interval=math.inf면 get()은 최초 로드만 하고, 변경 확인은 refresh()를 호출하는 쪽에서 수행)
+    - cache_path가 주어지면 파싱/병합한 테이블을 바이너리 스냅샷으로 저장하고, 다음 시작 때 원본 파일의
+      이름/크기/mtime 해시가 같으면 CSV를 파싱하지 않고 스냅샷을 매핑 (이후 원본이 바뀌면 전체를 다시 파싱)"""
+
+    def __init__(self, datasets_dir: Path, check_interval: float = 2.0, cache_path: Optional[Path] = None):
+        self.datasets_dir = datasets_dir
+        self.check_interval = check_interval
+        self.cache_path = cache_path
+        self._files = {}  # 파일명 -> (stat_key, digest, 파싱 결과)
+        self._order = []
+        self._source_key = None  # 마지막으로 반영한 원본 파일 목록의 이름/크기/mtime 해시
+        self._table = None
+        self._last_check = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._table.version if self._table is not None else None
+
+    def get(self) -> FleetTable:
+        if self._is_fresh():
+            return self._table
+        with self._lock:
+            if not self._is_fresh():
+                self._refresh()
+                self._last_check = time.monotonic()
+            return self._table
+
+    def refresh(self) -> FleetTable:
+        """check_interval과 관계없이 바로 변경 확인 (백그라운드 작업용)"""
+        with self._lock:
+            self._refresh()
+            self._last_check = time.monotonic()
+            return self._table
+
+    def _is_fresh(self) -> bool:
+        return (self._table is not None and self._last_check is not None and
+                time.monotonic() - self._last_check < self.check_interval)
+
+    def _refresh(self) -> None:
+        paths = sorted(self.datasets_dir.glob("*.csv")) if self.datasets_dir.exists() else []
+        source_key = _source_key(paths)
+        if source_key == self._source_key and self._table is not None:
+            return
+        if self._table is None and self.cache_path is not None and self._load_cache(source_key):
+            self._source_key = source_key
+            return
+
+        files = {}
+        pending = []  # 새로 파싱할 (파일명, stat_key, digest, 내용)
+        changed = self._table is None
+        for path in paths:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            cached = self._files.get(path.name)
+            if cached and cached[0] == stat_key:
+                files[path.name] = cached
+                continue
+
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                print(f"[warn] CSV 파일 읽기 실패 {path}: {e}")
+                continue
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            if cached and cached[1] == digest:
+                # mtime만 바뀐 경우 (touch, 동일 내용 재저장)
+                files[path.name] = (stat_key, digest, cached[2])
+                continue
+
+            pending.append((path.name, stat_key, digest, data))
+            changed = True
+
+        if pending:
+            parsed = _parse_files([(name, data) for name, _, _, data in pending])
+            for (name, stat_key, digest, _), part in zip(pending, parsed):
+                files[name] = (stat_key, digest, part)
+
+        order = [path.name for path in paths if path.name in files]
+        if order != self._order:
+            changed = True  # 파일 추가/삭제
+
+        self._files = files
+        self._order = order
+        if changed:
+            table = _merge_parts({name: files[name][2] for name in order})
+            version_hash = hashlib.blake2b(digest_size=8)
+            for name in order:
+                version_hash.update(f"{name}:{files[name][1]};".encode("utf-8"))
+            table.version = version_hash.hexdigest()
+            self._table = table
+            print(f"[info] 데이터셋 로드: {len(table)}개 차량 (버전 {table.version})")
+            if table.duplicates:
+                dropped = ", ".join(f"{name} {count}행" for name, count in table.duplicates.items())
+                print(f"[info] car_id 중복 제거: {dropped}")
+            if self.cache_path is not None:
+                try:
+                    write_snapshot(table, self.cache_path, source_key=source_key)
+                except OSError as e:
+                    print(f"[warn] 데이터셋 캐시 저장 실패 {self.cache_path}: {e}")
+        self._source_key = source_key
+
+    def _load_cache(self, source_key: str) -> bool:
+        """원본 파일 해시가 일치하는 스냅샷 캐시가 있으면 테이블로 사용"""
+        try:
+            if read_snapshot_header(self.cache_path).get("source_key") != source_key:
+                return False
+            table = load_snapshot(self.cache_path)
+        except (OSError, ValueError) as e:
+            if self.cache_path.exists():
+                print(f"[warn] 데이터셋 캐시 로드 실패 (CSV에서 다시 로드) {self.cache_path}: {e}")
+            return False
+        self._table = table
+        print(f"[info] 데이터셋 캐시 로드: {len(table)}개 차량 (버전 {table.version})")
+        return True
+
+def _source_key(paths: List[Path]) -> str:
+    """원본 CSV 목록(파일 이름 순)의 이름/크기/mtime 해시"""
+    key_hash = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        key_hash.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+    return key_hash.hexdigest()
+
+# 바이너리 스냅샷: MAGIC(8) + 헤더 길이(uint64 LE) + 헤더 JSON + 8바이트 정렬된 배열 블록
+# 헤더에는 문자열 데이터(car_id, 텍스트, 범주 목록)와 블록 위치, 배열은 네이티브 바이트 순서 그대로 저장
+# (같은 호스트의 프로세스들이 mmap으로 복사 없이 공유하는 용도)
+SNAPSHOT_MAGIC = b"BAASFLT1"
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+def _snapshot_blocks(table: FleetTable):
+    """(블록 이름, 배열) 목록과 큐브 셀 메타데이터"""
+    blocks = []
+    for column, values in table.floats.items():
+        blocks.append((f"float/{column}", values))
+    for column, values in table.codes.items():
+        blocks.append((f"code/{column}", values))
+    blocks.append(("grade_codes", table.grade_codes))
+    for column, values in table.times.items():
+        blocks.append((f"time/{column}", values))
+    for column, values in table.sorted_scores.items():
+        blocks.append((f"ranked/{column}", values))
+    for column, by_key in table.sort_index.items():
+        for key, index in by_key.items():
+            name = f"sort/{column}/{'all' if key is None else key}"
+            blocks.append((f"{name}/rows", index.rows))
+            blocks.append((f"{name}/values", index.values))
+    cube = []
+    for n, ((code, grade), cell) in enumerate(table.score_cube.items()):
+        cube.append({"car_type": code, "grade": grade, "rows": cell.rows,
+                     "count": cell.count, "sum": cell.sum, "sumsq": cell.sumsq,
+                     "histograms": cell.histograms})
+        for column, values in cell.sorted_values.items():
+            blocks.append((f"cube/{n}/{column}", values))
+    return blocks, cube
+
+def write_snapshot(table: FleetTable, path: Path, source_key: Optional[str] = None) -> None:
+    """테이블을 바이너리 스냅샷으로 저장 - 임시 파일에 쓴 뒤 os.replace로 원자적 교체
+    (이미 매핑 중인 프로세스는 이전 파일을 계속 사용하다가 새 파일로 교체)
+    source_key: 데이터셋 캐시로 쓸 때 원본 파일 해시 (헤더에 기록)"""
+    blocks, cube = _snapshot_blocks(table)
+    directory = {}
+    offset = 0
+    for name, values in blocks:
+        typecode = getattr(values, "typecode", None) or values.format
+        directory[name] = [offset, typecode, len(values)]
+        offset = _align8(offset + len(values) * array(typecode).itemsize)
+
+    header = json.dumps({
+        "version": table.version,
+        "source_key": source_key,
+        "duplicates": table.duplicates,
+        "car_ids": table.car_ids,
+        "texts": table.texts,
+        "categories": table.categories,
+        "cube": cube,
+        "blocks": directory,
+    }, ensure_ascii=False).encode("utf-8")
+    data_start = _align8(16 + len(header))
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_start - 16 - len(header)))
+        for name, values in blocks:
+            data = values.tobytes()
+            f.write(data)
+            f.write(b"\0" * (_align8(len(data)) - len(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def read_snapshot_header(path: Path) -> dict:
+    """스냅샷 헤더(JSON)만 읽음 - 배열 블록은 매핑하지 않음"""
+    with open(path, "rb") as f:
+        prefix = f.read(16)
+        if len(prefix) < 16 or prefix[:8] != SNAPSHOT_MAGIC:
+            raise ValueError(f"스냅샷 형식이 아닙니다: {path}")
+        header_len = struct.unpack_from("<Q", prefix, 8)[0]
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+def load_snapshot(path: Path) -> FleetTable:
+    """스냅샷 파일을 읽기 전용으로 매핑하여 테이블 생성 (숫자 배열은 복사하지 않고 mmap 위의 memoryview)"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:8] != SNAPSHOT_MAGIC:
+        mapped.close()
+        raise ValueError(f"스냅샷 형식이 아닙니다: {path}")
+    header_len = struct.unpack_from("<Q", mapped, 8)[0]
+    header = json.loads(mapped[16:16 + header_len].decode("utf-8"))
+    data_start = _align8(16 + header_len)
+    view = memoryview(mapped)
+    directory = header["blocks"]
+
+    def block(name):
+        if name not in directory:
+            # 컬럼이 추가되기 전에 쓴 스냅샷 (로더가 새 형식으로 다시 씀)
+            raise ValueError(f"스냅샷에 {name} 블록이 없습니다: {path}")
+        offset, typecode, count = directory[name]
+        start = data_start + offset
+        return view[start:start + count * array(typecode).itemsize].cast(typecode)
+
+    sort_index = {}
+    for column in SORTABLE_COLUMNS:
+        by_key = {}
+        prefix = f"sort/{column}/"
+        for name in directory:
+            if name.startswith(prefix) and name.endswith("/rows"):
+                key = name[len(prefix):-len("/rows")]
+                by_key[None if key == "all" else int(key)] = SortedRows.from_arrays(
+                    block(f"{prefix}{key}/rows"), block(f"{prefix}{key}/values"))
+        sort_index[column] = by_key
+
+    score_cube = {}
+    for n, meta in enumerate(header["cube"]):
+        if "histograms" not in meta:
+            raise ValueError(f"스냅샷에 히스토그램이 없습니다: {path}")
+        sorted_values = {column: block(f"cube/{n}/{column}") for column in CUBE_COLUMNS}
+        score_cube[(meta["car_type"], meta["grade"])] = CubeCell.from_snapshot(meta, sorted_values)
+
+    table = FleetTable(
+        header["car_ids"],
+        {column: block(f"float/{column}") for column in FLOAT_COLUMNS + DERIVED_FLOAT_COLUMNS},
+        header["texts"],
+        {column: block(f"code/{column}") for column in CATEGORY_COLUMNS},
+        header["categories"],
+        {column: block(f"time/{column}") for column in TIME_COLUMNS},
+        derived={
+            "grade_codes": block("grade_codes"),
+            "sorted_scores": {column: block(f"ranked/{column}") for column in RANKED_COLUMNS},
+            "sort_index": sort_index,
+            "score_cube": score_cube,
+        },
+    )
+    table.version = header["version"]
+    table.duplicates = header.get("duplicates", {})
+    return table
+
+class SnapshotReader:
+    """프로덕션 서버 워커용 - 로더 프로세스가 만든 스냅샷 파일을 매핑해서 제공 (FleetLoader와 같은 get/version)
+    - check_interval초마다 파일 식별자(inode)/mtime만 확인, 교체되었으면 새 파일을 매핑하고 테이블 참조를 교체
+    - 이전 매핑은 사용 중인 요청이 끝나 참조가 사라지면 해제됨"""
+
+    def __init__(self, snapshot_path: Path, check_interval: float = 2.0):
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self._stat_key = None
+        self._table = None
+        self._last_check = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._table.version if self._table is not None else None
+
+    def get(self) -> FleetTable:
+        if self._is_fresh():
+            return self._table
+        with self._lock:
+            if not self._is_fresh():
+                self._refresh()
+                self._last_check = time.monotonic()
+            return self._table
+
+    def refresh(self) -> FleetTable:
+        """check_interval과 관계없이 바로 변경 확인 (백그라운드 작업용)"""
+        with self._lock:
+            self._refresh()
+            self._last_check = time.monotonic()
+            return self._table
+
+    def _is_fresh(self) -> bool:
+        return (self._table is not None and self._last_check is not None and
+                time.monotonic() - self._last_check < self.check_interval)
+
+    def _refresh(self) -> None:
+        try:
+            st = self.snapshot_path.stat()
+        except OSError:
+            if self._table is None:
+                print(f"[warn] 스냅샷 파일이 없습니다: {self.snapshot_path}")
+                self._table = _TableBuilder().build()
+            return
+        stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if stat_key == self._stat_key and self._table is not None:
+            return
+        try:
+            table = load_snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"[warn] 스냅샷 로드 실패 {self.snapshot_path}: {e}")
+            if self._table is None:
+                self._table = _TableBuilder().build()
+            return
+        self._stat_key = stat_key
+        self._table = table
+        print(f"[info] 스냅샷 로드: {len(table)}개 차량 (버전 {table.version})")
+
+def publish_snapshots(datasets_dir: Path, snapshot_path: Path, interval: float = 2.0,
+                      loader: Optional[FleetLoader] = None) -> None:
+    """로더 프로세스 - 데이터셋 디렉토리를 감시하며 버전이 바뀔 때마다 스냅샷 파일을 새로 씀
+    loader: 같은 프로세스의 다른 작업과 공유할 로더 (없으면 새로 만듦, check_interval=0이어야 매 주기 변경 확인)"""
+    if loader is None:
+        loader = FleetLoader(datasets_dir, check_interval=0)
+    published = None
+    try:
+        published = load_snapshot(snapshot_path).version
+    except (OSError, ValueError):
+        pass
+
+    while True:
+        table = loader.get()
+        if table.version != published:
+            write_snapshot(table, snapshot_path)
+            published = table.version
+            print(f"[info] 스냅샷 저장: {snapshot_path} ({len(table)}개 차량, 버전 {table.version})")
+        time.sleep(interval)
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+점수 이력 저장소 - 점수 계산 실행(run)마다 차량별 점수를 컬럼 기반으로 누적 저장
+- car_ids.txt: car_id 사전 (줄 번호 = 차량 코드, 추가만 함)
+- runs.jsonl: 실행 목록 (한 줄에 실행 하나, 형식 버전/컬럼 목록/파일 이름)
+- run_<run_id>.bin: 실행 하나의 컬럼 블록을 zlib으로 압축
+  (차량 코드는 정렬 후 차분 uint32, 점수는 0.01 단위 int16 고정소수점, 값 없음 = -32768)
+- ScoreHistory: 차량별 최근/이전 실행 점수 인덱스를 유지하며 새 실행만 증분 반영
+"""
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+HISTORY_FORMAT = 1
+
+# 이력에 저장하는 점수 컬럼
+HISTORY_COLUMNS = [
+    "final_score",
+    "efficiency_score",
+    "temperature_score",
+    "cell_imbalance_score",
+    "driving_habit_score",
+    "charging_pattern_score",
+]
+
+SCALE = 100        # 고정소수점 배율 (0.01점 단위)
+MISSING = -32768   # int16 값 없음
+
+def _to_fixed(value: Any) -> int:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return MISSING
+    if number != number:  # NaN
+        return MISSING
+    return max(-32767, min(32767, int(round(number * SCALE))))
+
+def _le(values: array) -> array:
+    """저장 바이트 순서는 little-endian 고정"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+def _read_car_ids(history_dir: Path) -> List[str]:
+    path = history_dir / "car_ids.txt"
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+def _read_runs(history_dir: Path) -> List[Dict[str, Any]]:
+    path = history_dir / "runs.jsonl"
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _encode_run(codes: array, columns: Dict[str, array]) -> bytes:
+    deltas = array("I", [codes[0]] if codes else [])
+    deltas.extend(codes[k] - codes[k - 1] for k in range(1, len(codes)))
+    raw = _le(deltas).tobytes() + b"".join(_le(columns[c]).tobytes() for c in columns)
+    return zlib.compress(raw, 9)
+
+def _decode_run(data: bytes, count: int, column_names: List[str]):
+    """(정렬된 차량 코드, {컬럼: int16 배열})"""
+    raw = zlib.decompress(data)
+    deltas = array("I")
+    deltas.frombytes(raw[:count * 4])
+    offset = count * 4
+    columns = {}
+    for name in column_names:
+        values = array("h")
+        values.frombytes(raw[offset:offset + count * 2])
+        offset += count * 2
+        columns[name] = values
+    if sys.byteorder != "little":
+        deltas.byteswap()
+        for values in columns.values():
+            values.byteswap()
+    codes = array("I")
+    total = 0
+    for delta in deltas:
+        total += delta
+        codes.append(total)
+    return codes, columns
+
+def append_run(history_dir: Path, results: Iterable[Dict[str, Any]], run_id: Optional[str] = None) -> str:
+    """점수 계산 결과 행들(car_id + 점수 컬럼)을 새 실행으로 추가, 반환: run_id
+    실행 파일을 먼저 원자적으로 쓰고 runs.jsonl에 마지막으로 추가 (중간에 실패하면 실행 목록에 나타나지 않음)"""
+    history_dir.mkdir(parents=True, exist_ok=True)
+    car_ids = _read_car_ids(history_dir)
+    code_of = {car_id: code for code, car_id in enumerate(car_ids)}
+
+    rows = {}
+    new_ids = []
+    for result in results:
+        car_id = result.get("car_id")
+        if not car_id:
+            continue
+        if car_id not in code_of:
+            code_of[car_id] = len(code_of)
+            new_ids.append(car_id)
+        rows[code_of[car_id]] = result  # 같은 차량이 여러 번 나오면 마지막 행 사용
+
+    if new_ids:
+        with open(history_dir / "car_ids.txt", "a", encoding="utf-8") as f:
+            f.writelines(f"{car_id}\n" for car_id in new_ids)
+            f.flush()
+            os.fsync(f.fileno())
+
+    codes = array("I", sorted(rows))
+    columns = {c: array("h", (_to_fixed(rows[code].get(c)) for code in codes)) for c in HISTORY_COLUMNS}
+
+    runs = _read_runs(history_dir)
+    existing = {run["run_id"] for run in runs}
+    base_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    run_id = base_id
+    suffix = 1
+    while run_id in existing:
+        suffix += 1
+        run_id = f"{base_id}-{suffix}"
+
+    file_name = f"run_{run_id}.bin"
+    tmp_path = history_dir / (file_name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_encode_run(codes, columns))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, history_dir / file_name)
+
+    entry = {
+        "run_id": run_id,
+        "format": HISTORY_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "file": file_name,
+        "vehicles": len(codes),
+        "columns": HISTORY_COLUMNS,
+    }
+    with open(history_dir / "runs.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return run_id
+
+class ScoreHistory:
+    """대시보드용 점수 이력 인덱스 - 차량 코드별 최근/이전 실행의 점수를 int16 배열로 보관 (조회 O(1))
+    - check_interval초마다 runs.jsonl의 크기/mtime만 확인, 늘어났으면 새 실행 파일만 읽어서 인덱스 갱신
+    - runs.jsonl이 줄어들었거나 교체되었으면 처음부터 다시 구성
+    - 인덱스 갱신과 조회는 모두 self._lock 안에서 수행 (갱신 중인 배열을 읽지 않도록)"""
+
+    def __init__(self, history_dir: Path, check_interval: float = 2.0):
+        self.history_dir = history_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stat_key = None
+        self._runs = []
+        self._code_of = {}
+        self._latest = {c: array("h") for c in HISTORY_COLUMNS}
+        self._previous = {c: array("h") for c in HISTORY_COLUMNS}
+        self._latest_run = array("i")
+        self._previous_run = array("i")
+
+    @property
+    def run_ids(self) -> List[str]:
+        self._ensure_fresh()
+        with self._lock:
+            return [run["run_id"] for run in self._runs]
+
+    def changes(self, car_id: str) -> Dict[str, Optional[float]]:
+        """차량의 최근 실행 점수 - 이전 실행 점수 (두 실행 모두 값이 있을 때만, 아니면 None)"""
+        self._ensure_fresh()
+        result = dict.fromkeys(HISTORY_COLUMNS)
+        with self._lock:
+            code = self._code_of.get(car_id)
+            if code is None or code >= len(self._previous_run) or self._previous_run[code] < 0:
+                return result
+            for column in HISTORY_COLUMNS:
+                latest = self._latest[column][code]
+                previous = self._previous[column][code]
+                if latest != MISSING and previous != MISSING:
+                    result[column] = (latest - previous) / SCALE
+        return result
+
+    def _ensure_fresh(self) -> None:
+        if self._last_check is not None and time.monotonic() - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if self._last_check is not None and time.monotonic() - self._last_check < self.check_interval:
+                return
+            try:
+                self._refresh()
+            except (OSError, ValueError, zlib.error) as e:
+                print(f"[warn] 점수 이력 로드 실패 {self.history_dir}: {e}")
+            self._last_check = time.monotonic()
+
+    def _refresh(self) -> None:
+        try:
+            st = (self.history_dir / "runs.jsonl").stat()
+        except OSError:
+            if self._runs:
+                self._reset()
+            return
+        stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if stat_key == self._stat_key:
+            return
+        if self._stat_key is not None and (st.st_ino != self._stat_key[0] or st.st_size < self._stat_key[1]):
+            self._reset()
+
+        runs = _read_runs(self.history_dir)
+        if [run["run_id"] for run in runs[:len(self._runs)]] != [run["run_id"] for run in self._runs]:
+            self._reset()
+        new_runs = runs[len(self._runs):]
+        if new_runs:
+            car_ids = _read_car_ids(self.history_dir)
+            for code in range(len(self._code_of), len(car_ids)):
+                self._code_of[car_ids[code]] = code
+            self._grow(len(car_ids))
+            for position, run in enumerate(new_runs, len(self._runs)):
+                self._apply_run(position, run)
+            self._runs = runs
+            print(f"[info] 점수 이력 로드: 실행 {len(runs)}회, 차량 {len(car_ids)}대")
+        self._stat_key = stat_key
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self._latest_run)
+        if extra <= 0:
+            return
+        for column in HISTORY_COLUMNS:
+            self._latest[column].extend([MISSING] * extra)
+            self._previous[column].extend([MISSING] * extra)
+        self._latest_run.extend([-1] * extra)
+        self._previous_run.extend([-1] * extra)
+
+    def _apply_run(self, position: int, run: Dict[str, Any]) -> None:
+        """실행 하나를 반영 - 실행에 포함된 차량은 최근 값을 이전 값으로 밀고 새 값을 최근 값으로"""
+        if run.get("format") != HISTORY_FORMAT:
+            raise ValueError(f"지원하지 않는 점수 이력 형식: {run.get('format')} ({run['run_id']})")
+        with open(self.history_dir / run["file"], "rb") as f:
+            codes, columns = _decode_run(f.read(), run["vehicles"], run["columns"])
+        for column in HISTORY_COLUMNS:
+            latest = self._latest[column]
+            previous = self._previous[column]
+            values = columns.get(column)
+            for k, code in enumerate(codes):
+                previous[code] = latest[code]
+                latest[code] = values[k] if values is not None else MISSING
+        for code in codes:
+            self._previous_run[code] = self._latest_run[code]
+            self._latest_run[code] = position
@@ -9,10 +9,50 @@ document.addEventListener('DOMContentLoaded', function() {
     // 테이블 클릭 이벤트 초기 설정
     setupVehicleTableClickHandler();
     
-    // 5분마다 자동 새로고침
-    setInterval(loadDashboardData, 5 * 60 * 1000);
+    // 서버 변경 이벤트(SSE) 구독 - 변경된 섹션만 다시 조회
+    // EventSource를 지원하지 않는 브라우저는 5분마다 자동 새로고침
+    if (window.EventSource) {
+        subscribeDashboardEvents();
+    } else {
+        setInterval(loadDashboardData, 5 * 60 * 1000);
+    }
 });
 
+// 서버 변경 이벤트 구독 (연결이 끊기면 EventSource가 자동 재연결)
+function subscribeDashboardEvents() {
+    const events = new EventSource('/api/events');
+    
+    // 점수 데이터셋 변경 → 전체 데이터 다시 조회
+    events.addEventListener('dataset', loadDashboardData);
+    
+    // InfluxDB 통계 갱신 → 통계 섹션만 다시 조회
+    events.addEventListener('influxdb', loadInfluxStats);
+    
+    // 서버가 스트림을 거절한 경우(동시 스트림 수 초과 등)에는 자동 재연결되지 않으므로
+    // 5분 뒤 전체 데이터를 새로고침하고 다시 구독
+    events.addEventListener('error', function() {
+        if (events.readyState === EventSource.CLOSED) {
+            setTimeout(function() {
+                loadDashboardData();
+                subscribeDashboardEvents();
+            }, 5 * 60 * 1000);
+        }
+    });
+}
+
+// InfluxDB 통계 섹션만 로드
+async function loadInfluxStats() {
+    try {
+        const response = await fetch('/api/stats?sections=influxdb');
+        const data = await response.json();
+        
+        updateStats(data);
+        updateFieldList(data.influxdb);
+    } catch (error) {
+        console.error('InfluxDB 통계 로드 실패:', error);
+    }
+}
+
 // 탭 전환
 function switchTab(tab, event) {
     currentTab = tab;
@@ -87,7 +127,23 @@ function updateStats(data) {
     // 총 차량수는 updateTotalVehicles에서 별도로 업데이트
     document.getElementById('csv-count').textContent = influx.csv_count.toLocaleString() + '개';
     document.getElementById('field-count').textContent = influx.field_count + '개';
-    document.getElementById('last-update').textContent = influx.last_update;
+    // InfluxDB 통계는 백그라운드에서 갱신되므로 마지막 갱신 후 경과 시간을 함께 표시
+    // (응답 본문은 캐시되므로 경과 시간은 갱신 시각(updated_at, epoch 초)으로 클라이언트에서 계산)
+    const ageSeconds = influx.updated_at ? Date.now() / 1000 - influx.updated_at : null;
+    document.getElementById('last-update').textContent = influx.last_update
+        ? `${influx.last_update} (${formatAge(ageSeconds)})`
+        : '-';
+}
+
+// 경과 시간 표시 (초 → "방금 전", "3분 전", "2시간 전")
+function formatAge(seconds) {
+    if (seconds === null || seconds === undefined || seconds < 60) {
+        return '방금 전';
+    }
+    if (seconds < 3600) {
+        return Math.floor(seconds / 60) + '분 전';
+    }
+    return Math.floor(seconds / 3600) + '시간 전';
 }
 
 // 총 차량수 업데이트 (데이터 완성도 분석 합계)
@@ -579,22 +635,41 @@ function getGradeClass(grade) {
     return 'normal';
 }
 
-function drawBarChart() {
+// 최종 점수 분포 차트 (서버에서 미리 계산한 히스토그램을 등급별로 쌓아서 표시, 검색어 필터는 반영하지 않음)
+async function drawBarChart(carType = 'all', grade = 'all') {
     const canvas = document.getElementById('battery-bar-chart');
     if (!canvas) return;
     
+    const params = new URLSearchParams({ columns: 'final_score', split: 'grade' });
+    if (carType !== 'all') params.append('car_type', carType);
+    if (grade !== 'all') params.append('grade', grade);
+    
+    let histogram;
+    try {
+        const response = await fetch(`/api/score-histograms?${params.toString()}`);
+        if (!response.ok) return;
+        histogram = await response.json();
+    } catch (error) {
+        console.error('점수 분포 로드 실패:', error);
+        return;
+    }
+    
     const ctx = canvas.getContext('2d');
     const width = canvas.width;
     const height = canvas.height;
     
     ctx.clearRect(0, 0, width, height);
     
-    if (filteredVehicles.length === 0) return;
+    const edges = histogram.edges;
+    const bins = edges.length - 1;
+    const totals = new Array(bins).fill(0);
+    histogram.groups.forEach(group => {
+        group.histograms.final_score.forEach((count, k) => { totals[k] += count; });
+    });
+    const maxCount = Math.max(...totals);
+    if (maxCount === 0) return;
     
-    // 점수 기준 정렬
-    const sorted = [...filteredVehicles].sort((a, b) => b.final_score - a.final_score);
-    const barWidth = Math.max(2, (width - 100) / sorted.length);
-    const maxScore = 100;
+    const barWidth = (width - 100) / bins;
     const chartHeight = height - 80;
     const chartY = 20;
     
@@ -608,36 +683,34 @@ function drawBarChart() {
         ctx.lineTo(width - 50, y);
         ctx.stroke();
         
-        // Y축 라벨
+        // Y축 라벨 (차량 수)
         ctx.fillStyle = '#666';
         ctx.font = '12px sans-serif';
         ctx.textAlign = 'right';
-        ctx.fillText((100 - i * 20).toString(), 45, y + 4);
-    }
-    
-    // 바 차트 그리기
-    sorted.forEach((vehicle, index) => {
-        const x = 50 + index * barWidth;
-        const barHeight = (vehicle.final_score / maxScore) * chartHeight;
-        const y = chartY + chartHeight - barHeight;
-        
-        const color = getGradeColor(vehicle.grade);
-        ctx.fillStyle = color;
-        ctx.fillRect(x, y, barWidth - 1, barHeight);
+        ctx.fillText(Math.round(maxCount * (5 - i) / 5).toString(), 45, y + 4);
+    }
+    
+    // 바 차트 그리기 (구간마다 등급별로 쌓음)
+    const gradeLabels = { excellent: '매우 좋음', good: '좋음', normal: '보통', bad: '나쁨' };
+    const stacked = new Array(bins).fill(0);
+    histogram.groups.forEach(group => {
+        ctx.fillStyle = getGradeColor(gradeLabels[group.key]);
+        group.histograms.final_score.forEach((count, k) => {
+            if (count === 0) return;
+            const barHeight = (count / maxCount) * chartHeight;
+            const y = chartY + chartHeight - (stacked[k] / maxCount) * chartHeight - barHeight;
+            ctx.fillRect(50 + k * barWidth, y, barWidth - 1, barHeight);
+            stacked[k] += count;
+        });
     });
     
-    // X축 라벨
+    // X축 라벨 (구간 경계 점수)
     ctx.fillStyle = '#666';
     ctx.font = '10px sans-serif';
     ctx.textAlign = 'center';
-    const labelStep = Math.max(1, Math.floor(sorted.length / 10));
-    for (let i = 0; i < sorted.length; i += labelStep) {
-        const x = 50 + i * barWidth + barWidth / 2;
-        ctx.save();
-        ctx.translate(x, height - 30);
-        ctx.rotate(-Math.PI / 4);
-        ctx.fillText(sorted[i].car_id.substring(0, 8), 0, 0);
-        ctx.restore();
+    const labelStep = Math.max(1, Math.floor(bins / 10));
+    for (let k = 0; k <= bins; k += labelStep) {
+        ctx.fillText(edges[k].toString(), 50 + k * barWidth, height - 40);
     }
 }
 
@@ -852,7 +925,7 @@ async function applyFilters() {
     }
     
     updateVehicleTable();
-    drawBarChart();
+    drawBarChart(carType, currentGradeFilter);
     drawDonutChart(filteredSummary);
 }
 
@@ -925,6 +998,11 @@ async function updateBatteryScoreForCarType(carType) {
     await updateBatteryScoreForFilters(carType, currentGradeFilter);
 }
 
+// 구간 데이터 가용성 (구간 수를 모르는 데이터셋(null)은 데이터가 있다고 보고 표시)
+function hasSectionData(sectionCounts, kinds) {
+    return kinds.some(kind => sectionCounts[kind] == null || sectionCounts[kind] > 0);
+}
+
 // 차량 상세 분석 모달 열기
 async function openVehicleDetail(carId) {
     console.log('openVehicleDetail 호출됨, carId:', carId);
@@ -949,23 +1027,23 @@ async function openVehicleDetail(carId) {
         console.log('API 응답 받음:', data);
         
         // 기본 정보 업데이트
-        document.getElementById('detail-total-rows').textContent = data.basic_info.total_rows.toLocaleString();
+        document.getElementById('detail-total-rows').textContent = data.basic_info.total_rows != null ? data.basic_info.total_rows.toLocaleString() : '-';
         document.getElementById('detail-age-string').textContent = data.basic_info.age_string || '-';
         document.getElementById('detail-collection-period').textContent = data.basic_info.collection_period || '-';
         document.getElementById('detail-car-id').textContent = data.basic_info.car_id;
         document.getElementById('detail-car-type').textContent = data.basic_info.car_type || '-';
         
-        // 구간 수 업데이트
-        const driveCount = data.section_counts.drive || 0;
-        const parkingCount = data.section_counts.parking || 0;
-        const fastChargeCount = data.section_counts.fast_charge || 0;
-        const slowChargeCount = data.section_counts.slow_charge || 0;
+        // 구간 수 업데이트 (구간 수 컬럼이 없는 데이터셋은 null)
+        const driveCount = data.section_counts.drive;
+        const parkingCount = data.section_counts.parking;
+        const fastChargeCount = data.section_counts.fast_charge;
+        const slowChargeCount = data.section_counts.slow_charge;
         
-        // 모든 값이 0인지 확인
-        const allZero = driveCount === 0 && parkingCount === 0 && fastChargeCount === 0 && slowChargeCount === 0;
+        // 구간 수를 알 수 없는지 확인
+        const unknown = [driveCount, parkingCount, fastChargeCount, slowChargeCount].some(count => count == null);
         
-        if (allZero) {
-            // 모든 값이 0이면 ?로 표시
+        if (unknown) {
+            // 구간 수를 모르면 ?로 표시
             document.getElementById('detail-drive-count').textContent = '?';
             document.getElementById('detail-parking-count').textContent = '?';
             document.getElementById('detail-fast-charge-count').textContent = '?';
@@ -1291,10 +1369,10 @@ function updateContributionItem(prefix, item, color) {
     }
 }
 
-// 시계열 차트 그리기
-function drawTimeSeriesChart(canvasId, baseScore, color) {
+// 시계열 차트 그리기 (서버에서 캔버스 폭에 맞게 다운샘플링된 지표 시계열)
+async function drawTimeSeriesChart(canvasId, metric, color) {
     const canvas = document.getElementById(canvasId);
-    if (!canvas) return;
+    if (!canvas || !currentVehicleDetailData) return;
     
     const ctx = canvas.getContext('2d');
     const width = canvas.width;
@@ -1313,26 +1391,43 @@ function drawTimeSeriesChart(canvasId, baseScore, color) {
         ctx.stroke();
     }
     
+    let data = [];
+    let times = [];
+    try {
+        const carId = encodeURIComponent(currentVehicleDetailData.basic_info.car_id);
+        const response = await fetch(`/api/vehicle-timeseries/${carId}?metric=${encodeURIComponent(metric)}&points=${width}`);
+        if (response.ok) {
+            const series = await response.json();
+            data = series.v;
+            times = series.t;
+        }
+    } catch (error) {
+        console.error('시계열 데이터 로드 실패:', error);
+    }
+    
     // 실제 데이터가 없으면 차트를 그리지 않음
-    // TODO: 실제 시계열 데이터를 API에서 가져와서 사용해야 함
-    // 현재는 데이터가 없으므로 차트를 그리지 않음
-    ctx.fillStyle = '#999';
-    ctx.font = '14px sans-serif';
-    ctx.textAlign = 'center';
-    ctx.fillText('시계열 데이터를 사용할 수 없습니다', width / 2, height / 2);
-    return;
+    if (data.length < 2) {
+        ctx.fillStyle = '#999';
+        ctx.font = '14px sans-serif';
+        ctx.textAlign = 'center';
+        ctx.fillText('시계열 데이터를 사용할 수 없습니다', width / 2, height / 2);
+        return;
+    }
     
     // 선 그래프 그리기
     ctx.strokeStyle = color;
     ctx.lineWidth = 2;
     ctx.beginPath();
     
+    // 다운샘플링된 포인트는 시간 간격이 일정하지 않으므로 X축은 실제 시각 기준
+    const points = data.length;
     const minValue = Math.min(...data);
     const maxValue = Math.max(...data);
     const range = maxValue - minValue || 1;
+    const timeRange = times[points - 1] - times[0] || 1;
     
     for (let i = 0; i < points; i++) {
-        const x = (i / points) * width;
+        const x = ((times[i] - times[0]) / timeRange) * width;
         const normalizedValue = (data[i] - minValue) / range;
         const y = height - (normalizedValue * height * 0.8) - height * 0.1;
         
@@ -1361,7 +1456,7 @@ function openTemperatureDetail() {
     const sectionCounts = currentVehicleDetailData.section_counts;
     
     // 주행 관련 데이터 가용성 확인
-    const hasDrivingData = (sectionCounts.drive > 0 || sectionCounts.parking > 0);
+    const hasDrivingData = hasSectionData(sectionCounts, ['drive', 'parking']);
     
     // 온도 상세 분석 업데이트
     if (hasDrivingData) {
@@ -1449,7 +1544,7 @@ function updateTemperatureDetailContributionList(details) {
     // 차트 그리기
     items.forEach(item => {
         if (!item.isAge && item.data) {
-            drawTimeSeriesChart(`temp-detail-${item.key}-chart`, item.data.score || 0, item.color);
+            drawTimeSeriesChart(`temp-detail-${item.key}-chart`, item.key, item.color);
         }
     });
 }
@@ -1748,11 +1843,12 @@ function openCellBalanceDetail() {
     const sectionCounts = currentVehicleDetailData.section_counts;
     
     // 주행 관련 데이터 가용성 확인
-    const hasDrivingData = (sectionCounts.drive > 0 || sectionCounts.parking > 0);
+    const hasDrivingData = hasSectionData(sectionCounts, ['drive', 'parking']);
     
     // 셀 밸런스 상세 분석 업데이트
     if (hasDrivingData) {
         updateCellBalanceDetailAnalysis(details.cell_imbalance, batteryScore, basicInfo);
+        loadCellVoltageMatrix(basicInfo.car_id);
         // 데이터 없음 메시지 숨김
         const noDataMsg = document.getElementById('cell-balance-no-data-message');
         if (noDataMsg) noDataMsg.style.display = 'none';
@@ -1776,7 +1872,7 @@ function openDrivingDetail() {
     const sectionCounts = currentVehicleDetailData.section_counts;
     
     // 주행 관련 데이터 가용성 확인
-    const hasDrivingData = (sectionCounts.drive > 0 || sectionCounts.parking > 0);
+    const hasDrivingData = hasSectionData(sectionCounts, ['drive', 'parking']);
     
     if (!hasDrivingData) {
         alert('주행 구간 및 주차 구간 데이터가 없어 주행 관련 상세 분석을 제공할 수 없습니다.');
@@ -1797,7 +1893,7 @@ function openChargingDetail() {
     const sectionCounts = currentVehicleDetailData.section_counts;
     
     // 충전 관련 데이터 가용성 확인
-    const hasChargingData = (sectionCounts.fast_charge > 0 || sectionCounts.slow_charge > 0);
+    const hasChargingData = hasSectionData(sectionCounts, ['fast_charge', 'slow_charge']);
     
     if (!hasChargingData) {
         alert('급속 충전 및 완속 충전 데이터가 없어 충전 관련 상세 분석을 제공할 수 없습니다.');
@@ -1904,7 +2000,7 @@ function updateCellBalanceDetailContributionList(details) {
     // 차트 그리기
     items.forEach(item => {
         if (!item.isAge && item.data) {
-            drawTimeSeriesChart(`cell-detail-${item.key}-chart`, item.data.score || 0, item.color);
+            drawTimeSeriesChart(`cell-detail-${item.key}-chart`, item.key, item.color);
         }
     });
 }
@@ -2003,8 +2099,85 @@ function drawVoltageSummaryCharts() {
     });
 }
 
-// 셀 전압 라인 차트 그리기
-function drawCellVoltageLineChart() {
+// 셀 전압 행렬 로드 (서버에서 셀 × 시간 버킷으로 집계한 평균/표준편차/범위, float32 배열)
+async function loadCellVoltageMatrix(carId) {
+    let matrix = null;
+    try {
+        const response = await fetch(`/api/vehicle-cell-matrix/${encodeURIComponent(carId)}`);
+        if (response.ok) {
+            const payload = await response.json();
+            if (payload.cells.length > 0) {
+                matrix = {
+                    cells: payload.cells,
+                    buckets: payload.times.length,
+                    mean: decodeFloat32(payload.mean),
+                    std: decodeFloat32(payload.std),
+                    range: decodeFloat32(payload.range)
+                };
+            }
+        }
+    } catch (error) {
+        console.error('셀 전압 데이터 로드 실패:', error);
+    }
+    
+    drawCellVoltageLineChart(matrix);
+    drawCellAvgDeviationChart(matrix);
+    drawCellStdDeviationChart(matrix);
+    drawCellRangeChart(matrix);
+}
+
+// base64 → Float32Array (little-endian)
+function decodeFloat32(base64) {
+    const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+    return new Float32Array(bytes.buffer);
+}
+
+// 버킷별 전체 셀 평균 전압 (값이 없는 칸 제외, 셀 값이 하나도 없는 버킷은 NaN)
+function cellMatrixBucketMeans(matrix) {
+    const means = [];
+    for (let b = 0; b < matrix.buckets; b++) {
+        let sum = 0;
+        let count = 0;
+        for (let c = 0; c < matrix.cells.length; c++) {
+            const value = matrix.mean[c * matrix.buckets + b];
+            if (!isNaN(value)) {
+                sum += value;
+                count++;
+            }
+        }
+        means.push(count > 0 ? sum / count : NaN);
+    }
+    return means;
+}
+
+// 셀별 버킷 평균 (valueOf(c, b)가 NaN인 버킷 제외)
+function cellMatrixCellAverages(matrix, valueOf) {
+    const averages = [];
+    for (let c = 0; c < matrix.cells.length; c++) {
+        let sum = 0;
+        let count = 0;
+        for (let b = 0; b < matrix.buckets; b++) {
+            const value = valueOf(c, b);
+            if (!isNaN(value)) {
+                sum += value;
+                count++;
+            }
+        }
+        averages.push(count > 0 ? sum / count : 0);
+    }
+    return averages;
+}
+
+// 셀 차트 데이터 없음 표시
+function drawCellNoData(ctx, width, height, message) {
+    ctx.fillStyle = '#999';
+    ctx.font = '14px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.fillText(message, width / 2, height / 2);
+}
+
+// 셀 전압 라인 차트 그리기 (버킷별 전체 셀 평균 전압)
+function drawCellVoltageLineChart(matrix) {
     const canvas = document.getElementById('cell-voltage-line-chart');
     if (!canvas) return;
     
@@ -2015,12 +2188,12 @@ function drawCellVoltageLineChart() {
     ctx.clearRect(0, 0, width, height);
     
     // 실제 데이터가 없으면 차트를 그리지 않음
-    // TODO: 실제 셀 전압 라인 데이터를 API에서 가져와서 사용해야 함
-    ctx.fillStyle = '#999';
-    ctx.font = '14px sans-serif';
-    ctx.textAlign = 'center';
-    ctx.fillText('셀 전압 데이터를 사용할 수 없습니다', width / 2, height / 2);
-    return;
+    const data = matrix ? cellMatrixBucketMeans(matrix).filter(v => !isNaN(v)) : [];
+    if (data.length < 2) {
+        drawCellNoData(ctx, width, height, '셀 전압 데이터를 사용할 수 없습니다');
+        return;
+    }
+    const points = data.length;
     
     // 평균값 계산
     const avgValue = data.reduce((a, b) => a + b, 0) / data.length;
@@ -2097,8 +2270,8 @@ function drawCellVoltageLineChart() {
     ctx.fillText(`최대: ${maxValue.toFixed(2)}V`, width - 150, 45);
 }
 
-// 셀 평균 전압 편차 차트 그리기
-function drawCellAvgDeviationChart() {
+// 셀 평균 전압 편차 차트 그리기 (셀별로 같은 버킷의 전체 셀 평균 대비 편차의 평균, mV)
+function drawCellAvgDeviationChart(matrix) {
     const canvas = document.getElementById('cell-avg-deviation-chart');
     if (!canvas) return;
     
@@ -2109,19 +2282,21 @@ function drawCellAvgDeviationChart() {
     ctx.clearRect(0, 0, width, height);
     
     // 실제 데이터가 없으면 차트를 그리지 않음
-    // TODO: 실제 셀 편차 데이터를 API에서 가져와서 사용해야 함
-    ctx.fillStyle = '#999';
-    ctx.font = '14px sans-serif';
-    ctx.textAlign = 'center';
-    ctx.fillText('셀 편차 데이터를 사용할 수 없습니다', width / 2, height / 2);
-    return;
+    if (!matrix) {
+        drawCellNoData(ctx, width, height, '셀 편차 데이터를 사용할 수 없습니다');
+        return;
+    }
+    const bucketMeans = cellMatrixBucketMeans(matrix);
+    const deviations = cellMatrixCellAverages(matrix,
+        (c, b) => (matrix.mean[c * matrix.buckets + b] - bucketMeans[b]) * 1000);
+    const cells = deviations.length;
     
     // 평균 편차 계산
     const avgDeviation = deviations.reduce((a, b) => a + Math.abs(b), 0) / cells;
     
-    // Y축 범위
-    const minY = -6;
-    const maxY = 2;
+    // Y축 범위 (0을 포함하도록 편차 범위에 여유를 둠)
+    const minY = Math.min(-1, ...deviations) * 1.2;
+    const maxY = Math.max(1, ...deviations) * 1.2;
     const range = maxY - minY;
     const zeroY = height - 30 - ((0 - minY) / range) * (height - 60);
     
@@ -2179,7 +2354,7 @@ function drawCellAvgDeviationChart() {
     ctx.fillStyle = '#666';
     ctx.font = '9px sans-serif';
     ctx.textAlign = 'center';
-    const labelStep = Math.floor(cells / 10);
+    const labelStep = Math.max(1, Math.floor(cells / 10));
     for (let i = 0; i < cells; i += labelStep) {
         const x = 50 + (i / cells) * (width - 100) + barWidth / 2;
         ctx.fillText((i + 1).toString(), x, height - 10);
@@ -2198,8 +2373,8 @@ function drawCellAvgDeviationChart() {
     ctx.fillText(`평균 편차: ${avgDeviation.toFixed(2)}mV`, width - 150, 15);
 }
 
-// 셀 전압 표준편차 차트 그리기
-function drawCellStdDeviationChart() {
+// 셀 전압 표준편차 차트 그리기 (셀별 버킷 내 표준편차의 평균, mV)
+function drawCellStdDeviationChart(matrix) {
     const canvas = document.getElementById('cell-std-deviation-chart');
     if (!canvas) return;
     
@@ -2210,12 +2385,15 @@ function drawCellStdDeviationChart() {
     ctx.clearRect(0, 0, width, height);
     
     // 실제 데이터가 없으면 차트를 그리지 않음
-    // TODO: 실제 셀 표준편차 데이터를 API에서 가져와서 사용해야 함
-    ctx.fillStyle = '#999';
-    ctx.font = '14px sans-serif';
-    ctx.textAlign = 'center';
-    ctx.fillText('셀 표준편차 데이터를 사용할 수 없습니다', width / 2, height / 2);
-    return;
+    if (!matrix) {
+        drawCellNoData(ctx, width, height, '셀 표준편차 데이터를 사용할 수 없습니다');
+        return;
+    }
+    const stdDeviations = cellMatrixCellAverages(matrix, (c, b) => matrix.std[c * matrix.buckets + b] * 1000);
+    const cells = stdDeviations.length;
+    const avgStdDev = stdDeviations.reduce((a, b) => a + b, 0) / cells;
+    const maxY = Math.max(...stdDeviations) * 1.2 || 1;
+    const barWidth = (width - 80) / cells;
     
     // 그리드
     ctx.strokeStyle = '#e0e0e0';
@@ -2262,7 +2440,7 @@ function drawCellStdDeviationChart() {
     ctx.fillStyle = '#666';
     ctx.font = '8px sans-serif';
     ctx.textAlign = 'center';
-    const labelStep = Math.floor(cells / 8);
+    const labelStep = Math.max(1, Math.floor(cells / 8));
     for (let i = 0; i < cells; i += labelStep) {
         const x = 40 + (i / cells) * (width - 80) + barWidth / 2;
         ctx.fillText((i + 1).toString(), x, height - 15);
@@ -2275,8 +2453,8 @@ function drawCellStdDeviationChart() {
     ctx.fillText(`평균: ${avgStdDev.toFixed(2)}mV`, width - 100, 15);
 }
 
-// 셀 전압 범위 차트 그리기
-function drawCellRangeChart() {
+// 셀 전압 범위 차트 그리기 (셀별 버킷 내 최대-최소 범위의 평균, mV)
+function drawCellRangeChart(matrix) {
     const canvas = document.getElementById('cell-range-chart');
     if (!canvas) return;
     
@@ -2287,12 +2465,15 @@ function drawCellRangeChart() {
     ctx.clearRect(0, 0, width, height);
     
     // 실제 데이터가 없으면 차트를 그리지 않음
-    // TODO: 실제 셀 범위 데이터를 API에서 가져와서 사용해야 함
-    ctx.fillStyle = '#999';
-    ctx.font = '14px sans-serif';
-    ctx.textAlign = 'center';
-    ctx.fillText('셀 범위 데이터를 사용할 수 없습니다', width / 2, height / 2);
-    return;
+    if (!matrix) {
+        drawCellNoData(ctx, width, height, '셀 범위 데이터를 사용할 수 없습니다');
+        return;
+    }
+    const ranges = cellMatrixCellAverages(matrix, (c, b) => matrix.range[c * matrix.buckets + b] * 1000);
+    const cells = ranges.length;
+    const avgRange = ranges.reduce((a, b) => a + b, 0) / cells;
+    const maxY = Math.max(...ranges) * 1.2 || 1;
+    const barWidth = (width - 80) / cells;
     
     // 그리드
     ctx.strokeStyle = '#e0e0e0';
@@ -2356,7 +2537,7 @@ function drawCellRangeChart() {
     ctx.fillStyle = '#666';
     ctx.font = '8px sans-serif';
     ctx.textAlign = 'center';
-    const labelStep = Math.floor(cells / 8);
+    const labelStep = Math.max(1, Math.floor(cells / 8));
     for (let i = 0; i < cells; i += labelStep) {
         const x = 40 + (i / cells) * (width - 80) + barWidth / 2;
         ctx.fillText((i + 1).toString(), x, height - 15);
@@ -2382,7 +2563,7 @@ function openEfficiencyDetail() {
     const sectionCounts = currentVehicleDetailData.section_counts;
     
     // 주행 관련 데이터 가용성 확인
-    const hasDrivingData = (sectionCounts.drive > 0 || sectionCounts.parking > 0);
+    const hasDrivingData = hasSectionData(sectionCounts, ['drive', 'parking']);
     
     // 효율 상세 분석 업데이트
     if (hasDrivingData) {
@@ -2470,7 +2651,7 @@ function updateEfficiencyDetailContributionList(details) {
     // 차트 그리기
     items.forEach(item => {
         if (!item.isAge && item.data) {
-            drawTimeSeriesChart(`eff-detail-${item.key}-chart`, item.data.score || 0, item.color);
+            drawTimeSeriesChart(`eff-detail-${item.key}-chart`, item.key, item.color);
         }
     });
 }
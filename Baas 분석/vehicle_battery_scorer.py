@@ -9,13 +9,27 @@ import configparser
 import csv
 import math
 import os
+import time
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from influxdb_client import InfluxDBClient
+from score_history import append_run
 
 HERE = Path(__file__).resolve().parent
 CFG = HERE / "config2.ini"
+HISTORY_DIR = HERE / "results" / "score_history"
+
+# 긴 수집 기간의 단일 차량 집계를 시간 구간으로 나눠 병렬 조회
+PARTITION_DAYS = 90      # 분할 단위 (일)
+PARTITION_WORKERS = 4    # 분할 구간 동시 조회 수
+MIN_PARTITION_HOURS = 24 # 타임아웃 시 반으로 나누는 최소 단위
+
+# 실패 차량 재시도 (실행 마지막에 백오프 후 분할 단위를 1/4씩 줄여 재시도)
+# 분할 단위가 적용되는 주행 메트릭 분할 조회의 타임아웃만 재시도 (다른 오류는 같은 쿼리를 반복하므로 바로 오류 행)
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 5.0
 
 def _load_cfg():
     cfg = configparser.ConfigParser()
@@ -202,6 +216,90 @@ from(bucket:"{bucket}")
     
     return info
 
+# =========================
+# 구간 수 / 데이터 존재 여부 조회
+# =========================
+# 구간 종류 → measurement (구간 하나가 measurement의 레코드 하나)
+SEGMENT_MEASUREMENTS = {
+    "drive": "segment_stats_drive",
+    "parking": "segment_stats_parking",
+    "fast_charge": "segment_stats_fast_charge",
+    "slow_charge": "segment_stats_slow_charge",
+}
+
+# 구간 종류 → 결과 CSV 컬럼
+SEGMENT_COUNT_COLUMNS = {
+    "drive": "drive_count",
+    "parking": "parking_count",
+    "fast_charge": "fast_charge_count",
+    "slow_charge": "slow_charge_count",
+}
+
+def get_fleet_segment_counts(client: InfluxDBClient, org: str, bucket: str, device_key: str,
+                             start: Optional[str], stop: Optional[str], window: Optional[str],
+                             devices: Optional[List[str]] = None) -> Optional[Dict[str, Dict[str, int]]]:
+    """구간 내 전체 차량의 구간 종류별 구간 수를 measurement마다 한 번의 그룹 count() 쿼리로 조회
+    차량이 하나뿐이면(--device) 해당 차량만 조회 (전체 차량 스캔 없음)
+    반환: {device: {"drive": n, "parking": n, "fast_charge": n, "slow_charge": n}}, 조회 실패 시 None
+    결과에 없는 차량은 구간 내 데이터가 없는 차량"""
+    rng = _range(start, stop, window)
+    dev_filter = ""
+    if devices and len(devices) == 1:
+        dev_filter = f"\n  |> filter(fn:(r)=> {_device_pred(devices[0], device_key)})"
+
+    counts = {}
+    for kind, measurement in SEGMENT_MEASUREMENTS.items():
+        # 차량 × 필드별 레코드 수 (결과 크기는 차량 수 × 필드 수에 비례)
+        # 구간마다 모든 필드가 기록되지는 않으므로 필드별 개수 중 최댓값을 구간 수로 사용
+        flux = f'''
+from(bucket:"{bucket}")
+  {rng}
+  |> filter(fn:(r)=> r._measurement=="{measurement}"){dev_filter}
+  |> group(columns: ["{device_key}", "_field"])
+  |> count()
+  |> keep(columns: ["{device_key}", "_field", "_value"])
+'''
+        try:
+            for t in client.query_api().query(flux, org=org):
+                for r in t.records:
+                    device_val = r.values.get(device_key)
+                    val = r.get_value()
+                    if not device_val or val is None:
+                        continue
+                    entry = counts.setdefault(str(device_val), dict.fromkeys(SEGMENT_MEASUREMENTS, 0))
+                    entry[kind] = max(entry[kind], int(val))
+        except Exception as e:
+            print(f"[warn] 구간 수 조회 실패 ({measurement}, 전체 쿼리로 진행): {e}")
+            return None
+    return counts
+
+def presence_from_segment_counts(segment_counts: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, bool]]:
+    """구간 수 → 주행/충전 데이터 존재 여부 {device: {"drive": bool, "charge": bool}}
+    점수 계산의 주행 쿼리군은 segment_stats_drive, 충전 쿼리군은 급속/완속 충전만 사용"""
+    return {
+        device: {"drive": c["drive"] > 0, "charge": c["fast_charge"] > 0 or c["slow_charge"] > 0}
+        for device, c in segment_counts.items()
+    }
+
+def _segment_count_fields(segment_counts: Optional[Dict[str, Dict[str, int]]], device: str) -> Dict[str, Optional[int]]:
+    """결과 행에 넣을 구간 수 컬럼 (조회하지 못했으면 빈 값)"""
+    if segment_counts is None:
+        return dict.fromkeys(SEGMENT_COUNT_COLUMNS.values())
+    device_counts = segment_counts.get(device, {})
+    return {column: device_counts.get(kind, 0) for kind, column in SEGMENT_COUNT_COLUMNS.items()}
+
+def _presence_label(presence: Optional[Dict[str, bool]]) -> Optional[str]:
+    """데이터 존재 여부를 CSV 표시용 문자열로 변환 (both/drive/charge/none)"""
+    if presence is None:
+        return None
+    if presence.get("drive") and presence.get("charge"):
+        return "both"
+    if presence.get("drive"):
+        return "drive"
+    if presence.get("charge"):
+        return "charge"
+    return "none"
+
 # =========================
 # 메트릭 조회 함수들
 # =========================
@@ -1134,12 +1232,23 @@ from(bucket:"{bucket}")
 def calculate_vehicle_score(client: InfluxDBClient, org: str, bucket: str, measurement: str,
                            device: str, device_key: str, start: Optional[str], stop: Optional[str],
                            window: Optional[str], vehicle_type_override: Optional[str] = None,
-                           csv_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """단일 차량의 점수 계산 (여러 measurement 조합 사용)"""
+                           csv_info: Optional[Dict[str, Any]] = None,
+                           presence: Optional[Dict[str, bool]] = None,
+                           partition_days: int = PARTITION_DAYS,
+                           partition_workers: int = PARTITION_WORKERS) -> Dict[str, Any]:
+    """단일 차량의 점수 계산 (여러 measurement 조합 사용)
+    presence가 주어지면 데이터가 있는 쿼리군(주행/충전)만 실행
+    주행 메트릭은 partition_days 단위로 나눠 병렬 집계 (0이면 기존 필드별 단일 쿼리)"""
+    has_drive = presence is None or presence.get("drive", False)
+    has_charge = presence is None or presence.get("charge", False)
+
     # 차량 정보 조회 (segment_stats_drive에서)
     drive_measurement = "segment_stats_drive"
-    vehicle_info = get_vehicle_info(client, org, bucket, drive_measurement,
-                                    device, device_key, start, stop, window)
+    if has_drive:
+        vehicle_info = get_vehicle_info(client, org, bucket, drive_measurement,
+                                        device, device_key, start, stop, window)
+    else:
+        vehicle_info = {}
     
     car_type_raw = vehicle_info.get("car_type")
     vehicle_type = vehicle_type_override or _map_car_type_to_vehicle_type(car_type_raw)
@@ -1178,22 +1287,43 @@ def calculate_vehicle_score(client: InfluxDBClient, org: str, bucket: str, measu
     age_years = max(0.0, age_years)
     
     # 메트릭 조회 (segment_stats_drive에서 효율, 온도, 셀 편차, 주행 습관)
+    # 구간 내 주행 데이터가 없으면 조회하지 않음 (결과는 조회했을 때와 동일하게 None)
     drive_measurement = "segment_stats_drive"
-    efficiency = get_efficiency(client, org, bucket, drive_measurement, device,
-                                device_key, start, stop, window)
-    
-    avg_temp = get_avg_temperature(client, org, bucket, drive_measurement, device,
-                                   device_key, start, stop, window)
-    
-    cell_imb = get_cell_imbalance(client, org, bucket, drive_measurement, device,
-                                  device_key, start, stop, window)
-    
-    driving_habit = get_driving_habit(client, org, bucket, drive_measurement, device,
-                                     device_key, start, stop, window)
-    
+    drive_stats = None
+    if has_drive and partition_days:
+        drive_stats = get_partitioned_field_stats(client, org, bucket, drive_measurement, device,
+                                                  device_key, start, stop, DRIVE_WINDOW_FIELDS,
+                                                  partition_days, partition_workers)
+    if drive_stats is not None:
+        drive_metrics = _metrics_from_window_stats(drive_stats)
+        efficiency = drive_metrics["efficiency"]
+        avg_temp = drive_metrics["avg_temperature"]
+        cell_imb = drive_metrics["cell_imbalance"]
+        driving_habit = drive_metrics["driving_habit"]
+    elif has_drive:
+        efficiency = get_efficiency(client, org, bucket, drive_measurement, device,
+                                    device_key, start, stop, window)
+
+        avg_temp = get_avg_temperature(client, org, bucket, drive_measurement, device,
+                                       device_key, start, stop, window)
+
+        cell_imb = get_cell_imbalance(client, org, bucket, drive_measurement, device,
+                                      device_key, start, stop, window)
+
+        driving_habit = get_driving_habit(client, org, bucket, drive_measurement, device,
+                                         device_key, start, stop, window)
+    else:
+        efficiency = None
+        avg_temp = None
+        cell_imb = None
+        driving_habit = {"accel_std": None, "brake_std": None}
+
     # 충전 패턴: segment_stats_slow_charge 또는 segment_stats_fast_charge에서 조회
-    charging_pattern = get_charging_pattern_combined(client, org, bucket, device,
-                                                    device_key, start, stop, window)
+    if has_charge:
+        charging_pattern = get_charging_pattern_combined(client, org, bucket, device,
+                                                        device_key, start, stop, window)
+    else:
+        charging_pattern = {"charging_count": None, "avg_charging_amount": None, "high_soc_ratio": None}
     
     # 메트릭 통합
     metrics = {
@@ -1213,8 +1343,544 @@ def calculate_vehicle_score(client: InfluxDBClient, org: str, bucket: str, measu
     
     # 최종 점수 계산
     result = calculate_final_score(metrics, vehicle_type, age_years)
+    result["data_presence"] = _presence_label(presence)
+    result["status"] = "ok"
     return result
 
+def build_no_data_result(device: str, vehicle_type: str,
+                         csv_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """구간 내 주행/충전 데이터가 모두 없는 차량의 결과 행
+    점수를 기본값(80점 등)으로 채우지 않고 비워서 데이터 없음을 명시"""
+    return _build_unscored_result(device, vehicle_type, csv_info, "none", "no_data")
+
+def build_error_result(device: str, vehicle_type: str, csv_info: Optional[Dict[str, Any]],
+                       presence: Optional[Dict[str, bool]], error: str) -> Dict[str, Any]:
+    """재시도 후에도 실패한 차량의 결과 행 (0점 대신 빈 점수 + status=error, 평균 계산에서 제외됨)"""
+    result = _build_unscored_result(device, vehicle_type, csv_info, _presence_label(presence), "error")
+    result["error"] = error[:200]
+    return result
+
+def _build_unscored_result(device: str, vehicle_type: str, csv_info: Optional[Dict[str, Any]],
+                           data_presence: Optional[str], status: str) -> Dict[str, Any]:
+    """점수 없이 기본 정보만 채운 결과 행 (컬럼 순서는 calculate_final_score와 동일)"""
+    csv_info = csv_info or {}
+    model_year = csv_info.get("model_year")
+    model_month = csv_info.get("model_month")
+    age_str = f"{int(model_year)}.{int(model_month):02d}" if model_year and model_month else None
+
+    return {
+        "car_id": device,
+        "car_type": csv_info.get("car_type"),
+        "vehicle_type": vehicle_type,
+        "age_years": None,
+        "model_year": model_year,
+        "model_month": model_month,
+        "age_string": age_str,
+        "first_date": None,
+        "last_date": None,
+        "collection_period": None,
+        "efficiency": None,
+        "efficiency_score": None,
+        "avg_temperature": None,
+        "temperature_score": None,
+        "cell_imbalance": None,
+        "cell_imbalance_score": None,
+        "driving_habit_score": None,
+        "charging_count": None,
+        "avg_charging_amount": None,
+        "charging_pattern_score": None,
+        "weighted_avg": None,
+        "age_penalty": None,
+        "final_score": None,
+        "data_presence": data_presence,
+        "status": status,
+    }
+
+# =========================
+# 윈도우별 집계 (전체 차량 일괄)
+# =========================
+# 주행 필드는 기존 단일 차량 쿼리와 동일하게 10분 평균 후 집계, 충전 필드는 원시값 집계
+DRIVE_WINDOW_FIELDS = ["km_per_kWh", "temp_mean", "cell_volt_diff", "accel_std", "brake_std"]
+CHARGE_WINDOW_FIELDS = ["high_soc_frac", "energy_kwh", "soc_start"]
+
+SCORE_COLUMNS = [
+    "final_score",
+    "efficiency_score",
+    "temperature_score",
+    "cell_imbalance_score",
+    "driving_habit_score",
+    "charging_pattern_score",
+]
+
+def _field_pred(fields: List[str]) -> str:
+    return " or ".join(f'r._field=="{f}"' for f in fields)
+
+def get_fleet_window_stats(client: InfluxDBClient, org: str, bucket: str, device_key: str,
+                           start: Optional[str], stop: Optional[str], window: Optional[str],
+                           every: str, devices: Optional[List[str]] = None) -> Dict[str, Dict[str, Dict[datetime, List[float]]]]:
+    """전체 차량의 필드별 윈도우 합계/개수를 car_id로 그룹화하여 일괄 조회
+    평균 대신 합계와 개수를 받으므로 윈도우를 합쳐도 정확한 평균을 구할 수 있음
+    합계와 개수는 한 쿼리의 reduce로 함께 받음 (서로 다른 쿼리 결과를 섞지 않도록)
+    반환: {device: {field: {window_start: [sum, count]}}}
+    쿼리 수: 주행/충전 2회 (차량 수와 무관), 하나라도 실패하면 예외 전파 (일부 값만으로 점수를 매기지 않음)"""
+    rng = _range(start, stop, window)
+    dev_filter = ""
+    if devices and len(devices) == 1:
+        dev_filter = f"\n  |> filter(fn:(r)=> {_device_pred(devices[0], device_key)})"
+
+    families = [
+        ('r._measurement=="segment_stats_drive"', DRIVE_WINDOW_FIELDS,
+         "\n  |> aggregateWindow(every: 10m, fn: mean, createEmpty: false)"),
+        ('r._measurement=="segment_stats_slow_charge" or r._measurement=="segment_stats_fast_charge"',
+         CHARGE_WINDOW_FIELDS, ""),
+    ]
+
+    stats = {}
+    for measurement_pred, fields, pre_agg in families:
+        flux = f'''
+from(bucket:"{bucket}")
+  {rng}
+  |> filter(fn:(r)=> {measurement_pred}){dev_filter}
+  |> filter(fn:(r)=> {_field_pred(fields)}){pre_agg}
+  |> window(every: {every}, createEmpty: false)
+  |> reduce(identity: {{sum: 0.0, count: 0.0}},
+            fn: (r, accumulator) => ({{sum: accumulator.sum + float(v: r._value), count: accumulator.count + 1.0}}))
+  |> keep(columns: ["_start", "_field", "sum", "count", "{device_key}"])
+'''
+        try:
+            for t in client.query_api().query(flux, org=org):
+                for r in t.records:
+                    device_val = r.values.get(device_key)
+                    count = r.values.get("count")
+                    if not device_val or not count:
+                        continue
+                    # 같은 차량이 여러 series(태그 조합)로 나뉘어 있어도 합산
+                    cell = (stats.setdefault(str(device_val), {})
+                                 .setdefault(r.values.get("_field"), {})
+                                 .setdefault(r.values.get("_start"), [0.0, 0.0]))
+                    cell[0] += float(r.values.get("sum") or 0.0)
+                    cell[1] += float(count)
+        except Exception as e:
+            print(f"[error] 윈도우 집계 조회 실패 (every={every}): {e}")
+            raise
+
+    if devices is not None:
+        wanted = set(devices)
+        stats = {d: v for d, v in stats.items() if d in wanted}
+    return stats
+
+def _metrics_from_window_stats(field_stats: Dict[str, List[float]]) -> Dict[str, Any]:
+    """필드별 [합계, 개수]를 calculate_final_score 입력 형식의 메트릭으로 변환"""
+    def mean(field: str) -> Optional[float]:
+        total, count = field_stats.get(field, (0.0, 0.0))
+        return total / count if count > 0 else None
+
+    efficiency = mean("km_per_kWh")
+    if efficiency is not None and not (0 < efficiency < 20):  # 합리적인 범위 체크 (get_efficiency와 동일)
+        efficiency = None
+
+    charging_count = field_stats.get("soc_start", (0.0, 0.0))[1]
+    if charging_count > 0:
+        charging_pattern = {
+            "charging_count": float(charging_count),
+            "avg_charging_amount": mean("energy_kwh"),
+            "high_soc_ratio": mean("high_soc_frac"),
+        }
+    else:
+        charging_pattern = {"charging_count": None, "avg_charging_amount": None, "high_soc_ratio": None}
+
+    return {
+        "efficiency": efficiency,
+        "avg_temperature": mean("temp_mean"),
+        "cell_imbalance": mean("cell_volt_diff"),
+        "driving_habit": {"accel_std": mean("accel_std"), "brake_std": mean("brake_std")},
+        "charging_pattern": charging_pattern,
+    }
+
+def _has_window_data(field_stats: Dict[str, List[float]]) -> bool:
+    """주행 또는 충전 데이터가 하나라도 있는지 (없으면 점수를 매기지 않음)"""
+    return any(count > 0 for _, count in field_stats.values())
+
+def _score_from_window_stats(device: str, field_stats: Dict[str, List[float]], info: Dict[str, Any],
+                             vehicle_type_override: Optional[str], at: datetime) -> Dict[str, Any]:
+    """윈도우 집계값으로 점수 계산 (연식은 해당 시점 기준)"""
+    car_type = info.get("car_type")
+    vehicle_type = vehicle_type_override or _map_car_type_to_vehicle_type(car_type)
+    model_year = float(info.get("model_year") or 2025.0)
+    model_month = float(info.get("model_month") or 1.0)
+    age_years = max(0.0, (at.year - model_year) + (at.month - model_month) / 12.0)
+
+    metrics = _metrics_from_window_stats(field_stats)
+    metrics.update({
+        "device": device,
+        "car_type": car_type,
+        "vehicle_type": vehicle_type,
+        "model_year": model_year,
+        "model_month": model_month,
+    })
+    return calculate_final_score(metrics, vehicle_type, age_years)
+
+def score_fleet_monthly(client: InfluxDBClient, org: str, bucket: str, device_key: str,
+                        devices: List[str], device_info: Dict[str, Dict[str, Any]],
+                        start: Optional[str], stop: Optional[str], window: Optional[str],
+                        vehicle_type_override: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """월별 점수 시계열: 1mo 윈도우 집계를 전체 차량에 대해 한 번에 조회한 뒤 월마다 점수 계산
+    반환: {device: {"YYYY-MM": calculate_final_score 결과}}"""
+    stats = get_fleet_window_stats(client, org, bucket, device_key, start, stop, window,
+                                   every="1mo", devices=devices)
+
+    monthly = {}
+    for device in devices:
+        # {field: {month_start: [sum, count]}} → {month_start: {field: [sum, count]}}
+        by_month = {}
+        for field, windows in stats.get(device, {}).items():
+            for month_start, cell in windows.items():
+                by_month.setdefault(month_start, {})[field] = cell
+
+        device_scores = {}
+        for month_start in sorted(by_month):
+            field_stats = by_month[month_start]
+            if not _has_window_data(field_stats):
+                continue
+            device_scores[month_start.strftime("%Y-%m")] = _score_from_window_stats(
+                device, field_stats, device_info.get(device, {}), vehicle_type_override, month_start
+            )
+        monthly[device] = device_scores
+    return monthly
+
+def write_monthly_score_matrix(output_path: Path, monthly: Dict[str, Dict[str, Dict[str, Any]]],
+                               device_info: Dict[str, Dict[str, Any]]) -> List[str]:
+    """차량 × 월 점수 행렬 저장 (행: 차량 × 점수 항목, 열: 월)
+    데이터가 없는 월은 빈 칸. 반환: 월 컬럼 목록"""
+    months = sorted({m for scores in monthly.values() for m in scores})
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["car_id", "car_type", "score"] + months)
+        for device in sorted(monthly):
+            scores = monthly[device]
+            car_type = device_info.get(device, {}).get("car_type") or ""
+            for column in SCORE_COLUMNS:
+                writer.writerow([device, car_type, column] +
+                                [scores[m][column] if m in scores else "" for m in months])
+    return months
+
+# =========================
+# 시간 분할 병렬 집계 (단일 차량, 긴 수집 기간용)
+# =========================
+def _is_timeout(e: Exception) -> bool:
+    error_msg = str(e).lower()
+    return "timeout" in error_msg or "timed out" in error_msg
+
+def _split_time_range(start: Optional[str], stop: Optional[str],
+                      partition_days: int) -> Optional[List[tuple]]:
+    """절대 시각 구간을 partition_days 단위로 분할 [(start_dt, stop_dt), ...]
+    start가 상대 시간(-7d 등)이거나 파싱할 수 없으면 None"""
+    from datetime import timedelta, timezone
+    if not start or partition_days <= 0:
+        return None
+    try:
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if start_dt.tzinfo is None:
+        start_dt = start_dt.replace(tzinfo=timezone.utc)
+    stop_dt = _parse_stop(stop)
+
+    parts = []
+    step = timedelta(days=partition_days)
+    current = start_dt
+    while current < stop_dt:
+        part_stop = min(current + step, stop_dt)
+        parts.append((current, part_stop))
+        current = part_stop
+    return parts
+
+def _query_field_sums(client: InfluxDBClient, org: str, bucket: str, measurement: str,
+                      dev: str, fields: List[str], part_start: datetime, part_stop: datetime) -> Dict[str, List[float]]:
+    """한 구간의 필드별 [10분 평균의 합계, 개수] (예외는 호출자가 처리)
+    10분 윈도우는 epoch 기준으로 정렬되므로 구간 경계가 10분 단위이면 구간별 결과를 더해도 정확히 일치"""
+    s = part_start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    e = part_stop.strftime("%Y-%m-%dT%H:%M:%SZ")
+    flux = f'''
+from(bucket:"{bucket}")
+  |> range(start: {s}, stop: {e})
+  |> filter(fn:(r)=> r._measurement=="{measurement}")
+  |> filter(fn:(r)=> {dev})
+  |> filter(fn:(r)=> {_field_pred(fields)})
+  |> aggregateWindow(every: 10m, fn: mean, createEmpty: false)
+  |> group(columns: ["_field"])
+  |> reduce(identity: {{sum: 0.0, count: 0.0}},
+            fn: (r, accumulator) => ({{sum: accumulator.sum + r._value, count: accumulator.count + 1.0}}))
+'''
+    sums = {}
+    for t in client.query_api().query(flux, org=org):
+        for r in t.records:
+            field = r.values.get("_field")
+            if field:
+                cell = sums.setdefault(field, [0.0, 0.0])
+                cell[0] += float(r.values.get("sum") or 0.0)
+                cell[1] += float(r.values.get("count") or 0.0)
+    return sums
+
+def _query_field_sums_with_split(client: InfluxDBClient, org: str, bucket: str, measurement: str,
+                                 dev: str, fields: List[str], part_start: datetime,
+                                 part_stop: datetime) -> Dict[str, List[float]]:
+    """구간 조회가 타임아웃되면 반으로 나눠 재귀 조회 (최소 MIN_PARTITION_HOURS), 그래도 실패하면 예외 전파"""
+    from datetime import timedelta
+    try:
+        return _query_field_sums(client, org, bucket, measurement, dev, fields, part_start, part_stop)
+    except Exception as e:
+        span = part_stop - part_start
+        if not _is_timeout(e) or span <= timedelta(hours=MIN_PARTITION_HOURS):
+            raise
+        # 10분 경계에 맞춰 분할 (결과 병합이 정확하도록)
+        half = part_start + timedelta(minutes=(span.total_seconds() // 1200) * 10)
+        merged = {}
+        for sub_start, sub_stop in ((part_start, half), (half, part_stop)):
+            for field, (total, count) in _query_field_sums_with_split(
+                    client, org, bucket, measurement, dev, fields, sub_start, sub_stop).items():
+                cell = merged.setdefault(field, [0.0, 0.0])
+                cell[0] += total
+                cell[1] += count
+        return merged
+
+def get_partitioned_field_stats(client: InfluxDBClient, org: str, bucket: str, measurement: str,
+                                device: str, device_key: str, start: Optional[str], stop: Optional[str],
+                                fields: List[str], partition_days: int = PARTITION_DAYS,
+                                workers: int = PARTITION_WORKERS) -> Optional[Dict[str, List[float]]]:
+    """단일 차량 필드별 [합계, 개수]를 시간 구간으로 나눠 병렬 조회 후 병합
+    반환: {field: [sum, count]}, 절대 시각 구간이 아니면 None (기존 쿼리 사용)
+    조회 오류(최소 단위까지 타임아웃 포함)는 예외 전파 - 빈 주행 메트릭으로 점수를 매기지 않고 재시도/오류 행으로 처리"""
+    from concurrent.futures import ThreadPoolExecutor
+    parts = _split_time_range(start, stop, partition_days)
+    if parts is None:
+        return None
+    dev = _device_pred(device, device_key)
+
+    merged = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(parts)))) as executor:
+        futures = [
+            executor.submit(_query_field_sums_with_split, client, org, bucket, measurement,
+                            dev, fields, part_start, part_stop)
+            for part_start, part_stop in parts
+        ]
+        try:
+            for future in futures:
+                for field, (total, count) in future.result().items():
+                    cell = merged.setdefault(field, [0.0, 0.0])
+                    cell[0] += total
+                    cell[1] += count
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    return merged
+
+# =========================
+# 여러 기간 점수 (일별 집계 1회 조회 후 메모리에서 기간별 합산)
+# =========================
+def parse_period(spec: str) -> Optional[int]:
+    """기간 문자열 파싱: "all" → None (전체 구간), "90d" → 90 (일)"""
+    spec = spec.strip().lower()
+    if spec == "all":
+        return None
+    if spec.endswith("d") and spec[:-1].isdigit() and int(spec[:-1]) > 0:
+        return int(spec[:-1])
+    raise ValueError(f"잘못된 기간 형식: {spec} (예: all, 90d, 30d)")
+
+def _parse_stop(stop: Optional[str]) -> datetime:
+    """--stop 값을 UTC datetime으로 변환 (없거나 상대 시간이면 현재 시각)"""
+    from datetime import timezone
+    if stop:
+        try:
+            dt = datetime.fromisoformat(stop.replace('Z', '+00:00'))
+            return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+def score_fleet_periods(client: InfluxDBClient, org: str, bucket: str, device_key: str,
+                        devices: List[str], device_info: Dict[str, Dict[str, Any]],
+                        start: Optional[str], stop: Optional[str], window: Optional[str],
+                        periods: List[str], vehicle_type_override: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """여러 기간 점수를 한 번에 계산
+    가장 넓은 구간(--start ~ --stop)의 일별 합계/개수만 조회하고, 각 기간은 해당 일자들을 합산하여 계산
+    (최근 N일 = stop 기준 N일 전 이후에 시작한 일자들)
+    연식 감점은 기간 끝(stop, 미래면 현재 시각) 기준 - 모든 기간이 같은 시점에 끝남
+    반환: {device: {period: calculate_final_score 결과}}"""
+    from datetime import timedelta, timezone
+    stats = get_fleet_window_stats(client, org, bucket, device_key, start, stop, window,
+                                   every="1d", devices=devices)
+
+    stop_dt = _parse_stop(stop)
+    cutoffs = {}
+    for period in periods:
+        days = parse_period(period)
+        cutoffs[period] = stop_dt - timedelta(days=days) if days else None
+
+    period_end = min(stop_dt, datetime.now(timezone.utc))
+    results = {}
+    for device in devices:
+        daily = stats.get(device, {})
+        device_scores = {}
+        for period, cutoff in cutoffs.items():
+            field_stats = {}
+            for field, days_stats in daily.items():
+                total = [0.0, 0.0]
+                for day_start, (day_sum, day_count) in days_stats.items():
+                    if cutoff is None or day_start >= cutoff:
+                        total[0] += day_sum
+                        total[1] += day_count
+                field_stats[field] = total
+            if not _has_window_data(field_stats):
+                continue
+            device_scores[period] = _score_from_window_stats(
+                device, field_stats, device_info.get(device, {}), vehicle_type_override, period_end
+            )
+        results[device] = device_scores
+    return results
+
+def write_period_scores(output_path: Path, period_scores: Dict[str, Dict[str, Dict[str, Any]]],
+                        periods: List[str], device_info: Dict[str, Dict[str, Any]]) -> None:
+    """기간별 점수 저장 (차량당 한 행, 점수 컬럼명 뒤에 _기간 접미사). 데이터 없는 기간은 빈 칸"""
+    fieldnames = ["car_id", "car_type", "vehicle_type"] + [
+        f"{column}_{period}" for period in periods for column in SCORE_COLUMNS
+    ]
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for device in sorted(period_scores):
+            scores = period_scores[device]
+            car_type = device_info.get(device, {}).get("car_type")
+            row = {
+                "car_id": device,
+                "car_type": car_type,
+                "vehicle_type": next((r["vehicle_type"] for r in scores.values()),
+                                     _map_car_type_to_vehicle_type(car_type)),
+            }
+            for period, result in scores.items():
+                for column in SCORE_COLUMNS:
+                    row[f"{column}_{period}"] = result[column]
+            writer.writerow(row)
+
+def _result_fieldnames(results: List[Dict[str, Any]]) -> List[str]:
+    """결과 행들의 컬럼 목록 (등장 순서 유지, 행마다 컬럼이 달라도 누락 없이 저장)"""
+    fieldnames = []
+    seen = set()
+    for row in results:
+        for key in row.keys():
+            if key not in seen:
+                seen.add(key)
+                fieldnames.append(key)
+    return fieldnames
+
+def _report_vehicle_result(result: Dict[str, Any], device: str,
+                           device_info: Dict[str, Dict[str, Any]], single_device_mode: bool) -> None:
+    """점수 계산 결과 출력 (CSV의 car_type이 있으면 result의 car_type을 CSV 값으로 갱신)"""
+    # 결과 출력 (이미지 기준 형식)
+    eff_val = result.get('efficiency')
+    eff_val_str = f"{eff_val:.2f}" if eff_val is not None else "N/A"
+    temp_val = result.get('avg_temperature')
+    temp_val_str = f"{temp_val:.1f}" if temp_val is not None else "0.0"
+    cell_score = result.get('cell_imbalance_score', 0.0)
+    driving_score = result.get('driving_habit_score', 0.0)
+    charging_score = result.get('charging_pattern_score', 0.0)
+    final_score = result.get('final_score', 0.0)
+    
+    # 차종 정보: CSV에 car_type이 없으면 InfluxDB에서 가져온 값 사용
+    car_type_from_csv = None
+    if device in device_info:
+        csv_car_type = device_info[device].get('car_type')
+        # CSV에 car_type이 있고 빈 문자열이 아니면 사용
+        if csv_car_type and csv_car_type.strip():
+            car_type_from_csv = csv_car_type.strip()
+    
+    # CSV에 car_type이 없으면 InfluxDB에서 가져온 값 사용
+    car_type_display = car_type_from_csv or result.get('car_type', 'N/A')
+    
+    # CSV 저장을 위해 result의 car_type을 업데이트 (InfluxDB에서 가져온 값 우선 사용)
+    result['car_type'] = car_type_display
+    
+    # 등급 계산 (이미지 기준, A/B/C/D로 표시)
+    # A (매우 좋음): 점수 ≥ 85
+    # B (좋음): 70 ≤ 점수 < 85
+    # C (보통): 55 ≤ 점수 < 70
+    # D (나쁨): 점수 < 55
+    if final_score >= 85.0:
+        grade = "A"
+    elif final_score >= 70.0:
+        grade = "B"
+    elif final_score >= 55.0:
+        grade = "C"
+    else:
+        grade = "D"
+    
+    # 연식 정보 (YYYY.MM 형식)
+    age_str = result.get('age_string', 'N/A')
+    
+    # 수집 기간 (YYYY.MM.DD ~ YYYY.MM.DD 형식)
+    collection_period = result.get('collection_period', 'N/A')
+    
+    # 마지막 충전일 계산 (수집기간의 마지막 날짜 기준)
+    last_charge_days = None
+    if result.get('last_date'):
+        from datetime import datetime
+        try:
+            last_date = datetime.fromisoformat(result.get('last_date').replace('Z', '+00:00'))
+            now = datetime.now(last_date.tzinfo)
+            days_diff = (now - last_date).days
+            last_charge_days = f"{days_diff}일 전"
+        except:
+            pass
+    
+    # 이미지 기준 출력 형식: 차량ID | 차종 | 총점 | 등급 | 효율 | 온도 | 셀 | 주행 | 충전 | 마지막 충전 | 연식 | 수집기간
+    if single_device_mode:
+        print("\n[결과]")
+        print(f"  차량 ID: {result.get('car_id', 'N/A')}")
+        print(f"  차종: {car_type_display} (분류: {result.get('vehicle_type', 'N/A')})")
+        print(f"  총점: {final_score:.1f} (등급: {grade})")
+        
+        # 효율 점수 상세 정보 출력
+        if eff_val is not None:
+            eff_score = result.get('efficiency_score', 0.0)
+            vehicle_type_for_eff = result.get('vehicle_type', '중형')
+            age_years_for_eff = result.get('age_years', 0.0)
+            
+            # 기준값 계산 (효율 점수 계산과 동일)
+            base_ranges = {
+                "상용차": (2.5, 6.5),
+                "소형": (4.0, 8.5),
+                "중형": (3.5, 7.5),
+                "대형": (3.0, 7.0),
+                "프리미엄": (3.8, 8.0),
+            }
+            min_val, max_val = base_ranges.get(vehicle_type_for_eff, (3.5, 7.5))
+            age_adjustment = min(age_years_for_eff * 0.143, 0.8)  # 2.8년: -0.4, 최대 -0.8
+            min_val_adj = min_val - age_adjustment  # min 감소 (완화)
+            max_val_adj = max(0.0, max_val - age_adjustment)  # max 감소 (완화)
+            
+            print(f"  효율: {eff_val_str} km/kWh (점수: {eff_score:.1f})")
+            print(f"    → 기준값: {min_val_adj:.2f}~{max_val_adj:.2f} (차종: {vehicle_type_for_eff}, 연식: {age_years_for_eff:.1f}년, 기본: {min_val}~{max_val})")
+        else:
+            print(f"  효율: {eff_val_str}")
+        
+        print(f"  온도: {temp_val_str}°C (점수: {result.get('temperature_score', 0.0):.1f})")
+        print(f"  셀: {cell_score:.1f}")
+        print(f"  주행: {driving_score:.1f}")
+        print(f"  충전: {charging_score:.1f}")
+        print(f"  마지막 충전: {last_charge_days or 'N/A'}")
+        print(f"  연식: {age_str} (연식 계산: {result.get('age_years', 0.0):.1f}년)")
+        print(f"  수집기간: {collection_period}")
+        print("\n" + "=" * 80)
+    else:
+        # 다중 차량 모드: 이미지 기준 테이블 형식 출력
+        # 컬럼: 차량 ID | 차종 | 총점 | 등급 | 효율 | 온도 | 셀 | 주행 | 충전 | 마지막 충전 | 연식 | 수집기간
+        print(f"{result.get('car_id', device):<15} | {car_type_display:<20} | "
+              f"{final_score:>5.1f} | {grade:>2} | "
+              f"{eff_val_str:>5} | {temp_val_str:>4} | "
+              f"{cell_score:>5.1f} | {driving_score:>5.1f} | {charging_score:>5.1f} | "
+              f"{last_charge_days or 'N/A':>10} | {age_str:>8} | {collection_period}")
+
 # =========================
 # 메인 실행
 # =========================
@@ -1232,8 +1898,38 @@ def main():
     parser.add_argument("--output", default="vehicle_battery_scores.csv", help="Output CSV file")
     parser.add_argument("--vehicle-type", default=None, choices=["상용차", "소형", "중형", "대형", "프리미엄"],
                        help="Vehicle type. If not provided, will be fetched from car_type.")
+    parser.add_argument("--skip-probe", action="store_true",
+                       help="Run every query for every device even when the segment counts show no data in the range.")
+    parser.add_argument("--timeseries", action="store_true",
+                       help="Score every device per calendar month and write a vehicle x month matrix to --output.")
+    parser.add_argument("--periods", default=None,
+                       help="Comma-separated periods scored in one pass, e.g. all,90d,30d (writes per-period columns to --output).")
+    parser.add_argument("--partition-days", type=int, default=PARTITION_DAYS,
+                       help=f"Split each device's drive-metric range into partitions of this many days queried in parallel; 0 disables (default: {PARTITION_DAYS})")
+    parser.add_argument("--partition-workers", type=int, default=PARTITION_WORKERS,
+                       help=f"Concurrent partition queries per device (default: {PARTITION_WORKERS})")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES,
+                       help="Retry passes at the end of the run for devices whose partitioned drive-metric query "
+                            "timed out, each with a 4x smaller --partition-days. Only applies with an absolute "
+                            "--start and --partition-days > 0; other failures are written as error rows "
+                            f"without retrying (default: {MAX_RETRIES})")
+    parser.add_argument("--retry-backoff", type=float, default=RETRY_BACKOFF_SECONDS,
+                       help=f"Seconds to wait before the first retry pass, doubled each pass (default: {RETRY_BACKOFF_SECONDS})")
+    parser.add_argument("--history-dir", default=str(HISTORY_DIR),
+                       help=f"Score history directory each full run is appended to (default: {HISTORY_DIR})")
+    parser.add_argument("--no-history", action="store_true",
+                       help="Do not append this run to the score history.")
     args = parser.parse_args()
     
+    periods = None
+    if args.periods:
+        periods = [p.strip() for p in args.periods.split(",") if p.strip()]
+        try:
+            for period in periods:
+                parse_period(period)
+        except ValueError as e:
+            parser.error(str(e))
+    
     # bucket 설정: raw_bucket을 기본값으로 사용
     bucket = args.bucket or DEFAULT_BUCKET or "raw_bucket"
     
@@ -1342,8 +2038,65 @@ def main():
         
         print()
         
+        # 월별 시계열 모드: 전체 차량을 1mo 윈도우로 일괄 집계 (차량별 쿼리 없음)
+        if args.timeseries:
+            print("[info] 월별 점수 시계열 계산 중 (1mo 윈도우, 전체 차량 일괄 조회)...")
+            try:
+                monthly = score_fleet_monthly(client, ORG, bucket, args.device_key, devices, device_info,
+                                              args.start, args.stop, args.window, args.vehicle_type)
+            except Exception:
+                print("[error] 윈도우 집계 조회에 실패하여 결과 파일을 쓰지 않습니다.")
+                return
+            months = write_monthly_score_matrix(output_path, monthly, device_info)
+            scored = sum(1 for scores in monthly.values() if scores)
+            print("=" * 60)
+            print(f"처리 완료: {scored}/{len(devices)}개 차량 × {len(months)}개월")
+            print(f"결과 파일: {output_path}")
+            print("=" * 60)
+            return
+        
+        # 여러 기간 모드: 일별 집계를 한 번만 조회하고 기간별 점수는 메모리에서 계산
+        if periods:
+            print(f"[info] 기간별 점수 계산 중 ({', '.join(periods)}, 일별 집계 1회 조회)...")
+            try:
+                period_scores = score_fleet_periods(client, ORG, bucket, args.device_key, devices, device_info,
+                                                    args.start, args.stop, args.window, periods, args.vehicle_type)
+            except Exception:
+                print("[error] 윈도우 집계 조회에 실패하여 결과 파일을 쓰지 않습니다.")
+                return
+            write_period_scores(output_path, period_scores, periods, device_info)
+            print("=" * 60)
+            for period in periods:
+                scored = sum(1 for scores in period_scores.values() if period in scores)
+                print(f"  {period}: {scored}/{len(devices)}개 차량")
+            print(f"결과 파일: {output_path}")
+            print("=" * 60)
+            return
+        
+        # 구간 수 사전 조회: 결과에 구간 수 컬럼으로 저장하고, 구간 내 데이터가 없는 차량은 쿼리를 건너뜀
+        print("[info] 구간 수 조회 중...")
+        segment_counts = get_fleet_segment_counts(client, ORG, bucket, args.device_key,
+                                                  args.start, args.stop, args.window, devices)
+        presence_map = None
+        if segment_counts is not None:
+            totals = {kind: sum(c[kind] for c in segment_counts.values()) for kind in SEGMENT_MEASUREMENTS}
+            print(f"[info] 주행 {totals['drive']}개, 주차 {totals['parking']}개, "
+                  f"급속 충전 {totals['fast_charge']}개, 완속 충전 {totals['slow_charge']}개 구간")
+            if not args.skip_probe:
+                presence_map = presence_from_segment_counts(segment_counts)
+                labels = Counter(_presence_label(presence_map.get(d, {})) for d in devices)
+                print(f"[info] 주행+충전 {labels['both']}대, 주행만 {labels['drive']}대, "
+                      f"충전만 {labels['charge']}대, 데이터 없음 {labels['none']}대")
+        print()
+        
         file_exists = output_path.exists()
         results = []
+        no_data_count = 0
+        retry_queue = []  # [(device, presence, error_msg)] - 분할 조회 타임아웃 (더 작은 분할로 재시도)
+        failed = []  # [(device, presence, error_msg)] - 재시도해도 같은 쿼리를 반복하는 실패 (바로 오류 행)
+        interrupted = False
+        # 재시도는 분할 단위를 줄여야 의미가 있으므로 주행 메트릭을 분할 조회하는 경우에만
+        can_retry = bool(args.partition_days) and _split_time_range(args.start, args.stop, 1) is not None
         
         # 단일 차량 모드인지 확인
         single_device_mode = len(devices) == 1
@@ -1362,156 +2115,110 @@ def main():
                 print(f"차량 분석: {device}")
                 print(f"=" * 80)
             
+            presence = None
+            if presence_map is not None:
+                presence = presence_map.get(device, {"drive": False, "charge": False})
+                if not presence["drive"] and not presence["charge"]:
+                    csv_info_for_device = device_info.get(device, {})
+                    vehicle_type = args.vehicle_type or _map_car_type_to_vehicle_type(csv_info_for_device.get("car_type"))
+                    results.append(build_no_data_result(device, vehicle_type, csv_info_for_device))
+                    no_data_count += 1
+                    print(f"  - 데이터 없음: {device} (구간 내 주행/충전 데이터 없음, 조회 생략)")
+                    print()
+                    continue
+            
             try:
                 # CSV 정보 전달 (model_year, model_month)
                 csv_info_for_device = device_info.get(device, {}) if 'device_info' in locals() else None
                 result = calculate_vehicle_score(
                     client, ORG, bucket, args.measurement,
                     device, args.device_key, args.start, args.stop, args.window,
-                    args.vehicle_type, csv_info=csv_info_for_device
+                    args.vehicle_type, csv_info=csv_info_for_device, presence=presence,
+                    partition_days=args.partition_days, partition_workers=args.partition_workers
                 )
                 results.append(result)
                 
-                # 결과 출력 (이미지 기준 형식)
-                eff_val = result.get('efficiency')
-                eff_val_str = f"{eff_val:.2f}" if eff_val is not None else "N/A"
-                temp_val = result.get('avg_temperature')
-                temp_val_str = f"{temp_val:.1f}" if temp_val is not None else "0.0"
-                cell_score = result.get('cell_imbalance_score', 0.0)
-                driving_score = result.get('driving_habit_score', 0.0)
-                charging_score = result.get('charging_pattern_score', 0.0)
-                final_score = result.get('final_score', 0.0)
-                
-                # 차종 정보: CSV에 car_type이 없으면 InfluxDB에서 가져온 값 사용
-                car_type_from_csv = None
-                if 'device_info' in locals() and device in device_info:
-                    csv_car_type = device_info[device].get('car_type')
-                    # CSV에 car_type이 있고 빈 문자열이 아니면 사용
-                    if csv_car_type and csv_car_type.strip():
-                        car_type_from_csv = csv_car_type.strip()
-                
-                # CSV에 car_type이 없으면 InfluxDB에서 가져온 값 사용
-                car_type_display = car_type_from_csv or result.get('car_type', 'N/A')
-                
-                # CSV 저장을 위해 result의 car_type을 업데이트 (InfluxDB에서 가져온 값 우선 사용)
-                result['car_type'] = car_type_display
-                
-                # 등급 계산 (이미지 기준, A/B/C/D로 표시)
-                # A (매우 좋음): 점수 ≥ 85
-                # B (좋음): 70 ≤ 점수 < 85
-                # C (보통): 55 ≤ 점수 < 70
-                # D (나쁨): 점수 < 55
-                if final_score >= 85.0:
-                    grade = "A"
-                elif final_score >= 70.0:
-                    grade = "B"
-                elif final_score >= 55.0:
-                    grade = "C"
-                else:
-                    grade = "D"
-                
-                # 연식 정보 (YYYY.MM 형식)
-                age_str = result.get('age_string', 'N/A')
-                
-                # 수집 기간 (YYYY.MM.DD ~ YYYY.MM.DD 형식)
-                collection_period = result.get('collection_period', 'N/A')
-                
-                # 마지막 충전일 계산 (수집기간의 마지막 날짜 기준)
-                last_charge_days = None
-                if result.get('last_date'):
-                    from datetime import datetime
-                    try:
-                        last_date = datetime.fromisoformat(result.get('last_date').replace('Z', '+00:00'))
-                        now = datetime.now(last_date.tzinfo)
-                        days_diff = (now - last_date).days
-                        last_charge_days = f"{days_diff}일 전"
-                    except:
-                        pass
-                
-                # 이미지 기준 출력 형식: 차량ID | 차종 | 총점 | 등급 | 효율 | 온도 | 셀 | 주행 | 충전 | 마지막 충전 | 연식 | 수집기간
-                if single_device_mode:
-                    print(f"\n[결과]")
-                    print(f"  차량 ID: {result.get('car_id', 'N/A')}")
-                    print(f"  차종: {car_type_display} (분류: {result.get('vehicle_type', 'N/A')})")
-                    print(f"  총점: {final_score:.1f} (등급: {grade})")
-                    
-                    # 효율 점수 상세 정보 출력
-                    if eff_val is not None:
-                        eff_score = result.get('efficiency_score', 0.0)
-                        vehicle_type_for_eff = result.get('vehicle_type', '중형')
-                        age_years_for_eff = result.get('age_years', 0.0)
-                        
-                        # 기준값 계산 (효율 점수 계산과 동일)
-                        base_ranges = {
-                            "상용차": (2.5, 6.5),
-                            "소형": (4.0, 8.5),
-                            "중형": (3.5, 7.5),
-                            "대형": (3.0, 7.0),
-                            "프리미엄": (3.8, 8.0),
-                        }
-                        min_val, max_val = base_ranges.get(vehicle_type_for_eff, (3.5, 7.5))
-                        age_adjustment = min(age_years_for_eff * 0.143, 0.8)  # 2.8년: -0.4, 최대 -0.8
-                        min_val_adj = min_val - age_adjustment  # min 감소 (완화)
-                        max_val_adj = max(0.0, max_val - age_adjustment)  # max 감소 (완화)
-                        
-                        print(f"  효율: {eff_val_str} km/kWh (점수: {eff_score:.1f})")
-                        print(f"    → 기준값: {min_val_adj:.2f}~{max_val_adj:.2f} (차종: {vehicle_type_for_eff}, 연식: {age_years_for_eff:.1f}년, 기본: {min_val}~{max_val})")
-                    else:
-                        print(f"  효율: {eff_val_str}")
-                    
-                    print(f"  온도: {temp_val_str}°C (점수: {result.get('temperature_score', 0.0):.1f})")
-                    print(f"  셀: {cell_score:.1f}")
-                    print(f"  주행: {driving_score:.1f}")
-                    print(f"  충전: {charging_score:.1f}")
-                    print(f"  마지막 충전: {last_charge_days or 'N/A'}")
-                    print(f"  연식: {age_str} (연식 계산: {result.get('age_years', 0.0):.1f}년)")
-                    print(f"  수집기간: {collection_period}")
-                    print("\n" + "=" * 80)
-                else:
-                    # 다중 차량 모드: 이미지 기준 테이블 형식 출력
-                    # 컬럼: 차량 ID | 차종 | 총점 | 등급 | 효율 | 온도 | 셀 | 주행 | 충전 | 마지막 충전 | 연식 | 수집기간
-                    print(f"{result.get('car_id', device):<15} | {car_type_display:<20} | "
-                          f"{final_score:>5.1f} | {grade:>2} | "
-                          f"{eff_val_str:>5} | {temp_val_str:>4} | "
-                          f"{cell_score:>5.1f} | {driving_score:>5.1f} | {charging_score:>5.1f} | "
-                          f"{last_charge_days or 'N/A':>10} | {age_str:>8} | {collection_period}")
+                _report_vehicle_result(result, device, device_info, single_device_mode)
             except KeyboardInterrupt:
                 print(f"\n[info] 사용자에 의해 중단되었습니다.")
                 print(f"[info] 현재까지 {len(results)}개 차량 처리 완료")
+                interrupted = True
                 break
             except Exception as e:
                 error_msg = str(e)
-                if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                    print(f"  ✗ 타임아웃: {device} (다음 차량으로 계속)")
-                elif "KeyboardInterrupt" in error_msg:
+                if "KeyboardInterrupt" in error_msg:
                     print(f"\n[info] 사용자에 의해 중단되었습니다.")
+                    interrupted = True
                     break
+                # 실패한 차량은 0점 행 대신 재시도 대기열(실행 마지막에 더 작은 구간으로 재시도) 또는 오류 행으로
+                if _is_timeout(e) and can_retry:
+                    print(f"  ✗ 타임아웃: {device} (재시도 대기열에 추가, 다음 차량으로 계속)")
+                    retry_queue.append((device, presence, error_msg))
                 else:
-                    print(f"  ✗ 실패: {error_msg[:100]}...")
-                # 실패한 경우에도 기본 정보는 저장
-                results.append({
-                    "car_id": device,
-                    "car_type": None,
-                    "vehicle_type": args.vehicle_type or "중형",
-                    "age_years": 0.0,
-                    "efficiency": None,
-                    "efficiency_score": 0.0,
-                    "avg_temperature": None,
-                    "temperature_score": 0.0,
-                    "cell_imbalance": None,
-                    "cell_imbalance_score": 0.0,
-                    "driving_habit_score": 0.0,
-                    "charging_pattern": None,
-                    "charging_pattern_score": 0.0,
-                    "weighted_avg": 0.0,
-                    "age_penalty": 0.0,
-                    "final_score": 0.0,
-                })
+                    print(f"  ✗ 실패: {error_msg[:100]}... (오류로 기록)")
+                    failed.append((device, presence, error_msg))
             print()
         
+        # 재시도: 백오프 후 더 작은 분할 구간으로 다시 계산 (최대 --max-retries회)
+        retry_succeeded = 0
+        base_partition_days = args.partition_days or PARTITION_DAYS
+        for attempt in range(1, args.max_retries + 1):
+            if not retry_queue or interrupted:
+                break
+            wait_seconds = args.retry_backoff * (2 ** (attempt - 1))
+            partition_days = max(1, base_partition_days // (4 ** attempt))
+            print(f"[info] 재시도 {attempt}/{args.max_retries}: {len(retry_queue)}개 차량, "
+                  f"{wait_seconds:.0f}초 대기 후 {partition_days}일 단위 분할 조회")
+            try:
+                time.sleep(wait_seconds)
+            except KeyboardInterrupt:
+                print("\n[info] 사용자에 의해 중단되었습니다.")
+                interrupted = True
+                break
+            
+            next_queue = []
+            for idx, (device, presence, _) in enumerate(retry_queue):
+                print(f"[retry {attempt}] 처리 중: {device}")
+                try:
+                    result = calculate_vehicle_score(
+                        client, ORG, bucket, args.measurement,
+                        device, args.device_key, args.start, args.stop, args.window,
+                        args.vehicle_type, csv_info=device_info.get(device, {}), presence=presence,
+                        partition_days=partition_days, partition_workers=args.partition_workers
+                    )
+                    results.append(result)
+                    retry_succeeded += 1
+                    _report_vehicle_result(result, device, device_info, single_device_mode)
+                except KeyboardInterrupt:
+                    print("\n[info] 사용자에 의해 중단되었습니다.")
+                    interrupted = True
+                    # 아직 시도하지 않은 차량까지 실패로 기록
+                    next_queue.extend(retry_queue[idx:])
+                    break
+                except Exception as e:
+                    print(f"  ✗ 재시도 실패: {str(e)[:100]}")
+                    if _is_timeout(e):
+                        next_queue.append((device, presence, str(e)))
+                    else:
+                        failed.append((device, presence, str(e)))
+                print()
+            retry_queue = next_queue
+        
+        # 끝까지 실패한 차량은 0점이 아닌 status=error 행으로 기록
+        failed.extend(retry_queue)
+        for device, presence, error_msg in failed:
+            csv_info_for_device = device_info.get(device, {})
+            vehicle_type = args.vehicle_type or _map_car_type_to_vehicle_type(csv_info_for_device.get("car_type"))
+            results.append(build_error_result(device, vehicle_type, csv_info_for_device, presence, error_msg))
+        failed_count = len(failed)
+        
+        # 구간 수 컬럼 추가 (대시보드 상세 화면의 구간 수/데이터 가용성 판단에 사용)
+        for result in results:
+            result.update(_segment_count_fields(segment_counts, result["car_id"]))
+        
         # CSV 저장
         if results:
-            fieldnames = results[0].keys()
+            fieldnames = _result_fieldnames(results)
             with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
@@ -1519,7 +2226,18 @@ def main():
             
             print("=" * 60)
             print(f"처리 완료: {len(results)}개 차량")
+            print(f"  성공: {len(results) - no_data_count - failed_count}개 "
+                  f"(재시도 후 성공 {retry_succeeded}개), "
+                  f"데이터 없음: {no_data_count}개, 실패: {failed_count}개")
             print(f"결과 파일: {output_path}")
+            
+            # 점수 이력 추가 (중단된 실행은 일부 차량만 있으므로 제외)
+            if not args.no_history and not interrupted:
+                try:
+                    run_id = append_run(Path(args.history_dir), results)
+                    print(f"점수 이력: {args.history_dir} (실행 {run_id})")
+                except OSError as e:
+                    print(f"[warn] 점수 이력 저장 실패: {e}")
             print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 버전 기반 캐시 - 대시보드의 집계 결과/응답 본문 캐시
+- 무효화: 호출 시 넘긴 버전(데이터셋 버전 등)이 바뀌면 이전 버전 항목을 모두 버림 (TTL 없음)
+- 크기 제한: 항목 크기(바이트) 합계가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+- 동시 미스 합치기: 같은 키를 여러 요청이 동시에 놓치면 한 요청만 계산하고 나머지는 그 결과를 기다림
+- 적중/미스/대기/제거 횟수 기록
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+class VersionedCache:
+    def __init__(self, name: str, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # 키 -> (값, 크기)
+        self._version = None
+        self._bytes = 0
+        self._inflight = {}  # 키 -> 계산 완료 이벤트
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """version 기준으로 캐시된 값 반환, 없으면 compute()로 계산해서 저장
+        compute가 예외를 내면 그대로 전파하고, 기다리던 요청은 각자 다시 시도"""
+        while True:
+            with self._lock:
+                if version != self._version:
+                    self._reset(version)
+                found = self._entries.get(key)
+                if found is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return found[0]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.waits += 1
+            pending.wait()
+
+        try:
+            value = compute()
+            size = self.sizeof(value)
+            with self._lock:
+                # 계산 중 버전이 바뀌었거나 혼자서 한도를 넘는 값은 저장하지 않음
+                if version == self._version and size <= self.max_bytes:
+                    self._entries[key] = (value, size)
+                    self._bytes += size
+                    while self._bytes > self.max_bytes:
+                        _, (_, evicted_size) = self._entries.popitem(last=False)
+                        self._bytes -= evicted_size
+                        self.evictions += 1
+            return value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is pending:
+                    del self._inflight[key]
+            pending.set()
+
+    def peek(self, key: Hashable, version: Hashable) -> Any:
+        """캐시된 값만 조회 (없거나 버전이 다르면 None, 계산하지 않음 - 여러 키를 한 번에 계산할 때 빠진 키 확인용)"""
+        with self._lock:
+            if version != self._version:
+                return None
+            found = self._entries.get(key)
+            if found is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return found[0]
+
+    def _reset(self, version: Hashable) -> None:
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._bytes = 0
+        self._version = version
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }